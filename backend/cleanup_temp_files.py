@@ -8,6 +8,8 @@ import time
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from services.common import ingested_files
+
 
 def cleanup_old_files(
     directory: str = "generated_files",
@@ -41,8 +43,10 @@ def cleanup_old_files(
     files_to_delete = []
     total_size = 0
     
-    # Parcourir tous les fichiers
+    # Parcourir tous les fichiers (hors fichiers ingérés, expirés par file_id ci-dessous)
+    ingest_dir = os.path.abspath(ingested_files.INGEST_DIR)
     for root, dirs, files in os.walk(directory):
+        dirs[:] = [d for d in dirs if os.path.abspath(os.path.join(root, d)) != ingest_dir]
         for file in files:
             file_path = os.path.join(root, file)
             
@@ -60,6 +64,21 @@ def cleanup_old_files(
             except Exception as e:
                 print(f"⚠️ Erreur lors de l'analyse de {file_path}: {e}")
     
+    # Fichiers ingérés: les trois fichiers d'un file_id expirent ensemble, selon la date d'ingestion
+    if ingest_dir.startswith(os.path.abspath(directory) + os.sep):
+        for group in ingested_files.find_expired_ingested_files(max_age_seconds):
+            for file_path in group["paths"]:
+                try:
+                    size = os.path.getsize(file_path)
+                except OSError:
+                    continue
+                files_to_delete.append({
+                    "path": file_path,
+                    "age_hours": group["age_hours"],
+                    "size_bytes": size
+                })
+                total_size += size
+    
     # Afficher les fichiers trouvés
     print(f"\n🔍 Recherche dans: {directory}")
     print(f"📅 Fichiers plus vieux que: {max_age_hours}h")
@@ -1,23 +1,77 @@
 from fastapi import FastAPI, HTTPException, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List
+from contextlib import asynccontextmanager
+import asyncio
+import json
+import math
 import os
 import re
 from dotenv import load_dotenv
-import tempfile
 
 # Import services par agent (structure organisée)
 from services.rfp_summarizer import (
     extract_text_from_file,
     extract_text_from_sharepoint,
     summarize_rfp_with_ai,
+    stream_rfp_summary,
+    prepare_text_for_llm,
+    start_speculative_summary,
+    take_speculative_summary,
+    cancel_speculative_summary,
     is_sharepoint_url
 )
+from services.common.llm_scheduler import LLMRateLimitedError
+from services.common.process_pool import render_pptx, warm_render_pool, shutdown_render_pool
+from services.common.upload_ingestion import IngestingRoute, describe_upload, upload_sha256
+from services.common.intent_router import log_routing_decision
+from services.common.ingested_files import (
+    save_ingested_file,
+    update_ingested_file,
+    load_ingested_file,
+    mark_ingested_action,
+    read_ingested_text
+)
 
 load_dotenv()
 
-app = FastAPI(title="Infotel RFP Summarizer API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Démarrage: pré-chauffer le rendu PowerPoint, charger le classifieur d'intention. Arrêt: libérer les ressources de chaque service"""
+    from services.common.intent_classifier import get_intent_classifier
+
+    await warm_render_pool()
+    await asyncio.to_thread(get_intent_classifier)
+    try:
+        yield
+    finally:
+        await shutdown_services()
+
+async def shutdown_services():
+    """Arrêter les processus, fermer les caches et connexions, abandonner les travaux non confirmés"""
+    from services.rfp_summarizer.pdf_engine import shutdown_pdf_workers
+    from services.rfp_summarizer.extraction_cache import reset_extraction_cache
+    from services.rfp_summarizer import cancel_all_speculative_summaries
+    from services.deck_generator import discard_all_pptx_prerenders
+    from services.common.llm_client import close_ai_clients
+
+    # Processus de rendu PowerPoint et d'extraction PDF
+    shutdown_render_pool()
+    shutdown_pdf_workers()
+    # Cache du texte extrait
+    reset_extraction_cache()
+    # Analyses spéculatives et PowerPoint pré-rendus jamais confirmés
+    cancel_all_speculative_summaries()
+    discard_all_pptx_prerenders()
+    # Pools de connexions partagés vers le service IA
+    await close_ai_clients()
+
+app = FastAPI(title="Infotel RFP Summarizer API", lifespan=lifespan)
+
+# Uploads reçus par morceaux: taille plafonnée (413) et SHA-256 calculé pendant la réception
+app.router.route_class = IngestingRoute
 
 # CORS middleware for Teams integration
 app.add_middleware(
@@ -28,6 +82,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.get("/metrics/llm")
+async def llm_metrics():
+    """
+    Métriques de la couche IA:
+    - ordonnanceur: file d'attente, temps d'attente, quotas et 429 par déploiement
+    - single-flight: appels identiques partagés au lieu d'être relancés
+    - normalisation: caractères et tokens retirés des documents avant envoi au modèle
+    - spéculatif: analyses lancées dès l'ingestion, confirmées ou annulées
+    """
+    from services.common.llm_client import get_single_flight_metrics
+    from services.common.llm_scheduler import get_scheduler_metrics
+    from services.rfp_summarizer.text_normalizer import get_normalization_metrics
+    from services.rfp_summarizer.speculative_summary import get_speculation_metrics
+    metrics = get_scheduler_metrics()
+    metrics["single_flight"] = get_single_flight_metrics()
+    metrics["normalization"] = get_normalization_metrics()
+    metrics["speculative"] = get_speculation_metrics()
+    return metrics
+
+@app.get("/metrics/routing")
+async def routing_metrics():
+    """
+    Métriques du routage de l'action suggérée:
+    décisions prises par niveau (cache, règles, classifieur local, IA) et taux d'appel au modèle
+    """
+    from services.common.intent_router import get_routing_metrics
+    return await asyncio.to_thread(get_routing_metrics)
+
 # Request/Response Models
 class SummarizeRfpRequest(BaseModel):
     rfpText: str
@@ -82,7 +164,9 @@ async def root():
         "message": "API Infotel AI Agent",
         "version": "1.0.0",
         "endpoints": [
+            "/ingest",
             "/summarizeRfp",
+            "/summarizeRfp/stream",
             "/generateDiagramFromText",
             "/generateDeckFromText",
             "/uniformizeProposal",
@@ -96,16 +180,204 @@ async def root():
         }
     }
 
+def _rate_limit_error(error: BaseException) -> Optional[LLMRateLimitedError]:
+    """Quota IA dépassé à l'origine de l'erreur (les services ré-encapsulent les exceptions)"""
+    while error is not None:
+        if isinstance(error, LLMRateLimitedError):
+            return error
+        error = error.__cause__ or error.__context__
+    return None
+
+def _raise_if_rate_limited(error: Exception):
+    """Quota IA dépassé: 503 avec Retry-After au lieu d'une erreur 500 générique"""
+    rate_limited = _rate_limit_error(error)
+    if rate_limited is not None:
+        print(f"⏳ {rate_limited}")
+        raise HTTPException(
+            status_code=503,
+            detail=str(rate_limited),
+            headers={"Retry-After": str(math.ceil(rate_limited.retry_after))}
+        )
+
+def _load_ingested(file_id: str) -> dict:
+    """Fichier déposé via /ingest (404 s'il est inconnu ou expiré)"""
+    record = load_ingested_file(file_id)
+    if record is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Fichier inconnu ou expiré. Veuillez le déposer à nouveau."
+        )
+    print(f"📎 Fichier déjà ingéré: {record['filename']} (file_id {file_id})")
+    return record
+
+async def _ingested_text(file_id: str, action: str) -> str:
+    """Texte extrait et normalisé à l'ingestion (l'action choisie est journalisée une fois pour le routage)"""
+    record = _load_ingested(file_id)
+    text = await asyncio.to_thread(read_ingested_text, record)
+    if text is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Le fichier {record['filename']} ne contient pas de texte exploitable pour cette action."
+        )
+    
+    # Action réellement choisie pour ce fichier: exemple d'entraînement du classifieur d'intention local
+    # (une seule fois par fichier et action: les nouvelles tentatives ne dupliquent pas l'exemple)
+    if await asyncio.to_thread(mark_ingested_action, file_id, action):
+        await asyncio.to_thread(
+            log_routing_decision,
+            text,
+            record["filename"],
+            action,
+            "user",
+            1.0,
+            file_id=file_id,
+            suggested_action=record.get("suggested_action")
+        )
+    return text
+
+@app.post("/ingest")
+async def ingest_file(file: UploadFile = File(...)):
+    """
+    Déposer un fichier une seule fois pour toutes les actions
+    
+    Le fichier est enregistré, son texte extrait et normalisé, puis l'action la plus
+    pertinente est détectée. Le file_id renvoyé remplace l'upload dans
+    /summarizeRfp, /generateDeckFromText, /generateDiagramFromText et /uniformizeProposal.
+    
+    Avec SPECULATIVE_SUMMARY=1, un appel d'offres détecté avec certitude est analysé
+    dès l'ingestion (speculative: true): /summarizeRfp avec ce file_id récupère l'analyse.
+    
+    Sortie:
+    - file_id, filename, size, suggested_action, suggestion_reason, alternative_actions, speculative
+    """
+    from services.common import detect_content_intent
+    
+    print("\n" + "="*60)
+    print("🎯 ACTION APPELÉE: ingest")
+    print(f"📄 Fichier: {describe_upload(file)}")
+    print("="*60 + "\n")
+    
+    try:
+        record = await asyncio.to_thread(save_ingested_file, file.file, file.filename, upload_sha256(file))
+        
+        text = None
+        if record["extension"] not in ('.pptx', '.ppt'):
+            # Extraction et normalisation faites une fois pour toutes les actions
+            text = await asyncio.to_thread(extract_text_from_file, file.file, file.filename, upload_sha256(file))
+            text = await asyncio.to_thread(prepare_text_for_llm, text)
+        
+        detection = await detect_content_intent(
+            filename=file.filename,
+            content_preview=text[:2000] if text else None
+        )
+        record = await asyncio.to_thread(
+            update_ingested_file,
+            record,
+            text,
+            suggested_action=detection.get("suggested_action"),
+            suggestion_reason=detection.get("suggestion_reason")
+        )
+        
+        # Analyse lancée avant la confirmation de l'utilisateur (opt-in, coût plafonné)
+        speculative = await start_speculative_summary(record["file_id"], text, detection)
+        
+        print(f"✅ Fichier ingéré: file_id {record['file_id']} (action suggérée: {record['suggested_action']})")
+        return {
+            "file_id": record["file_id"],
+            "filename": record["filename"],
+            "size": record["size"],
+            "text_length": record.get("text_length"),
+            "suggested_action": record["suggested_action"],
+            "suggestion_reason": record["suggestion_reason"],
+            "confidence": detection.get("confidence"),
+            "alternative_actions": detection.get("alternative_actions", []),
+            "speculative": speculative
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Erreur lors de l'ingestion du fichier: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur lors de l'ingestion du fichier: {str(e)}"
+        )
+    finally:
+        await file.close()
+
+async def _extract_rfp_text(
+    rfpText: Optional[str],
+    file: Optional[UploadFile],
+    file_id: Optional[str] = None
+) -> tuple[str, str]:
+    """
+    Texte de l'appel d'offres à partir de:
+    1. Upload de fichier (PDF, DOCX, TXT)
+    2. Fichier déjà déposé via /ingest (file_id)
+    3. Lien SharePoint (détecté dans rfpText)
+    4. Texte direct (rfpText)
+    
+    Returns: (extracted_text, command_used)
+    """
+    extracted_text = ""
+    command_used = ""
+    
+    # Detect and strip slash commands from rfpText if present
+    if rfpText:
+        command_used, rfpText = detect_and_strip_command(rfpText)
+        if command_used:
+            print(f"🎯 Command detected: /{command_used}")
+    
+    # Priorité 1: Vérifier si un fichier est uploadé
+    if file:
+        print(f"📄 Traitement du fichier uploadé: {describe_upload(file)}")
+        
+        # Extraction directe depuis l'upload (en mémoire, ou fichier temporaire au-delà du seuil de spooling)
+        extracted_text = await asyncio.to_thread(extract_text_from_file, file.file, file.filename, upload_sha256(file))
+    
+    # Priorité 2: Fichier déjà ingéré (texte extrait et normalisé une fois)
+    elif file_id:
+        extracted_text = await _ingested_text(file_id, "summarize")
+    
+    # Priorité 3: Vérifier si rfpText contient un lien SharePoint
+    elif rfpText and is_sharepoint_url(rfpText):
+        print(f"🔗 URL SharePoint détectée: {rfpText}")
+        extracted_text = extract_text_from_sharepoint(rfpText.strip())
+    
+    # Priorité 4: Utiliser rfpText directement
+    elif rfpText:
+        print("📝 Traitement de l'entrée texte directe")
+        extracted_text = rfpText
+    
+    else:
+        raise HTTPException(
+            status_code=400,
+            detail="Aucune entrée fournie. Veuillez fournir du texte, un lien SharePoint, ou uploader un fichier."
+        )
+    
+    # En-têtes/pieds de page, sommaire, césures et espaces retirés avant l'appel IA
+    if not file_id or file:
+        extracted_text = await asyncio.to_thread(prepare_text_for_llm, extracted_text)
+    
+    if not extracted_text or len(extracted_text.strip()) < 50:
+        raise HTTPException(
+            status_code=400,
+            detail="Le texte extrait est trop court ou vide. Veuillez fournir un document RFP valide."
+        )
+    
+    return extracted_text, command_used
+
 @app.post("/summarizeRfp")
 async def summarize_rfp(
     rfpText: Optional[str] = Form(None),
-    file: Optional[UploadFile] = File(None)
+    file: Optional[UploadFile] = File(None),
+    file_id: Optional[str] = Form(None)
 ):
     """
     Résumer un appel d'offres à partir de:
     1. Texte direct (rfpText)
     2. Lien SharePoint (détecté dans rfpText)
-    3. Upload de fichier (PDF, DOCX, TXT)
+    3. Upload de fichier (PDF, DOCX, TXT), ou file_id d'un fichier déposé via /ingest
     """
     
     print("\n" + "="*60)
@@ -113,66 +385,63 @@ async def summarize_rfp(
     print("📝 Description: Analyser un appel d'offres")
     print("="*60 + "\n")
     
-    extracted_text = ""
-    command_used = ""
-    
     try:
-        # Detect and strip slash commands from rfpText if present
-        if rfpText:
-            command_used, rfpText = detect_and_strip_command(rfpText)
-            if command_used:
-                print(f"🎯 Command detected: /{command_used}")
+        extracted_text, command_used = await _extract_rfp_text(rfpText, file, file_id)
         
-        # Priorité 1: Vérifier si un fichier est uploadé
-        if file:
-            print(f"📄 Traitement du fichier uploadé: {file.filename}")
-            
-            # Sauvegarder le fichier temporairement
-            with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1]) as tmp_file:
-                content = await file.read()
-                tmp_file.write(content)
-                tmp_path = tmp_file.name
-            
-            try:
-                extracted_text = extract_text_from_file(tmp_path, file.filename)
-            finally:
-                # Nettoyer le fichier temporaire
-                if os.path.exists(tmp_path):
-                    os.remove(tmp_path)
-        
-        # Priorité 2: Vérifier si rfpText contient un lien SharePoint
-        elif rfpText and is_sharepoint_url(rfpText):
-            print(f"🔗 URL SharePoint détectée: {rfpText}")
-            extracted_text = extract_text_from_sharepoint(rfpText.strip())
-        
-        # Priorité 3: Utiliser rfpText directement
-        elif rfpText:
-            print("📝 Traitement de l'entrée texte directe")
-            extracted_text = rfpText
+        # Analyse déjà lancée à l'ingestion (spéculative): prête ou en cours
+        summary = await take_speculative_summary(file_id) if file_id and not file else None
         
-        else:
-            raise HTTPException(
-                status_code=400,
-                detail="Aucune entrée fournie. Veuillez fournir du texte, un lien SharePoint, ou uploader un fichier."
-            )
-        
-        if not extracted_text or len(extracted_text.strip()) < 50:
-            raise HTTPException(
-                status_code=400,
-                detail="Le texte extrait est trop court ou vide. Veuillez fournir un document RFP valide."
-            )
-        
-        # Résumer avec l'IA
-        print(f"📊 Résumé de l'AO ({len(extracted_text)} caractères)...")
-        if command_used:
-            print(f"📋 Traitement avec la commande /{command_used}")
-        summary = await summarize_rfp_with_ai(extracted_text)
+        if summary is None:
+            # Résumer avec l'IA
+            print(f"📊 Résumé de l'AO ({len(extracted_text)} caractères)...")
+            if command_used:
+                print(f"📋 Traitement avec la commande /{command_used}")
+            summary = await summarize_rfp_with_ai(extracted_text)
         
-        print("✅ ACTION TERMINÉE: summarizeRfp")
+        cache_status = summary.get("metadata", {}).get("cache")
+        print(f"✅ ACTION TERMINÉE: summarizeRfp (cache: {cache_status})")
         print("="*60 + "\n")
         
         return summary
     
+    except HTTPException:
+        raise
+    except Exception as e:
+        _raise_if_rate_limited(e)
+        print(f"❌ Erreur lors du traitement de l'AO: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur lors du traitement de l'AO: {str(e)}"
+        )
+
+def _sse_event(event: str, data: dict) -> str:
+    """Formater un événement server-sent events"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.post("/summarizeRfp/stream")
+async def summarize_rfp_stream(
+    rfpText: Optional[str] = Form(None),
+    file: Optional[UploadFile] = File(None),
+    file_id: Optional[str] = Form(None)
+):
+    """
+    Variante streaming de /summarizeRfp (server-sent events)
+    
+    Événements:
+    - section: {"name": "lots", "data": [...]} dès qu'une section de l'analyse est complète
+    - complete: résumé complet (même format que /summarizeRfp, avec metadata)
+    - error: {"detail": "..."} si l'analyse échoue en cours de route
+    
+    Les erreurs d'entrée (400) sont renvoyées avant l'ouverture du flux.
+    """
+    
+    print("\n" + "="*60)
+    print("🎯 ACTION APPELÉE: summarizeRfp/stream")
+    print("📝 Description: Analyser un appel d'offres (streaming)")
+    print("="*60 + "\n")
+    
+    try:
+        extracted_text, command_used = await _extract_rfp_text(rfpText, file, file_id)
     except HTTPException:
         raise
     except Exception as e:
@@ -181,11 +450,44 @@ async def summarize_rfp(
             status_code=500,
             detail=f"Erreur lors du traitement de l'AO: {str(e)}"
         )
+    
+    print(f"📊 Résumé de l'AO en streaming ({len(extracted_text)} caractères)...")
+    
+    async def event_stream():
+        try:
+            summary = await take_speculative_summary(file_id) if file_id and not file else None
+            if summary is not None:
+                # Analyse spéculative terminée: restituée section par section
+                for name, data in summary.items():
+                    if name != "metadata":
+                        yield _sse_event("section", {"name": name, "data": data})
+                yield _sse_event("complete", summary)
+                print("✅ ACTION TERMINÉE: summarizeRfp/stream (spéculatif)")
+                return
+            async for event, data in stream_rfp_summary(extracted_text):
+                yield _sse_event(event, data)
+            print("✅ ACTION TERMINÉE: summarizeRfp/stream")
+        except Exception as e:
+            rate_limited = _rate_limit_error(e)
+            if rate_limited is not None:
+                # En-têtes déjà envoyés: le délai d'attente est transmis dans l'événement
+                print(f"⏳ {rate_limited}")
+                yield _sse_event("error", {"detail": str(rate_limited), "retry_after": math.ceil(rate_limited.retry_after)})
+                return
+            print(f"❌ Erreur lors du traitement de l'AO: {str(e)}")
+            yield _sse_event("error", {"detail": f"Erreur lors du traitement de l'AO: {str(e)}"})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.post("/generateDiagramFromText")
 async def generate_diagram(
     description: Optional[str] = Form(None),
-    file: Optional[UploadFile] = File(None)
+    file: Optional[UploadFile] = File(None),
+    file_id: Optional[str] = Form(None)
 ):
     """
     Générer un diagramme PowerPoint professionnel à partir de texte ou fichier
@@ -193,6 +495,7 @@ async def generate_diagram(
     Entrée:
     - description: Description textuelle de ce qu'il faut schématiser
     - file: Fichier optionnel dont extraire le contenu
+    - file_id: Fichier déjà déposé via /ingest (à la place de file)
     
     Sortie:
     - Spécification du diagramme + URL de téléchargement du fichier PowerPoint
@@ -217,19 +520,16 @@ async def generate_diagram(
         
         # Priorité 1: Upload de fichier
         if file:
-            print(f"📄 Traitement du fichier pour diagramme: {file.filename}")
-            
-            with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1]) as tmp_file:
-                content = await file.read()
-                tmp_file.write(content)
-                tmp_path = tmp_file.name
+            print(f"📄 Traitement du fichier pour diagramme: {describe_upload(file)}")
             
-            try:
-                # extract_text_from_file déjà importé en haut
-                extracted_text = extract_text_from_file(tmp_path, file.filename)
-            finally:
-                if os.path.exists(tmp_path):
-                    os.remove(tmp_path)
+            # extract_text_from_file déjà importé en haut
+            extracted_text = await asyncio.to_thread(extract_text_from_file, file.file, file.filename, upload_sha256(file))
+        
+        # Fichier déjà ingéré: texte extrait et normalisé à l'ingestion
+        elif file_id:
+            # Autre action choisie: l'analyse spéculative n'est plus utile
+            cancel_speculative_summary(file_id)
+            extracted_text = await _ingested_text(file_id, "diagram")
         
         # Priorité 2: Lien SharePoint
         elif description and is_sharepoint_url(description):
@@ -247,6 +547,9 @@ async def generate_diagram(
                 detail="Veuillez fournir une description ou uploader un fichier"
             )
         
+        if not file_id or file:
+            extracted_text = await asyncio.to_thread(prepare_text_for_llm, extracted_text)
+        
         if not extracted_text or len(extracted_text.strip()) < 10:
             raise HTTPException(
                 status_code=400,
@@ -260,11 +563,11 @@ async def generate_diagram(
         # Créer le fichier PowerPoint
         os.makedirs("generated_files", exist_ok=True)
         import uuid
-        file_id = str(uuid.uuid4())[:8]
-        filename = f"diagram_{file_id}.pptx"
+        output_id = str(uuid.uuid4())[:8]
+        filename = f"diagram_{output_id}.pptx"
         output_path = os.path.join("generated_files", filename)
         
-        create_powerpoint_diagram(diagram_spec, output_path)
+        await render_pptx(create_powerpoint_diagram, diagram_spec, output_path)
         
         print("✅ ACTION TERMINÉE: generateDiagramFromText")
         print(f"📦 Fichier PowerPoint créé: {filename}")
@@ -282,6 +585,7 @@ async def generate_diagram(
     except HTTPException:
         raise
     except Exception as e:
+        _raise_if_rate_limited(e)
         print(f"❌ Erreur lors de la génération du diagramme: {str(e)}")
         raise HTTPException(
             status_code=500,
@@ -293,7 +597,8 @@ async def generate_deck(
     description: Optional[str] = Form(None),
     file: Optional[UploadFile] = File(None),
     confirm_plan: Optional[str] = Form("false"),  # "true" ou "false" en string
-    html_id: Optional[str] = Form(None)  # ID du HTML temporaire pour conversion
+    html_id: Optional[str] = Form(None),  # ID du HTML temporaire pour conversion
+    file_id: Optional[str] = Form(None)  # Fichier déjà déposé via /ingest
 ):
     """
     Générer une présentation PowerPoint à partir de texte ou fichier
@@ -311,6 +616,7 @@ async def generate_deck(
     Entrée:
     - description: Description textuelle ou contenu
     - file: Fichier optionnel dont extraire le contenu
+    - file_id: Fichier déjà déposé via /ingest (à la place de file)
     - confirm_plan: "true" pour générer le fichier, "false" pour juste le HTML
     - html_id: ID du HTML temporaire (pour conversion en étape 2)
     
@@ -337,18 +643,15 @@ async def generate_deck(
         
         # Priorité 1: Upload de fichier
         if file:
-            print(f"📄 Traitement du fichier pour présentation: {file.filename}")
+            print(f"📄 Traitement du fichier pour présentation: {describe_upload(file)}")
             
-            with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1]) as tmp_file:
-                content = await file.read()
-                tmp_file.write(content)
-                tmp_path = tmp_file.name
-            
-            try:
-                extracted_text = extract_text_from_file(tmp_path, file.filename)
-            finally:
-                if os.path.exists(tmp_path):
-                    os.remove(tmp_path)
+            extracted_text = await asyncio.to_thread(extract_text_from_file, file.file, file.filename, upload_sha256(file))
+        
+        # Fichier déjà ingéré: texte extrait et normalisé à l'ingestion
+        elif file_id:
+            # Autre action choisie: l'analyse spéculative n'est plus utile
+            cancel_speculative_summary(file_id)
+            extracted_text = await _ingested_text(file_id, "deck")
         
         # Priorité 2: Lien SharePoint
         elif description and is_sharepoint_url(description):
@@ -365,6 +668,9 @@ async def generate_deck(
                 detail="Veuillez fournir une description ou uploader un fichier"
             )
         
+        if not file_id or file:
+            extracted_text = await asyncio.to_thread(prepare_text_for_llm, extracted_text)
+        
         if not extracted_text or len(extracted_text.strip()) < 10:
             raise HTTPException(
                 status_code=400,
@@ -373,8 +679,14 @@ async def generate_deck(
         
         from services.deck_generator import (
             generate_and_validate_html_deck,
-            html_to_editable_pptx,
-            parse_html_to_structure
+            structure_to_editable_pptx,
+            structure_from_slides_data,
+            save_deck_session,
+            load_deck_session,
+            delete_deck_session,
+            start_pptx_prerender,
+            take_prerendered_pptx,
+            discard_pptx_prerender
         )
         import json
         import uuid
@@ -392,13 +704,8 @@ async def generate_deck(
                 use_azure=True
             )
             
-            # Sauvegarder le HTML temporairement pour conversion ultérieure
-            html_id = str(uuid.uuid4())[:8]
-            os.makedirs("generated_files", exist_ok=True)
-            html_path = os.path.join("generated_files", f"presentation_{html_id}.html")
-            
-            with open(html_path, 'w', encoding='utf-8') as f:
-                f.write(html_result['html'])
+            # Sauvegarder le HTML et sa structure (slides_data) pour conversion ultérieure
+            html_id = save_deck_session(html_result['html'], html_result['slides_data'])
             
             print(f"✅ HTML généré et validé!")
             print(f"📊 Slides: {html_result['metadata']['slide_count']}")
@@ -415,8 +722,11 @@ async def generate_deck(
             
             print("="*60 + "\n")
             
-            # Extraire la structure pour l'Adaptive Card
-            structure = parse_html_to_structure(html_result['html'])
+            # Structure pour l'Adaptive Card (directement depuis slides_data)
+            structure = structure_from_slides_data(html_result['slides_data'])
+            
+            # Construire le PowerPoint en tâche de fond pendant que l'utilisateur relit le plan
+            start_pptx_prerender(html_id, structure)
             
             # Retourner le plan + HTML ID pour conversion
             result = {
@@ -445,39 +755,40 @@ async def generate_deck(
                     detail="html_id manquant pour la conversion. Veuillez régénérer le plan."
                 )
             
-            html_path = os.path.join("generated_files", f"presentation_{html_id}.html")
+            # Structure issue de slides_data (HTML re-parsé seulement s'il a été modifié)
+            session = load_deck_session(html_id)
             
-            if not os.path.exists(html_path):
+            if session is None:
                 raise HTTPException(
                     status_code=404,
                     detail="HTML temporaire introuvable. Veuillez régénérer le plan."
                 )
             
-            # Lire le HTML
-            with open(html_path, 'r', encoding='utf-8') as f:
-                html_content = f.read()
+            structure = session['structure']
             
-            # Créer le fichier PowerPoint ÉDITABLE à partir du HTML
-            file_id = str(uuid.uuid4())[:8]
-            filename = f"presentation_{file_id}.pptx"
-            output_path = os.path.join("generated_files", filename)
+            # PowerPoint pré-rendu depuis l'étape 1 (sauf si le HTML a été modifié entre-temps)
+            filename = None
+            if session['source'] == 'slides_data':
+                filename = await take_prerendered_pptx(html_id)
+            else:
+                discard_pptx_prerender(html_id)
             
-            print(f"🎨 Parsing HTML et reconstruction PowerPoint natif...")
-            html_to_editable_pptx(html_content, output_path)
+            if filename is None:
+                # Créer le fichier PowerPoint ÉDITABLE à partir de la structure
+                output_id = str(uuid.uuid4())[:8]
+                filename = f"presentation_{output_id}.pptx"
+                output_path = os.path.join("generated_files", filename)
+                
+                print(f"🎨 Reconstruction PowerPoint natif (structure: {session['source']})...")
+                await render_pptx(structure_to_editable_pptx, structure, output_path)
             
-            # Nettoyer le HTML temporaire
-            try:
-                os.remove(html_path)
-            except:
-                pass
+            # Nettoyer la session temporaire
+            delete_deck_session(html_id)
             
             print("✅ ACTION TERMINÉE: generateDeckFromText (HTML/CSS)")
             print(f"📦 PowerPoint ÉDITABLE créé: {filename}")
             print("="*60 + "\n")
             
-            # Extraire la structure pour l'Adaptive Card
-            structure = parse_html_to_structure(html_content)
-            
             # Retourner le résultat avec URL de téléchargement
             result = {
                 "title": structure['title'],
@@ -495,6 +806,7 @@ async def generate_deck(
     except HTTPException:
         raise
     except Exception as e:
+        _raise_if_rate_limited(e)
         print(f"❌ Erreur lors de la génération de la présentation: {str(e)}")
         raise HTTPException(
             status_code=500,
@@ -504,13 +816,15 @@ async def generate_deck(
 @app.post("/uniformizeProposal")
 async def uniformize_proposal(
     file: Optional[UploadFile] = File(None),
-    template: Optional[str] = Form(None)
+    template: Optional[str] = Form(None),
+    file_id: Optional[str] = Form(None)
 ):
     """
     Harmoniser et standardiser une proposition PowerPoint selon la charte Infotel
     
     Entrée:
     - file: Fichier PowerPoint à harmoniser
+    - file_id: Fichier PowerPoint déjà déposé via /ingest (à la place de file)
     - template: Nom de template optionnel ou guide de style
     
     Sortie:
@@ -531,26 +845,26 @@ async def uniformize_proposal(
             if command_used:
                 print(f"🎯 Commande détectée: /{command_used}")
         
-        if not file:
+        if file:
+            print(f"📄 Traitement du fichier PowerPoint: {describe_upload(file)}")
+            source, original_filename = file.file, file.filename
+        elif file_id:
+            # Fichier déjà déposé via /ingest
+            cancel_speculative_summary(file_id)
+            record = _load_ingested(file_id)
+            source, original_filename = record["path"], record["filename"]
+        else:
             raise HTTPException(
                 status_code=400,
                 detail="Veuillez uploader un fichier PowerPoint à harmoniser"
             )
         
-        print(f"📄 Traitement du fichier PowerPoint: {file.filename}")
-        
-        # Sauvegarder le fichier temporairement
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pptx") as tmp_file:
-            content = await file.read()
-            tmp_file.write(content)
-            tmp_path = tmp_file.name
-        
         try:
             # Étape 1: Extraire le contenu du PowerPoint existant
             from services.proposal_harmonizer import extract_content_from_pptx, harmonize_presentation_with_ai
             
-            print(f"📖 Extraction du contenu de {file.filename}...")
-            extracted_content = extract_content_from_pptx(tmp_path)
+            print(f"📖 Extraction du contenu de {original_filename}...")
+            extracted_content = await asyncio.to_thread(extract_content_from_pptx, source)
             print(f"✅ {extracted_content['total_slides']} slides extraites")
             
             # Étape 2: Harmoniser avec l'IA
@@ -563,12 +877,12 @@ async def uniformize_proposal(
             
             os.makedirs("generated_files", exist_ok=True)
             import uuid
-            file_id = str(uuid.uuid4())[:8]
-            filename = f"harmonized_{file_id}.pptx"
+            output_id = str(uuid.uuid4())[:8]
+            filename = f"harmonized_{output_id}.pptx"
             output_path = os.path.join("generated_files", filename)
             
             print(f"🎨 Création du PowerPoint harmonisé selon charte Infotel 2025...")
-            create_powerpoint_from_template(harmonized_plan, output_path)
+            await render_pptx(create_powerpoint_from_template, harmonized_plan, output_path)
             
             print("✅ ACTION TERMINÉE: uniformizeProposal")
             print(f"📦 Fichier harmonisé créé: {filename}")
@@ -577,7 +891,7 @@ async def uniformize_proposal(
             # Retourner le plan + URL de téléchargement
             result = {
                 **harmonized_plan,
-                "original_file": file.filename,
+                "original_file": original_filename,
                 "original_slides": extracted_content['total_slides'],
                 "harmonized_file": filename,
                 "download_url": f"/download/{filename}",
@@ -587,13 +901,14 @@ async def uniformize_proposal(
             return result
         
         finally:
-            # Nettoyer le fichier temporaire
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
+            # Libérer l'upload (tampon mémoire ou fichier temporaire de spooling)
+            if file:
+                await file.close()
     
     except HTTPException:
         raise
     except Exception as e:
+        _raise_if_rate_limited(e)
         print(f"❌ Erreur lors de l'harmonisation de la proposition: {str(e)}")
         raise HTTPException(
             status_code=500,
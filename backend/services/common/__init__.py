@@ -6,6 +6,8 @@ et les utilitaires de détection intelligente de contenu (avec IA)
 from .extract_infotel_colors import extract_colors_from_template, get_infotel_fonts
 from .file_type_detector import detect_file_purpose, get_content_preview, detect_content_intent
 from .ai_content_analyzer import analyze_content_with_ai
+from .llm_client import get_async_ai_client, create_chat_completion, close_ai_clients
+from .token_budget import count_tokens, fit_to_budget
 
 __all__ = [
     'extract_colors_from_template', 
@@ -13,6 +15,11 @@ __all__ = [
     'detect_file_purpose',
     'get_content_preview',
     'detect_content_intent',
-    'analyze_content_with_ai'
+    'analyze_content_with_ai',
+    'get_async_ai_client',
+    'create_chat_completion',
+    'close_ai_clients',
+    'count_tokens',
+    'fit_to_budget'
 ]
 
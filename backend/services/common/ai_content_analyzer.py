@@ -2,10 +2,10 @@
 Analyseur de contenu basé sur l'IA (GPT-5)
 Détecte intelligemment l'action la plus appropriée pour un document
 """
-import os
 import json
 from typing import Dict, Optional
-from openai import AzureOpenAI, OpenAI
+from services.common.llm_client import create_chat_completion, get_model_name, is_ai_configured
+from services.common.token_budget import clamp_output_tokens, pack_user_content_async
 
 # Prompt système pour l'analyse de contenu (Optimisé - Decision Tree Professional)
 CONTENT_ANALYSIS_PROMPT = """# EXPERT CONTENT ANALYZER - INTELLIGENT ACTION ROUTING
@@ -162,37 +162,10 @@ Content: "Bonjour test"
 You are NOT just a classifier. You are an intelligent routing engine that ensures each document reaches the RIGHT specialized agent for optimal processing.
 """
 
-def get_ai_client():
-    """Obtenir le client OpenAI ou Azure OpenAI"""
-    from services.common.http_client_helper import remove_proxy_env_vars, restore_proxy_env_vars
-    
-    old_proxies = remove_proxy_env_vars()
-    try:
-        # Vérifier Azure OpenAI
-        azure_endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
-        azure_key = os.getenv("AZURE_OPENAI_KEY")
-        azure_deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT")
-        
-        if azure_endpoint and azure_key:
-            return AzureOpenAI(
-                api_key=azure_key,
-                api_version="2024-02-15-preview",
-                azure_endpoint=azure_endpoint
-            ), azure_deployment
-        
-        # Repli sur OpenAI Direct
-        openai_key = os.getenv("OPENAI_API_KEY")
-        if openai_key:
-            return OpenAI(api_key=openai_key), os.getenv("AZURE_OPENAI_DEPLOYMENT")
-        
-        return None, None
-    finally:
-        restore_proxy_env_vars(old_proxies)
-
 async def analyze_content_with_ai(
     content: str,
     filename: Optional[str] = None,
-    max_content_length: int = 3000
+    max_content_tokens: int = 1000
 ) -> Dict:
     """
     Analyser le contenu avec l'IA pour suggérer l'action appropriée
@@ -200,7 +173,7 @@ async def analyze_content_with_ai(
     Args:
         content: Contenu à analyser (texte extrait du fichier)
         filename: Nom du fichier (optionnel, aide à la détection)
-        max_content_length: Longueur max du contenu à envoyer à l'IA
+        max_content_tokens: Nombre max de tokens du contenu envoyé à l'IA (détection rapide et peu coûteuse)
     
     Returns:
         {
@@ -214,18 +187,23 @@ async def analyze_content_with_ai(
     """
     
     try:
-        client, model = get_ai_client()
-        
-        if not client:
+        if not is_ai_configured():
             print("⚠️ Pas de service IA configuré, utilisation de la détection par mots-clés")
             return None
         
-        # Tronquer le contenu si trop long (garder début + fin)
-        if len(content) > max_content_length:
-            half = max_content_length // 2
-            content_to_analyze = content[:half] + "\n\n[... contenu tronqué ...]\n\n" + content[-half:]
-        else:
-            content_to_analyze = content
+        model = get_model_name()
+        
+        # Tronquer le contenu si trop long (garder début + fin), en tokens
+        max_output_tokens = clamp_output_tokens(500, model)
+        content_to_analyze, _ = await pack_user_content_async(
+            model,
+            CONTENT_ANALYSIS_PROMPT,
+            "{content}",
+            content,
+            max_output_tokens,
+            keep="head_tail",
+            max_content_tokens=max_content_tokens
+        )
         
         # Ajouter le nom du fichier au contexte si disponible
         context = f"**Nom du fichier:** {filename}\n\n**Contenu:**\n\n{content_to_analyze}" if filename else content_to_analyze
@@ -233,14 +211,13 @@ async def analyze_content_with_ai(
         print(f"🧠 Analyse IA du contenu ({len(content)} caractères)...")
         
         # Appeler GPT-5 pour analyser
-        response = client.chat.completions.create(
-            model=model,
+        response = await create_chat_completion(
             messages=[
                 {"role": "system", "content": CONTENT_ANALYSIS_PROMPT},
                 {"role": "user", "content": context}
             ],
             temperature=0.1,  # Faible température pour plus de cohérence
-            max_tokens=500,
+            max_tokens=max_output_tokens,
             response_format={"type": "json_object"}
         )
         
@@ -4,9 +4,91 @@ Suggère l'action la plus pertinente selon le contenu
 Supporte: fichiers, liens SharePoint, texte direct
 Utilise l'IA (GPT-5) pour une analyse avancée
 """
+import asyncio
 import re
 from typing import Dict, Optional
 from .ai_content_analyzer import analyze_content_with_ai, merge_ai_and_rule_based_detection
+from .keyword_matcher import KeywordMatcher
+from .intent_router import (
+    classify_locally,
+    llm_routing_enabled,
+    local_min_confidence,
+    log_routing_decision,
+    record_routing_tier,
+    routing_cache_version,
+    rules_min_confidence
+)
+from .result_cache import get_result_cache
+
+# Mots-clés RFP dans le nom de fichier
+RFP_FILENAME_KEYWORDS = [
+    'rfp', 'appel', 'offre', 'ao', 'consultation', 'marche', 'marché',
+    'tender', 'proposal', 'request for proposal', 'cahier', 'charges',
+    'cctp', 'dce', 'reglement', 'règlement'
+]
+
+# Mots-clés très spécifiques aux RFP (contenu d'un fichier)
+RFP_CONTENT_KEYWORDS = [
+    'marché public', "appel d'offres", 'date limite', 'critères de sélection',
+    'budget annuel', 'lot n°', 'pénalités', 'clause', 'article',
+    'soumissionnaire', 'candidat', 'offre', 'montant estimé',
+    'procédure', 'règlement de consultation', "acte d'engagement"
+]
+
+# Mots-clés suggérant un document technique (contenu d'un fichier) → Diagramme
+TECHNICAL_CONTENT_KEYWORDS = [
+    'architecture', 'infrastructure', 'schéma', 'diagramme',
+    'serveur', 'réseau', 'cloud', 'aws', 'azure', 'microservice',
+    'api', 'base de données', 'flux', 'composant', 'module'
+]
+
+# Indicateurs d'appel d'offres dans le contenu (score = nombre d'indicateurs présents)
+RFP_INDICATORS = [
+    'marché public', "appel d'offres", 'date limite de remise',
+    'critères de sélection', 'budget annuel', 'lot n°', 'lot 1',
+    'pénalités', 'clause', 'soumissionnaire', 'candidat',
+    'procédure', 'règlement de consultation', 'cctp', 'dce',
+    "acte d'engagement", 'dc1', 'dc2', 'noti', 'mapa'
+]
+
+TECHNICAL_INDICATORS = [
+    'architecture', 'infrastructure', 'diagramme', 'schéma',
+    'serveur', 'réseau', 'cloud', 'aws', 'azure', 'gcp',
+    'microservice', 'api', 'base de données', 'kubernetes',
+    'docker', 'composant', 'module', 'flux de données'
+]
+
+PRESENTATION_KEYWORDS = [
+    'présentation', 'powerpoint', 'slides', 'deck', 'ppt',
+    'créer une présentation', 'générer des slides', 'faire un deck'
+]
+
+RFP_REQUEST_KEYWORDS = [
+    'analyser', 'résumer', 'rfp', "appel d'offres", 'ao',
+    'analyse ce rfp', 'résume cet appel'
+]
+
+# Compilés une fois: le contenu est parcouru une seule fois pour toutes les catégories
+_FILENAME_MATCHER = KeywordMatcher({"rfp": RFP_FILENAME_KEYWORDS})
+_CONTENT_MATCHER = KeywordMatcher({
+    "file_rfp": RFP_CONTENT_KEYWORDS,
+    "file_technical": TECHNICAL_CONTENT_KEYWORDS,
+    "rfp": RFP_INDICATORS,
+    "technical": TECHNICAL_INDICATORS,
+    "presentation": PRESENTATION_KEYWORDS,
+    "rfp_request": RFP_REQUEST_KEYWORDS
+})
+
+# "AppelOffres_2024.pdf" → "Appel Offres_2024.pdf"
+_CAMEL_CASE = re.compile(r"(?<=[a-zà-ÿ])(?=[A-ZÀ-Ý])")
+
+def count_keywords(content: Optional[str]) -> Dict[str, int]:
+    """Nombre de mots-clés trouvés par catégorie (rfp, technical, presentation, rfp_request...)"""
+    return _CONTENT_MATCHER.count(content)
+
+def rfp_score(content: Optional[str]) -> int:
+    """Nombre d'indicateurs d'appel d'offres présents dans le contenu"""
+    return count_keywords(content)["rfp"] if content else 0
 
 def detect_file_purpose(filename: str, content_preview: Optional[str] = None) -> Dict[str, str]:
     """
@@ -21,8 +103,12 @@ def detect_file_purpose(filename: str, content_preview: Optional[str] = None) ->
         - suggested_action: L'action recommandée
         - suggestion_reason: Raison de la suggestion
         - filename: Nom du fichier
+        - confidence: 0.9 (indice précis), 0.6 (suggestion par défaut d'un document), 0.5 (aucune)
     """
-    
+    return _file_purpose(filename, count_keywords(content_preview) if content_preview else None)
+
+def _file_purpose(filename: str, keyword_counts: Optional[Dict[str, int]]) -> Dict[str, str]:
+    """detect_file_purpose à partir des mots-clés déjà comptés dans l'aperçu du contenu"""
     filename_lower = filename.lower()
     
     # Détection 1: Fichier PowerPoint → Harmoniser
@@ -30,58 +116,40 @@ def detect_file_purpose(filename: str, content_preview: Optional[str] = None) ->
         return {
             "suggested_action": "harmonize",
             "suggestion_reason": "💡 Ce fichier PowerPoint peut être harmonisé selon la charte Infotel 2025",
-            "filename": filename
+            "filename": filename,
+            "confidence": 0.9
         }
     
     # Détection 2: Nom de fichier contient "RFP", "AO", "Appel d'offres", etc.
-    rfp_keywords = [
-        'rfp', 'appel', 'offre', 'ao', 'consultation', 'marche', 'marché',
-        'tender', 'proposal', 'request for proposal', 'cahier', 'charges',
-        'cctp', 'dce', 'reglement', 'règlement'
-    ]
-    
-    if any(keyword in filename_lower for keyword in rfp_keywords):
+    if _FILENAME_MATCHER.count(_CAMEL_CASE.sub(" ", filename))["rfp"]:
         return {
             "suggested_action": "summarize",
             "suggestion_reason": "💡 Ce document semble être un appel d'offres (RFP). Je peux l'analyser pour vous.",
-            "filename": filename
+            "filename": filename,
+            "confidence": 0.9
         }
     
     # Détection 3: Contenu suggère un RFP
-    if content_preview:
-        content_lower = content_preview.lower()
-        
-        # Mots-clés très spécifiques aux RFP
-        rfp_content_keywords = [
-            'marché public', "appel d'offres", 'date limite', 'critères de sélection',
-            'budget annuel', 'lot n°', 'pénalités', 'clause', 'article',
-            'soumissionnaire', 'candidat', 'offre', 'montant estimé',
-            'procédure', 'règlement de consultation', "acte d'engagement"
-        ]
-        
-        matches = sum(1 for keyword in rfp_content_keywords if keyword in content_lower)
+    if keyword_counts:
+        matches = keyword_counts["file_rfp"]
         
         if matches >= 3:  # Si au moins 3 mots-clés RFP trouvés
             return {
                 "suggested_action": "summarize",
                 "suggestion_reason": f"💡 Le contenu contient {matches} indicateurs d'appel d'offres. Analyse recommandée.",
-                "filename": filename
+                "filename": filename,
+                "confidence": 0.9
             }
         
         # Mots-clés suggérant un document technique → Diagramme
-        technical_keywords = [
-            'architecture', 'infrastructure', 'schéma', 'diagramme', 
-            'serveur', 'réseau', 'cloud', 'aws', 'azure', 'microservice',
-            'api', 'base de données', 'flux', 'composant', 'module'
-        ]
-        
-        tech_matches = sum(1 for keyword in technical_keywords if keyword in content_lower)
+        tech_matches = keyword_counts["file_technical"]
         
         if tech_matches >= 3:
             return {
                 "suggested_action": "diagram",
                 "suggestion_reason": f"💡 Document technique détecté. Un diagramme d'architecture pourrait être utile.",
-                "filename": filename
+                "filename": filename,
+                "confidence": 0.9
             }
     
     # Détection 4: Fichiers texte génériques → Présentation
@@ -89,36 +157,38 @@ def detect_file_purpose(filename: str, content_preview: Optional[str] = None) ->
         return {
             "suggested_action": "deck",
             "suggestion_reason": "💡 Je peux transformer ce document en présentation PowerPoint professionnelle.",
-            "filename": filename
+            "filename": filename,
+            # Suggestion par défaut d'un document: le classifieur local peut la préciser
+            "confidence": 0.6
         }
     
     # Fallback: Aucune suggestion spécifique
     return {
         "suggested_action": None,
         "suggestion_reason": "Choisissez l'action qui convient le mieux à votre besoin.",
-        "filename": filename
+        "filename": filename,
+        "confidence": 0.5
     }
 
-def get_content_preview(file_path: str, max_chars: int = 2000) -> str:
+def get_content_preview(source, max_chars: int = 2000, filename: Optional[str] = None) -> str:
     """
     Obtenir un aperçu du contenu d'un fichier pour analyse
     
     Args:
-        file_path: Chemin vers le fichier
+        source: Chemin vers le fichier, contenu (bytes) ou fichier binaire ouvert
         max_chars: Nombre maximum de caractères à lire
+        filename: Nom du fichier (obligatoire si source n'est pas un chemin)
     
     Returns:
         Aperçu du contenu
     """
     try:
-        from services.rfp_summarizer import extract_text_from_file
+        from services.rfp_summarizer.file_extractor import extract_text_preview
         import os
         
-        filename = os.path.basename(file_path)
-        full_text = extract_text_from_file(file_path, filename)
-        
-        # Retourner juste les premiers caractères
-        return full_text[:max_chars] if full_text else ""
+        filename = filename or os.path.basename(source)
+        # Extraction arrêtée dès que max_chars caractères sont lus (premières pages seulement)
+        return extract_text_preview(source, filename, max_chars) or ""
     
     except Exception as e:
         print(f"Erreur lors de l'aperçu du fichier: {str(e)}")
@@ -134,7 +204,8 @@ async def detect_content_intent(
     """
     Détection intelligente universelle de l'intention utilisateur
     Fonctionne avec: texte direct, fichiers uploadés, liens SharePoint
-    Utilise l'IA (GPT-5) pour une analyse avancée si disponible
+    Routage par niveaux (intent_router): décision en cache, règles, classifieur local,
+    puis l'IA (GPT-5) seulement si aucun niveau précédent n'est assez sûr
     
     Args:
         text: Texte tapé par l'utilisateur (ou None)
@@ -150,14 +221,94 @@ async def detect_content_intent(
             "suggestion_reason": "Raison de la suggestion",
             "confidence": 0.0-1.0,  # Confiance dans la suggestion
             "alternative_actions": ["action2", "action3"],  # Actions alternatives
-            "detection_method": "ai" | "rules" | "ai_moderate" | "rules_fallback",
-            "ai_powered": True | False
+            "detection_method": "ai" | "rules" | "ai_moderate" | "rules_fallback" | "local",
+            "ai_powered": True | False,
+            "routing_tier": "cache" | "rules" | "local" | "llm" | "fallback"
         }
     """
     
     # Analyse du contenu disponible
     analysis_content = content_preview or text or ""
     
+    # Niveau 0: décision déjà prise pour ce contenu
+    cache = get_result_cache("routing")
+    # Version du modèle local lue sur disque: hors de la boucle d'événements
+    cache_key = cache.make_key(await asyncio.to_thread(routing_cache_version), str(is_sharepoint_link), filename, analysis_content, str(use_ai))
+    cached = await cache.get(cache_key)
+    if cached is not None:
+        record_routing_tier("cache")
+        cached["routing_tier"] = "cache"
+        return cached
+    
+    result = await _route(analysis_content, filename, is_sharepoint_link, content_preview, use_ai)
+    record_routing_tier(result["routing_tier"])
+    if result["routing_tier"] != "fallback":
+        await cache.set(cache_key, result)
+    return result
+
+async def _route(
+    analysis_content: str,
+    filename: Optional[str],
+    is_sharepoint_link: bool,
+    content_preview: Optional[str],
+    use_ai: bool
+) -> Dict[str, any]:
+    """Règles, puis classifieur local, puis IA: le premier niveau assez sûr décide"""
+    rule_based_result = _detect_with_rules(analysis_content, filename, is_sharepoint_link, content_preview)
+    action = rule_based_result["suggested_action"]
+    
+    # Niveau 1: règles décisives (un fichier sans texte est toujours routé par les règles)
+    if (filename and not analysis_content) or (action and rule_based_result["confidence"] >= rules_min_confidence()):
+        rule_based_result["routing_tier"] = "rules"
+        return rule_based_result
+    
+    # Niveau 2: classifieur local entraîné sur les décisions journalisées
+    if analysis_content:
+        local_action, local_confidence = await asyncio.to_thread(classify_locally, analysis_content, filename)
+        # ROUTER_USE_LLM=0: le classifieur local remplace l'IA, quelle que soit sa confiance
+        if local_action and (local_confidence >= local_min_confidence() or not llm_routing_enabled()):
+            print(f"🧮 Classifieur local: {local_action} (confiance: {local_confidence:.0%}), IA non sollicitée")
+            return {
+                **rule_based_result,
+                "suggested_action": local_action,
+                "suggestion_reason": f"💡 Détecté: contenu proche de documents déjà routés vers « {local_action} ».",
+                "confidence": round(local_confidence, 3),
+                "alternative_actions": _get_alternative_actions(local_action),
+                "detection_method": "local",
+                "ai_powered": False,
+                "routing_tier": "local"
+            }
+    
+    # Niveau 3: IA, si ET use_ai=True ET qu'on a du contenu à analyser (texte ou lien, pas un fichier)
+    if use_ai and llm_routing_enabled() and not filename and analysis_content and len(analysis_content) > 50:
+        print(f"🧠 Analyse IA activée pour améliorer la détection...")
+        ai_result = await analyze_content_with_ai(
+            content=analysis_content,
+            filename=filename
+        )
+        
+        if ai_result:
+            # Fusionner les résultats IA + règles
+            result = merge_ai_and_rule_based_detection(ai_result, rule_based_result)
+            result["routing_tier"] = "llm"
+            if result.get("detection_method") == "ai":
+                log_routing_decision(analysis_content, filename, result["suggested_action"], "llm", result["confidence"])
+            return result
+    
+    # Pas d'IA ou contenu trop court - retourner détection par règles
+    rule_based_result["detection_method"] = "rules"
+    rule_based_result["ai_powered"] = False
+    rule_based_result["routing_tier"] = "fallback"
+    return rule_based_result
+
+def _detect_with_rules(
+    analysis_content: str,
+    filename: Optional[str],
+    is_sharepoint_link: bool,
+    content_preview: Optional[str]
+) -> Dict[str, any]:
+    """Détection par mots-clés (fichier, puis contenu)"""
+    
     # Déterminer le type d'input
     if is_sharepoint_link:
         input_type = "sharepoint"
@@ -169,11 +320,14 @@ async def detect_content_intent(
         input_type = "text"
         source_info = "texte direct"
     
+    # Tous les mots-clés comptés en une seule passe sur le contenu
+    keyword_counts = count_keywords(analysis_content) if analysis_content else None
+    
     # Si c'est un fichier, utiliser la détection spécifique au fichier
     if filename:
-        file_detection = detect_file_purpose(filename, content_preview)
+        file_detection = _file_purpose(filename, keyword_counts if content_preview else None)
         
-        confidence = 0.9 if file_detection["suggested_action"] else 0.5
+        confidence = file_detection["confidence"]
         
         return {
             "input_type": input_type,
@@ -181,43 +335,28 @@ async def detect_content_intent(
             "suggestion_reason": file_detection.get("suggestion_reason"),
             "confidence": confidence,
             "alternative_actions": _get_alternative_actions(file_detection.get("suggested_action")),
-            "source_info": source_info
+            "source_info": source_info,
+            "rfp_score": keyword_counts["rfp"] if content_preview else 0
         }
     
     # Analyse du texte direct ou contenu SharePoint
     if analysis_content:
-        content_lower = analysis_content.lower()
-        
         # Détection 1: RFP / Appel d'offres (haute priorité)
-        rfp_indicators = [
-            'marché public', "appel d'offres", 'date limite de remise',
-            'critères de sélection', 'budget annuel', 'lot n°', 'lot 1',
-            'pénalités', 'clause', 'soumissionnaire', 'candidat',
-            'procédure', 'règlement de consultation', 'cctp', 'dce',
-            "acte d'engagement", 'dc1', 'dc2', 'noti', 'mapa'
-        ]
+        score = keyword_counts["rfp"]
         
-        rfp_score = sum(1 for indicator in rfp_indicators if indicator in content_lower)
-        
-        if rfp_score >= 3:
+        if score >= 3:
             return {
                 "input_type": input_type,
                 "suggested_action": "summarize",
-                "suggestion_reason": f"💡 Détecté: Appel d'offres ({rfp_score} indicateurs trouvés). Analyse RFP recommandée.",
-                "confidence": min(0.95, 0.5 + (rfp_score * 0.1)),
+                "suggestion_reason": f"💡 Détecté: Appel d'offres ({score} indicateurs trouvés). Analyse RFP recommandée.",
+                "confidence": min(0.95, 0.5 + (score * 0.1)),
                 "alternative_actions": ["deck", "diagram"],
-                "source_info": source_info
+                "source_info": source_info,
+                "rfp_score": score
             }
         
         # Détection 2: Contenu technique / Architecture
-        technical_indicators = [
-            'architecture', 'infrastructure', 'diagramme', 'schéma',
-            'serveur', 'réseau', 'cloud', 'aws', 'azure', 'gcp',
-            'microservice', 'api', 'base de données', 'kubernetes',
-            'docker', 'composant', 'module', 'flux de données'
-        ]
-        
-        tech_score = sum(1 for indicator in technical_indicators if indicator in content_lower)
+        tech_score = keyword_counts["technical"]
         
         if tech_score >= 3:
             return {
@@ -230,12 +369,7 @@ async def detect_content_intent(
             }
         
         # Détection 3: Demande de présentation explicite
-        presentation_keywords = [
-            'présentation', 'powerpoint', 'slides', 'deck', 'ppt',
-            'créer une présentation', 'générer des slides', 'faire un deck'
-        ]
-        
-        if any(keyword in content_lower for keyword in presentation_keywords):
+        if keyword_counts["presentation"]:
             return {
                 "input_type": input_type,
                 "suggested_action": "deck",
@@ -246,12 +380,7 @@ async def detect_content_intent(
             }
         
         # Détection 4: Demande explicite d'analyse RFP
-        rfp_request_keywords = [
-            'analyser', 'résumer', 'rfp', "appel d'offres", 'ao',
-            'analyse ce rfp', 'résume cet appel'
-        ]
-        
-        if any(keyword in content_lower for keyword in rfp_request_keywords):
+        if keyword_counts["rfp_request"]:
             return {
                 "input_type": input_type,
                 "suggested_action": "summarize",
@@ -272,8 +401,8 @@ async def detect_content_intent(
                 "source_info": source_info
             }
     
-    # Détection par règles terminée
-    rule_based_result = {
+    # Détection par règles terminée, sans suggestion
+    return {
         "input_type": input_type,
         "suggested_action": None,
         "suggestion_reason": "Choisissez l'action qui convient le mieux à votre besoin.",
@@ -281,23 +410,6 @@ async def detect_content_intent(
         "alternative_actions": ["summarize", "deck", "diagram", "harmonize"],
         "source_info": source_info
     }
-    
-    # Si use_ai=True ET qu'on a du contenu à analyser, utiliser l'IA
-    if use_ai and analysis_content and len(analysis_content) > 50:
-        print(f"🧠 Analyse IA activée pour améliorer la détection...")
-        ai_result = await analyze_content_with_ai(
-            content=analysis_content,
-            filename=filename
-        )
-        
-        if ai_result:
-            # Fusionner les résultats IA + règles
-            return merge_ai_and_rule_based_detection(ai_result, rule_based_result)
-    
-    # Pas d'IA ou contenu trop court - retourner détection par règles
-    rule_based_result["detection_method"] = "rules"
-    rule_based_result["ai_powered"] = False
-    return rule_based_result
 
 def _get_alternative_actions(suggested_action: Optional[str]) -> list:
     """Obtenir les actions alternatives basées sur la suggestion"""
@@ -1,7 +1,9 @@
 """
-Helper pour supprimer les proxies de l'environnement avant de créer des clients OpenAI
+Helper pour créer les clients HTTP utilisés par les clients OpenAI
+Les clients sont créés sans proxies (trust_env=False) et avec un pool de connexions keep-alive
 """
 import os
+import httpx
 
 def remove_proxy_env_vars():
     """Supprime les variables de proxy de l'environnement et retourne les valeurs sauvegardées"""
@@ -17,13 +19,56 @@ def restore_proxy_env_vars(old_proxies):
     for key, value in old_proxies.items():
         os.environ[key] = value
 
-def create_http_client():
-    """Crée un client HTTP synchrone sans proxies - désactivé, on laisse OpenAI créer son propre client"""
-    # On ne crée plus de client ici, on laisse OpenAI en créer un après avoir supprimé les proxies
-    return None
+def _http2_enabled() -> bool:
+    """HTTP/2 activé si LLM_HTTP2 le demande et si le paquet h2 est installé (négociation ALPN, repli HTTP/1.1)"""
+    setting = os.getenv("LLM_HTTP2", "auto").lower()
+    if setting in ("0", "false", "no", "off"):
+        return False
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        if setting in ("1", "true", "yes", "on"):
+            print("⚠️ LLM_HTTP2 activé mais le paquet 'h2' n'est pas installé, repli sur HTTP/1.1")
+        return False
 
-def create_async_http_client():
-    """Crée un client HTTP asynchrone sans proxies - désactivé, on laisse OpenAI créer son propre client"""
-    # On ne crée plus de client ici, on laisse OpenAI en créer un après avoir supprimé les proxies
-    return None
+def get_http_pool_config() -> dict:
+    """
+    Configuration du pool de connexions vers le service IA (variables d'environnement)
 
+    - LLM_HTTP_MAX_CONNECTIONS: connexions simultanées max (défaut 100)
+    - LLM_HTTP_MAX_KEEPALIVE: connexions keep-alive conservées (défaut 20)
+    - LLM_HTTP_KEEPALIVE_EXPIRY: durée de vie d'une connexion inactive en secondes (défaut 120)
+    - LLM_HTTP_TIMEOUT: timeout de lecture en secondes (défaut 180)
+    - LLM_HTTP_CONNECT_TIMEOUT: timeout de connexion en secondes (défaut 10)
+    - LLM_HTTP2: "auto" (défaut), "true" ou "false"
+    """
+    return {
+        "max_connections": int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "100")),
+        "max_keepalive_connections": int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "20")),
+        "keepalive_expiry": float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "120")),
+        "timeout": float(os.getenv("LLM_HTTP_TIMEOUT", "180")),
+        "connect_timeout": float(os.getenv("LLM_HTTP_CONNECT_TIMEOUT", "10")),
+        "http2": _http2_enabled()
+    }
+
+def _client_kwargs() -> dict:
+    config = get_http_pool_config()
+    return {
+        "limits": httpx.Limits(
+            max_connections=config["max_connections"],
+            max_keepalive_connections=config["max_keepalive_connections"],
+            keepalive_expiry=config["keepalive_expiry"]
+        ),
+        "timeout": httpx.Timeout(config["timeout"], connect=config["connect_timeout"]),
+        "http2": config["http2"],
+        "trust_env": False  # Ignorer les proxies de l'environnement
+    }
+
+def create_http_client() -> httpx.Client:
+    """Crée un client HTTP synchrone sans proxies, avec pool de connexions keep-alive"""
+    return httpx.Client(**_client_kwargs())
+
+def create_async_http_client() -> httpx.AsyncClient:
+    """Crée un client HTTP asynchrone sans proxies, avec pool de connexions keep-alive"""
+    return httpx.AsyncClient(**_client_kwargs())
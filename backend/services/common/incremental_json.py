@@ -0,0 +1,151 @@
+"""
+Parseur JSON incrémental pour les réponses IA en streaming
+Reçoit le texte morceau par morceau et restitue chaque membre de premier niveau
+de l'objet racine dès qu'il est complet (ex: "informations_generales", "lots", "calendrier"),
+sans attendre la fin de la génération.
+
+Les objets inachevés sont tolérés: un membre n'est restitué que lorsque sa valeur
+est fermée, et finish() répare une sortie tronquée (chaînes et crochets non fermés).
+"""
+import json
+from typing import Any, Dict, List, Tuple
+
+_CLOSING = {"{": "}", "[": "]"}
+
+
+class IncrementalJSONParser:
+    """
+    Suivi d'un objet JSON racine en cours de génération
+
+    Usage:
+        parser = IncrementalJSONParser()
+        for delta in stream:
+            for key, value in parser.feed(delta):
+                ...  # section complète
+        result = parser.finish()
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self._position = 0
+        self._stack = []           # Crochets ouverts ("{" ou "[")
+        self._in_string = False
+        self._escaped = False
+        self._string_start = None  # Début de la chaîne courante (clés de premier niveau)
+        self._expect_key = False   # Prochaine chaîne de niveau 1 = clé
+        self._current_key = None
+        self._value_start = None
+        self.completed = {}
+        self.repaired = False      # True si finish() a dû réparer une sortie tronquée
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        """
+        Ajouter un morceau de texte
+
+        Returns:
+            Liste des membres de premier niveau terminés dans ce morceau: [(clé, valeur), ...]
+        """
+        self.buffer += text
+        members = []
+
+        while self._position < len(self.buffer):
+            index = self._position
+            char = self.buffer[index]
+            self._position += 1
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._string_start is not None:
+                        self._current_key = json.loads(self.buffer[self._string_start:index + 1])
+                        self._string_start = None
+                    elif len(self._stack) == 1 and self._value_start is not None:
+                        # Valeur chaîne de premier niveau: terminée à la fermeture des guillemets
+                        members.extend(self._complete_member(index + 1))
+                continue
+
+            depth = len(self._stack)
+
+            if char == '"':
+                self._in_string = True
+                if depth == 1 and self._expect_key:
+                    self._string_start = index
+                    self._expect_key = False
+                elif depth == 1 and self._value_start is None and self._current_key is not None:
+                    self._value_start = index
+            elif char in _CLOSING:
+                if depth == 1 and self._value_start is None and self._current_key is not None:
+                    self._value_start = index
+                self._stack.append(char)
+                if len(self._stack) == 1:
+                    self._expect_key = True
+            elif char in ("}", "]"):
+                if self._stack:
+                    self._stack.pop()
+                if len(self._stack) == 1 and self._value_start is not None:
+                    # Objet ou tableau de premier niveau refermé
+                    members.extend(self._complete_member(index + 1))
+                elif not self._stack and self._value_start is not None:
+                    # Fin de l'objet racine juste après une valeur simple
+                    members.extend(self._complete_member(index))
+            elif depth == 1:
+                if char == ",":
+                    if self._value_start is not None:
+                        members.extend(self._complete_member(index))
+                    self._expect_key = True
+                elif char == ":" or char.isspace():
+                    pass
+                elif self._value_start is None and self._current_key is not None:
+                    # Début d'une valeur simple (nombre, true, false, null)
+                    self._value_start = index
+
+        return members
+
+    def _complete_member(self, end: int) -> List[Tuple[str, Any]]:
+        raw = self.buffer[self._value_start:end].strip()
+        key = self._current_key
+        self._value_start = None
+        self._current_key = None
+        if not raw:
+            return []
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            return []
+        self.completed[key] = value
+        return [(key, value)]
+
+    def finish(self) -> Dict:
+        """
+        Objet complet en fin de flux
+
+        Si la sortie est tronquée (limite de tokens, coupure réseau), les chaînes
+        et crochets ouverts sont refermés; à défaut, les membres déjà complets sont retournés.
+        Dans les deux cas, repaired indique que le résultat est partiel.
+        """
+        text = self.buffer.strip()
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            pass
+
+        self.repaired = True
+        repaired = text
+        if self._in_string:
+            repaired += '"'
+        repaired = repaired.rstrip().rstrip(",")
+        if repaired.endswith(":"):
+            repaired += "null"
+        repaired += "".join(_CLOSING[bracket] for bracket in reversed(self._stack))
+        try:
+            result = json.loads(repaired)
+            if isinstance(result, dict):
+                return result
+        except json.JSONDecodeError:
+            pass
+
+        return dict(self.completed)
@@ -0,0 +1,185 @@
+"""
+Fichiers ingérés une seule fois, réutilisables par toutes les actions (file_id)
+POST /ingest enregistre l'upload, en extrait et normalise le texte, puis renvoie un file_id:
+/summarizeRfp, /generateDeckFromText, /generateDiagramFromText et /uniformizeProposal
+l'acceptent à la place d'un nouvel upload (le fichier ne traverse le réseau et n'est parsé qu'une fois).
+
+- generated_files/ingested/{file_id}{ext}: fichier d'origine
+- generated_files/ingested/{file_id}.normalized.txt: texte extrait et normalisé (documents)
+- generated_files/ingested/{file_id}.json: nom, taille, SHA-256, action suggérée, actions demandées...
+
+Les fichiers expirent après INGEST_TTL_HOURS heures (défaut: 24), comptées depuis l'ingestion (created_at):
+/cleanup supprime ensemble les trois fichiers d'un file_id expiré.
+"""
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from typing import BinaryIO, Dict, List, Optional
+
+INGEST_DIR = os.path.join("generated_files", "ingested")
+
+_FILE_ID_PATTERN = re.compile(r"^[0-9a-f]{12}$")
+
+_actions_lock = threading.Lock()
+
+
+def _ingest_ttl() -> float:
+    return float(os.getenv("INGEST_TTL_HOURS", "24")) * 3600
+
+
+def _paths(file_id: str, extension: str = "") -> Dict[str, str]:
+    base = os.path.join(INGEST_DIR, file_id)
+    return {"file": f"{base}{extension}", "text": f"{base}.normalized.txt", "meta": f"{base}.json"}
+
+
+def save_ingested_file(stream: BinaryIO, filename: str, sha256: Optional[str] = None) -> Dict:
+    """
+    Enregistrer un upload (flux binaire, ex: UploadFile.file)
+
+    Returns:
+        Métadonnées du fichier ingéré (file_id, filename, extension, size, sha256, created_at)
+    """
+    file_id = uuid.uuid4().hex[:12]
+    extension = os.path.splitext(filename.lower())[1]
+    paths = _paths(file_id, extension)
+    os.makedirs(INGEST_DIR, exist_ok=True)
+
+    if stream.seekable():
+        stream.seek(0)
+    with open(paths["file"], "wb") as f:
+        shutil.copyfileobj(stream, f, 1024 * 1024)
+
+    record = {
+        "file_id": file_id,
+        "filename": filename,
+        "extension": extension,
+        "size": os.path.getsize(paths["file"]),
+        "sha256": sha256,
+        "created_at": time.time()
+    }
+    _write_meta(record)
+    return record
+
+
+def _write_meta(record: Dict):
+    with open(_paths(record["file_id"])["meta"], "w", encoding="utf-8") as f:
+        json.dump(record, f, ensure_ascii=False)
+
+
+def update_ingested_file(record: Dict, text: Optional[str] = None, **fields) -> Dict:
+    """Compléter les métadonnées (action suggérée...) et enregistrer le texte normalisé"""
+    if text is not None:
+        with open(_paths(record["file_id"])["text"], "w", encoding="utf-8") as f:
+            f.write(text)
+        fields["text_length"] = len(text)
+    record.update(fields)
+    _write_meta(record)
+    return record
+
+
+def load_ingested_file(file_id: str) -> Optional[Dict]:
+    """
+    Métadonnées d'un fichier ingéré, avec son chemin (path)
+
+    Returns:
+        None si le file_id est inconnu, invalide ou expiré
+    """
+    if not file_id or not _FILE_ID_PATTERN.match(file_id):
+        return None
+    try:
+        with open(_paths(file_id)["meta"], "r", encoding="utf-8") as f:
+            record = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if time.time() - record["created_at"] > _ingest_ttl():
+        delete_ingested_file(file_id, record.get("extension", ""))
+        return None
+
+    record["path"] = _paths(file_id, record["extension"])["file"]
+    if not os.path.exists(record["path"]):
+        # Fichier d'origine supprimé (nettoyage manuel...): les restes du file_id sont retirés
+        delete_ingested_file(file_id, record["extension"])
+        return None
+    return record
+
+
+def mark_ingested_action(file_id: str, action: str) -> bool:
+    """
+    Enregistrer une action demandée pour un fichier ingéré (actions)
+
+    Returns:
+        True à la première demande de cette action pour ce fichier, False ensuite
+        (nouvelle tentative du client, action relancée) ou si le fichier est inconnu
+    """
+    with _actions_lock:
+        record = load_ingested_file(file_id)
+        if record is None or action in record.get("actions", []):
+            return False
+        record.pop("path", None)
+        record["actions"] = record.get("actions", []) + [action]
+        _write_meta(record)
+        return True
+
+
+def read_ingested_text(record: Dict) -> Optional[str]:
+    """Texte normalisé enregistré à l'ingestion (None pour les fichiers sans texte, ex: PowerPoint)"""
+    try:
+        with open(_paths(record["file_id"])["text"], "r", encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def find_expired_ingested_files(max_age_seconds: Optional[float] = None) -> List[Dict]:
+    """
+    Fichiers ingérés expirés, regroupés par file_id (fichier d'origine, texte et métadonnées ensemble)
+
+    L'âge est compté depuis l'ingestion (created_at): les métadonnées réécrites à chaque action
+    demandée ne survivent pas au fichier. Sans métadonnées lisibles (ingestion interrompue),
+    l'âge est celui du fichier le plus récent du groupe.
+
+    Args:
+        max_age_seconds: Âge maximum (défaut: INGEST_TTL_HOURS)
+
+    Returns:
+        Liste de {"file_id", "paths" (métadonnées en dernier), "age_hours"}
+    """
+    max_age = _ingest_ttl() if max_age_seconds is None else max_age_seconds
+    try:
+        names = os.listdir(INGEST_DIR)
+    except OSError:
+        return []
+
+    groups: Dict[str, List[str]] = {}
+    for name in names:
+        groups.setdefault(name.split(".", 1)[0], []).append(os.path.join(INGEST_DIR, name))
+
+    now = time.time()
+    expired = []
+    for file_id, paths in groups.items():
+        meta = _paths(file_id)["meta"]
+        try:
+            with open(meta, "r", encoding="utf-8") as f:
+                created_at = float(json.load(f)["created_at"])
+        except (OSError, ValueError, KeyError, TypeError):
+            mtimes = [os.path.getmtime(path) for path in paths if os.path.exists(path)]
+            if not mtimes:
+                continue
+            created_at = max(mtimes)
+        if now - created_at > max_age:
+            paths.sort(key=lambda path: path == meta)
+            expired.append({"file_id": file_id, "paths": paths, "age_hours": (now - created_at) / 3600})
+    return expired
+
+
+def delete_ingested_file(file_id: str, extension: str = ""):
+    for path in _paths(file_id, extension).values():
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,227 @@
+"""
+Classifieur d'intention local: TF-IDF + régression logistique multinomiale
+Alternative locale à analyze_content_with_ai pour choisir l'action (summarize, deck, diagram, harmonize):
+- entraîné hors ligne (backend/train_intent_classifier.py) sur le journal de routage:
+  décisions sûres de l'IA et actions réellement choisies par les utilisateurs
+  (une action choisie remplace l'étiquette d'un même contenu journalisée avant elle)
+- modèle JSON (vocabulaire, idf, poids) chargé une fois, rechargé s'il est réentraîné
+- prédiction dans le processus, sans appel réseau (moins d'une milliseconde sur un aperçu)
+- pur Python, sans dépendance (pas de scikit-learn)
+
+Variables d'environnement:
+- INTENT_MODEL_PATH: modèle entraîné (défaut: cache/intent_classifier.json)
+"""
+import json
+import math
+import os
+import random
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .routing_log import TRAINING_TIERS, routing_features
+
+MODEL_VERSION = 1
+
+_model_lock = threading.Lock()
+_model = None
+_model_mtime = None
+
+
+def intent_model_path() -> str:
+    return os.getenv("INTENT_MODEL_PATH", os.path.join("cache", "intent_classifier.json"))
+
+
+class IntentClassifier:
+    """Vecteurs TF-IDF (tf logarithmique, normalisés L2) et poids d'une régression logistique par action"""
+
+    def __init__(self, classes: List[str], idf: Dict[str, float], weights: Dict[str, List[float]],
+                 bias: List[float], metadata: Optional[Dict] = None):
+        self.classes = classes
+        self.idf = idf
+        self.weights = weights
+        self.bias = bias
+        self.metadata = metadata or {}
+
+    def vectorize(self, features: Iterable[str]) -> Dict[str, float]:
+        counts = Counter(feature for feature in features if feature in self.idf)
+        vector = {term: (1.0 + math.log(count)) * self.idf[term] for term, count in counts.items()}
+        norm = math.sqrt(sum(value * value for value in vector.values()))
+        return {term: value / norm for term, value in vector.items()} if norm else {}
+
+    def _probabilities(self, vector: Dict[str, float]) -> List[float]:
+        scores = list(self.bias)
+        for term, value in vector.items():
+            for index, weight in enumerate(self.weights[term]):
+                scores[index] += weight * value
+        top = max(scores)
+        exps = [math.exp(score - top) for score in scores]
+        total = sum(exps)
+        return [value / total for value in exps]
+
+    def predict_proba(self, content: str, filename: Optional[str] = None) -> Dict[str, float]:
+        """Probabilité de chaque action"""
+        probabilities = self._probabilities(self.vectorize(routing_features(content, filename)))
+        return dict(zip(self.classes, probabilities))
+
+    def predict(self, content: str, filename: Optional[str] = None) -> Tuple[Optional[str], float]:
+        """(action la plus probable, probabilité)"""
+        probabilities = self.predict_proba(content, filename)
+        action = max(probabilities, key=probabilities.get)
+        return action, probabilities[action]
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": MODEL_VERSION,
+            "classes": self.classes,
+            "idf": self.idf,
+            "weights": self.weights,
+            "bias": self.bias,
+            "metadata": self.metadata
+        }
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+        # Remplacement atomique: un serveur en cours de rechargement ne lit jamais un fichier partiel
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "IntentClassifier":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != MODEL_VERSION:
+            raise ValueError(f"Version de modèle non supportée: {data.get('version')}")
+        return cls(data["classes"], data["idf"], data["weights"], data["bias"], data.get("metadata"))
+
+
+def load_routing_examples(path: str) -> List[Dict]:
+    """
+    Exemples étiquetés par l'IA ou l'utilisateur dans le journal de routage (content, filename, action, tier)
+    Pour un même contenu, la dernière étiquette l'emporte (ex: action choisie par l'utilisateur
+    après une suggestion de l'IA). Les décisions des règles sont ignorées.
+    """
+    examples = {}
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get("action") and entry.get("content") and entry.get("tier") in TRAINING_TIERS:
+                key = (entry["content"], entry.get("filename"))
+                examples.pop(key, None)
+                examples[key] = {
+                    "content": entry["content"],
+                    "filename": entry.get("filename"),
+                    "action": entry["action"],
+                    "tier": entry["tier"]
+                }
+    return list(examples.values())
+
+
+def train_intent_classifier(
+    examples: List[Dict],
+    epochs: int = 30,
+    learning_rate: float = 0.5,
+    l2: float = 1e-4,
+    min_df: int = 2,
+    max_features: int = 20000,
+    seed: int = 0
+) -> IntentClassifier:
+    """
+    Entraîner le classifieur (descente de gradient stochastique sur l'entropie croisée)
+
+    Args:
+        examples: Dicts avec content, filename (optionnel) et action
+        min_df: Nombre minimum d'exemples contenant un terme pour l'intégrer au vocabulaire
+        max_features: Taille max du vocabulaire (termes les plus fréquents)
+    """
+    if not examples:
+        raise ValueError("Aucun exemple d'entraînement")
+    started = time.perf_counter()
+    classes = sorted({example["action"] for example in examples})
+    class_index = {action: index for index, action in enumerate(classes)}
+    documents = [routing_features(example["content"], example.get("filename")) for example in examples]
+
+    document_frequency = Counter()
+    for features in documents:
+        document_frequency.update(set(features))
+    vocabulary = [term for term, count in document_frequency.most_common(max_features) if count >= min_df]
+    total = len(documents)
+    idf = {term: math.log((1 + total) / (1 + document_frequency[term])) + 1.0 for term in vocabulary}
+
+    model = IntentClassifier(classes, idf, {term: [0.0] * len(classes) for term in vocabulary}, [0.0] * len(classes))
+    samples = [(model.vectorize(features), class_index[example["action"]]) for features, example in zip(documents, examples)]
+
+    rng = random.Random(seed)
+    for epoch in range(epochs):
+        rng.shuffle(samples)
+        rate = learning_rate / (1.0 + epoch * 0.1)
+        for vector, target in samples:
+            probabilities = model._probabilities(vector)
+            gradients = [probability - (1.0 if index == target else 0.0) for index, probability in enumerate(probabilities)]
+            for index, gradient in enumerate(gradients):
+                model.bias[index] -= rate * gradient
+            # Mise à jour creuse: seuls les termes présents dans l'exemple
+            for term, value in vector.items():
+                weights = model.weights[term]
+                for index, gradient in enumerate(gradients):
+                    weights[index] -= rate * (gradient * value + l2 * weights[index])
+
+    model.metadata = {
+        "examples": total,
+        "classes": dict(Counter(example["action"] for example in examples)),
+        "vocabulary": len(vocabulary),
+        "epochs": epochs,
+        "trained_at": time.time(),
+        "training_seconds": round(time.perf_counter() - started, 2)
+    }
+    return model
+
+
+def evaluate_intent_classifier(model: IntentClassifier, examples: List[Dict]) -> Dict:
+    """Exactitude et latence de prédiction sur des exemples étiquetés (jeu de test)"""
+    correct = 0
+    latencies = []
+    for example in examples:
+        started = time.perf_counter()
+        action, _ = model.predict(example["content"], example.get("filename"))
+        latencies.append((time.perf_counter() - started) * 1000)
+        correct += action == example["action"]
+    latencies.sort()
+    return {
+        "examples": len(examples),
+        "accuracy": round(correct / len(examples), 3) if examples else 0.0,
+        "latency_ms_mean": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        "latency_ms_p95": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3) if latencies else 0.0
+    }
+
+
+def get_intent_classifier() -> Optional[IntentClassifier]:
+    """Modèle entraîné (INTENT_MODEL_PATH), rechargé si le fichier a changé; None s'il n'existe pas"""
+    global _model, _model_mtime
+    path = intent_model_path()
+    try:
+        mtime = os.path.getmtime(path) if path else None
+    except OSError:
+        mtime = None
+
+    with _model_lock:
+        if mtime is None:
+            _model, _model_mtime = None, None
+        elif mtime != _model_mtime:
+            try:
+                _model = IntentClassifier.load(path)
+                print(f"🧮 Classifieur d'intention chargé: {_model.metadata.get('examples', '?')} exemples, "
+                      f"actions {', '.join(_model.classes)}")
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️ Classifieur d'intention illisible ({path}): {str(e)}")
+                _model = None
+            _model_mtime = mtime
+        return _model
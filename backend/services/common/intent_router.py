@@ -0,0 +1,240 @@
+"""
+Routage par niveaux de l'action suggérée (detect_content_intent)
+L'appel au modèle n'est fait que si les niveaux moins coûteux ne sont pas assez sûrs:
+1. cache: décision déjà prise pour ce contenu (hash SHA-256, cache de résultats "routing")
+2. règles: mots-clés compilés (file_type_detector), retenues au-delà de ROUTER_RULES_MIN_CONFIDENCE
+3. classifieur local, retenu au-delà de ROUTER_LOCAL_MIN_CONFIDENCE: modèle TF-IDF +
+   régression logistique entraîné hors ligne (intent_classifier.py) s'il existe, sinon
+   Bayes naïf entraîné sur les décisions journalisées
+4. modèle (analyze_content_with_ai), sauf si ROUTER_USE_LLM=0: le classifieur local décide alors seul
+
+Si ROUTING_LOG_PATH est défini, les décisions sûres du modèle et les actions réellement
+choisies pour un fichier ingéré (tier "user") sont journalisées (JSON lines, aperçu du
+contenu en clair) et servent d'exemples au classifieur local, réentraîné à mesure que le
+journal grandit. Les décisions des règles ne sont pas des exemples: le classifieur ne ferait
+que réapprendre les mots-clés.
+La part des décisions prises à chaque niveau est exposée par /metrics/routing.
+Le modèle TF-IDF est lu sur disque: les fonctions qui le chargent (routing_cache_version,
+classify_locally, get_routing_metrics) sont appelées hors de la boucle d'événements.
+
+Variables d'environnement:
+- ROUTER_RULES_MIN_CONFIDENCE: confiance des règles suffisante (défaut: 0.7)
+- ROUTER_LOCAL_MIN_CONFIDENCE: confiance du classifieur local suffisante (défaut: 0.85)
+- ROUTER_MIN_TRAINING_EXAMPLES: exemples requis avant d'utiliser le classifieur (défaut: 50)
+- ROUTER_RETRAIN_EVERY: nouvelles décisions avant réentraînement (défaut: 100)
+- ROUTER_USE_LLM: 1 | 0 (défaut: 1)
+- ROUTING_LOG_PATH: journal des décisions (défaut: vide = désactivé)
+"""
+import json
+import math
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .intent_classifier import get_intent_classifier
+from .routing_log import LOG_MAX_CHARS, TRAINING_TIERS, routing_features, routing_log_path
+
+# Version de la logique de routage (clé du cache des décisions)
+ROUTER_VERSION = "1"
+
+TIERS = ("cache", "rules", "local", "llm", "fallback")
+
+_metrics_lock = threading.Lock()
+_tier_counts = Counter()
+
+_router_lock = threading.Lock()
+_router = None
+_logged_since_training = 0
+# Génération du Bayes naïf (incrémentée à chaque entraînement): clé du cache des décisions
+_router_generation = 0
+_log_lock = threading.Lock()
+
+
+def routing_cache_version() -> str:
+    """Version des décisions en cache: logique de routage et modèle local entraîné (TF-IDF, sinon Bayes naïf)"""
+    model = get_intent_classifier()
+    if model is not None:
+        return f"{ROUTER_VERSION}:{model.metadata.get('trained_at', '')}"
+    # Entraînement éventuel avant la clé: la décision est rangée sous la version du modèle qui l'a prise
+    get_local_router()
+    # Nombre d'exemples en plus de la génération: deux processus au même rang n'ont pas forcément le même journal
+    with _router_lock:
+        return f"{ROUTER_VERSION}:bayes{_router_generation}-{_router.examples if _router else 0}"
+
+
+def _env_float(name: str, default: str) -> float:
+    return float(os.getenv(name, default))
+
+
+def rules_min_confidence() -> float:
+    return _env_float("ROUTER_RULES_MIN_CONFIDENCE", "0.7")
+
+
+def local_min_confidence() -> float:
+    return _env_float("ROUTER_LOCAL_MIN_CONFIDENCE", "0.85")
+
+
+def llm_routing_enabled() -> bool:
+    return os.getenv("ROUTER_USE_LLM", "1").lower() not in ("0", "false", "no", "off")
+
+
+class NaiveBayesRouter:
+    """Classifieur bayésien naïf multinomial (lissage de Laplace) sur les mots de l'aperçu"""
+
+    def __init__(self, examples: Iterable[Tuple[List[str], str]]):
+        self.word_counts = defaultdict(Counter)
+        self.class_counts = Counter()
+        for features, action in examples:
+            self.class_counts[action] += 1
+            self.word_counts[action].update(features)
+        self.vocabulary = set().union(*self.word_counts.values()) if self.word_counts else set()
+        self.examples = sum(self.class_counts.values())
+        self._totals = {action: sum(counts.values()) for action, counts in self.word_counts.items()}
+
+    def predict(self, features: List[str]) -> Tuple[Optional[str], float]:
+        """(action la plus probable, probabilité a posteriori)"""
+        if not self.class_counts:
+            return None, 0.0
+        vocabulary_size = len(self.vocabulary) + 1
+        known = [feature for feature in features if feature in self.vocabulary]
+        scores = {}
+        for action, count in self.class_counts.items():
+            counts, total = self.word_counts[action], self._totals[action]
+            score = math.log(count / self.examples)
+            for feature in known:
+                score += math.log((counts[feature] + 1) / (total + vocabulary_size))
+            scores[action] = score
+        best = max(scores, key=scores.get)
+        # Probabilité normalisée (softmax des log-vraisemblances)
+        norm = sum(math.exp(score - scores[best]) for score in scores.values())
+        return best, 1.0 / norm
+
+
+def _read_log() -> List[Dict]:
+    path = routing_log_path()
+    if not path or not os.path.exists(path):
+        return []
+    entries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+    return entries
+
+
+def log_routing_decision(content: str, filename: Optional[str], action: Optional[str], tier: str,
+                         confidence: float, **fields):
+    """
+    Journaliser une décision sûre (exemple d'entraînement du classifieur local),
+    si le journal est activé (ROUTING_LOG_PATH)
+
+    Args:
+        tier: Origine de l'étiquette: "llm" ou "user" (action choisie)
+        fields: Champs ajoutés à l'entrée (file_id, suggested_action...)
+    """
+    global _logged_since_training
+    path = routing_log_path()
+    if not path or not action or not content:
+        return
+    entry = {
+        "content": content[:LOG_MAX_CHARS],
+        "filename": filename,
+        "action": action,
+        "tier": tier,
+        "confidence": round(float(confidence or 0.0), 3),
+        "logged_at": time.time(),
+        **fields
+    }
+    try:
+        with _log_lock:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            _logged_since_training += 1
+    except OSError as e:
+        print(f"⚠️ Journal de routage indisponible: {str(e)}")
+
+
+def get_local_router() -> Optional[NaiveBayesRouter]:
+    """
+    Classifieur local entraîné sur les décisions du modèle et les choix des utilisateurs journalisés
+    (réentraîné après ROUTER_RETRAIN_EVERY nouvelles décisions)
+
+    Returns:
+        None tant que le journal contient moins de ROUTER_MIN_TRAINING_EXAMPLES exemples
+    """
+    global _router, _logged_since_training, _router_generation
+    with _router_lock:
+        retrain_every = int(os.getenv("ROUTER_RETRAIN_EVERY", "100"))
+        if _router is None or _logged_since_training >= retrain_every:
+            started = time.perf_counter()
+            entries = _read_log()
+            _logged_since_training = 0
+            _router = NaiveBayesRouter(
+                (routing_features(entry["content"], entry.get("filename")), entry["action"])
+                for entry in entries if entry.get("action") and entry.get("tier") in TRAINING_TIERS
+            )
+            _router_generation += 1
+            if _router.examples:
+                print(f"🧮 Classifieur de routage entraîné sur {_router.examples} décisions "
+                      f"en {(time.perf_counter() - started) * 1000:.0f} ms")
+
+        if _router.examples < int(os.getenv("ROUTER_MIN_TRAINING_EXAMPLES", "50")):
+            return None
+        return _router
+
+
+def classify_locally(content: str, filename: Optional[str] = None) -> Tuple[Optional[str], float]:
+    """
+    Action prédite par le classifieur local
+    (modèle TF-IDF entraîné hors ligne s'il existe, sinon Bayes naïf sur le journal)
+
+    Returns:
+        (action, confiance), ou (None, 0.0) si aucun classifieur n'est encore entraîné
+    """
+    model = get_intent_classifier()
+    if model is not None:
+        return model.predict(content, filename)
+
+    router = get_local_router()
+    if router is None:
+        return None, 0.0
+    return router.predict(routing_features(content, filename))
+
+
+def reset_local_router():
+    """Oublier le classifieur entraîné (réentraîné au prochain appel)"""
+    global _router, _logged_since_training, _router_generation
+    with _router_lock:
+        _router = None
+        _logged_since_training = 0
+        _router_generation += 1
+
+
+def record_routing_tier(tier: str):
+    with _metrics_lock:
+        _tier_counts[tier] += 1
+
+
+def get_routing_metrics() -> Dict:
+    """Décisions par niveau et part de chaque niveau (dont le taux d'appel au modèle)"""
+    with _metrics_lock:
+        counts = {tier: _tier_counts[tier] for tier in TIERS}
+    total = sum(counts.values())
+    router = _router
+    model = get_intent_classifier()
+    return {
+        "decisions": total,
+        "tiers": counts,
+        "shares": {tier: round(count / total, 3) if total else 0.0 for tier, count in counts.items()},
+        "llm_call_rate": round(counts["llm"] / total, 3) if total else 0.0,
+        "local_classifier": {
+            "model": "tfidf_logistic" if model else "naive_bayes",
+            "examples": model.metadata.get("examples", 0) if model else (router.examples if router else 0),
+            "classes": model.metadata.get("classes", {}) if model else (dict(router.class_counts) if router else {})
+        }
+    }
@@ -0,0 +1,100 @@
+"""
+Recherche de mots-clés par catégorie en une seule passe (détection d'intention par règles)
+Toutes les listes de mots-clés sont compilées une fois en une seule expression régulière,
+factorisée en arbre de préfixes (trie): le moteur ne s'arrête que sur les premières lettres
+des mots-clés, puis suit une seule branche.
+- le texte est parcouru une fois pour toutes les catégories (plus une recherche par mot-clé)
+- mots entiers uniquement: "ao" ne correspond plus à "cacao", ni "api" à "rapide"
+  (un pluriel en -s / -x reste reconnu: "clauses", "réseaux")
+- apostrophes droite et typographique équivalentes ("appel d'offres" / "appel d’offres")
+
+Un mot-clé trouvé crédite aussi les mots-clés qu'il contient ("marché public" → "marché",
+"analyse ce rfp" → "rfp"), comme une recherche séparée par mot-clé.
+"""
+import re
+from typing import Dict, Iterable, Set
+
+# Sont des séparateurs tous les caractères qui ne sont pas des lettres (chiffres et "_" compris:
+# "DCE_2024.pdf", "AO2024"), sauf après un mot-clé finissant par un chiffre ("lot 1" ≠ "lot 10")
+_NOT_AFTER_LETTER = r"(?<![^\W\d_].)"
+_LETTER_END = r"[sx]?(?![^\W\d_])"
+_DIGIT_END = r"(?!\d)"
+
+_APOSTROPHES = re.compile(r"['’]")
+_SPACES = re.compile(r"\s+")
+_PLURAL = re.compile(r"[sx]$")
+
+_END = ""  # Marque de fin de mot-clé dans le trie
+
+
+def _char_pattern(char: str) -> str:
+    if char == "'":
+        return "['’]"
+    if char == " ":
+        return r"\s+"
+    return re.escape(char)
+
+
+def _build_trie(keywords: Iterable[str]) -> Dict:
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[_END] = True
+    return trie
+
+
+def _trie_pattern(node: Dict, last_char: str = "") -> str:
+    """Expression régulière d'un nœud du trie: branches les plus longues d'abord, puis fin de mot-clé"""
+    branches = [_char_pattern(char) + _trie_pattern(child, char) for char, child in sorted(node.items()) if char != _END]
+    if _END in node:
+        if last_char.isdigit():
+            branches.append(_DIGIT_END)
+        elif last_char.isalpha():
+            branches.append(_LETTER_END)
+        else:
+            branches.append("")
+    return branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+
+
+def _compile(keywords: Iterable[str]) -> re.Pattern:
+    # Début de mot vérifié après la première lettre: l'expression commence par un littéral,
+    # ce qui permet au moteur de sauter directement aux positions candidates
+    trie = _build_trie(keywords)
+    branches = [
+        _char_pattern(char) + _NOT_AFTER_LETTER + _trie_pattern(child, char)
+        for char, child in sorted(trie.items())
+    ]
+    return re.compile(f"(?:{'|'.join(branches)})")
+
+
+class KeywordMatcher:
+    """Mots-clés de plusieurs catégories, recherchés en une seule passe"""
+
+    def __init__(self, categories: Dict[str, Iterable[str]]):
+        self.categories = {name: {keyword.lower() for keyword in keywords} for name, keywords in categories.items()}
+        self._keywords = set().union(*self.categories.values())
+        self._pattern = _compile(self._keywords)
+
+        # Mots-clés contenus dans un mot-clé plus long (masqués par celui-ci pendant la recherche)
+        self._implied = {
+            keyword: {other for other in self._keywords if _compile([other]).search(keyword)}
+            for keyword in self._keywords
+        }
+
+    def _keyword(self, matched: str) -> str:
+        keyword = _SPACES.sub(" ", _APOSTROPHES.sub("'", matched))
+        return keyword if keyword in self._keywords else _PLURAL.sub("", keyword)
+
+    def matches(self, text: str) -> Dict[str, Set[str]]:
+        """Mots-clés trouvés dans le texte, par catégorie"""
+        found = set()
+        # Texte mis en minuscules une fois: plus rapide qu'une expression insensible à la casse
+        for matched in set(self._pattern.findall((text or "").lower())):
+            found |= self._implied[self._keyword(matched)]
+        return {name: words & found for name, words in self.categories.items()}
+
+    def count(self, text: str) -> Dict[str, int]:
+        """Nombre de mots-clés distincts trouvés dans le texte, par catégorie"""
+        return {name: len(words) for name, words in self.matches(text).items()}
@@ -0,0 +1,193 @@
+"""
+Couche client IA partagée par tous les agents
+Un client asynchrone OpenAI / Azure OpenAI par processus, réutilisant un pool de connexions keep-alive
+(plus de handshake TLS ni de nouveau pool à chaque appel IA)
+
+Tous les appels IA doivent être attendus (await): un appel synchrone de 30 à 90 s
+bloquerait la boucle d'événements uvicorn pour tous les utilisateurs.
+
+Les services passent par create_chat_completion(), qui soumet chaque appel
+à l'ordonnanceur du déploiement (quotas RPM/TPM, file équitable, Retry-After)
+et partage un seul appel amont entre les requêtes identiques en cours (single-flight).
+"""
+import asyncio
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+from openai import AsyncAzureOpenAI, AsyncOpenAI
+
+from services.common.http_client_helper import create_async_http_client
+from services.common.llm_scheduler import get_scheduler
+from services.common.single_flight import SingleFlight, make_flight_key
+from services.common.token_budget import count_message_tokens_async
+
+DEFAULT_AZURE_API_VERSION = "2024-08-01-preview"
+
+NOT_CONFIGURED_MESSAGE = (
+    "Aucun service IA configuré. Veuillez configurer:\n"
+    "- AZURE_OPENAI_ENDPOINT, AZURE_OPENAI_KEY, AZURE_OPENAI_DEPLOYMENT\n"
+    "- OU OPENAI_API_KEY"
+)
+
+_lock = threading.Lock()
+_async_clients = {}
+_completions_flight = SingleFlight("chat_completions")
+
+def _resolve_provider(provider: Optional[str]) -> Optional[str]:
+    """Choisir le fournisseur: Azure OpenAI en priorité, sinon OpenAI direct"""
+    azure_configured = bool(os.getenv("AZURE_OPENAI_ENDPOINT") and os.getenv("AZURE_OPENAI_KEY"))
+    openai_configured = bool(os.getenv("OPENAI_API_KEY"))
+
+    if provider == "azure":
+        return "azure" if azure_configured else None
+    if provider == "openai":
+        return "openai" if openai_configured else None
+    if azure_configured:
+        return "azure"
+    if openai_configured:
+        return "openai"
+    return None
+
+def get_model_name() -> Optional[str]:
+    """Nom du déploiement / modèle utilisé par tous les services"""
+    return os.getenv("AZURE_OPENAI_DEPLOYMENT")
+
+def is_ai_configured() -> bool:
+    """True si un service IA (Azure OpenAI ou OpenAI) est configuré"""
+    return _resolve_provider(None) is not None
+
+def _build_client(provider: str):
+    http_client = create_async_http_client()
+    # Les nouvelles tentatives (429 avec Retry-After, erreurs transitoires) sont gérées
+    # par l'ordonnanceur, qui met en pause tout le déploiement au lieu d'une seule requête
+    max_retries = 0
+
+    if provider == "azure":
+        return AsyncAzureOpenAI(
+            api_key=os.getenv("AZURE_OPENAI_KEY"),
+            api_version=os.getenv("AZURE_OPENAI_API_VERSION", DEFAULT_AZURE_API_VERSION),
+            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+            http_client=http_client,
+            max_retries=max_retries
+        )
+
+    return AsyncOpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        http_client=http_client,
+        max_retries=max_retries
+    )
+
+def get_async_ai_client(provider: Optional[str] = None) -> Tuple[AsyncOpenAI, Optional[str]]:
+    """
+    Obtenir le client IA asynchrone partagé du processus
+
+    Le pool de connexions est lié à la boucle d'événements: un nouveau client
+    est créé si la boucle courante a changé (ex: scripts utilisant asyncio.run).
+    Chaque client est fermé sur sa propre boucle, quand celle-ci s'arrête ou
+    quand il est remplacé.
+
+    Args:
+        provider: "azure", "openai" ou None (détection automatique)
+
+    Returns:
+        (client, model)
+    """
+    resolved = _resolve_provider(provider)
+    if not resolved:
+        raise Exception(NOT_CONFIGURED_MESSAGE)
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    stale = None
+    with _lock:
+        entry = _async_clients.get(resolved)
+        if entry is None or entry[1] is not loop:
+            stale = entry
+            client = _build_client(resolved)
+            guard = loop.create_task(_close_with_loop(client)) if loop is not None else None
+            entry = (client, loop, guard)
+            _async_clients[resolved] = entry
+
+    if stale is not None:
+        _close_on_own_loop(*stale)
+
+    return entry[0], get_model_name()
+
+async def _close_with_loop(client):
+    """
+    Fermer le client quand sa boucle s'arrête
+    (asyncio.run et uvicorn annulent les tâches restantes avant de fermer la boucle)
+    """
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await client.close()
+
+def _close_on_own_loop(client, loop, guard):
+    """Fermer un client remplacé: ses connexions ne peuvent être fermées que par sa boucle"""
+    if guard is None or guard.done() or loop.is_closed():
+        # Client créé hors boucle, ou déjà fermé à l'arrêt de sa boucle
+        return
+    loop.call_soon_threadsafe(guard.cancel)
+
+async def close_ai_clients():
+    """Fermer les clients partagés et leurs pools de connexions (arrêt du serveur)"""
+    with _lock:
+        entries = list(_async_clients.values())
+        _async_clients.clear()
+
+    loop = asyncio.get_running_loop()
+    for client, client_loop, guard in entries:
+        if guard is None:
+            await client.close()
+        elif client_loop is loop:
+            # La tâche de garde ferme le client en se terminant
+            guard.cancel()
+            await asyncio.gather(guard, return_exceptions=True)
+        else:
+            _close_on_own_loop(client, client_loop, guard)
+
+async def create_chat_completion(messages: List[Dict], provider: Optional[str] = None,
+                                 input_tokens: Optional[int] = None, **params):
+    """
+    Appel chat completions via le client partagé et l'ordonnanceur du déploiement
+    
+    Args:
+        messages: Messages de la conversation
+        provider: "azure", "openai" ou None (détection automatique)
+        input_tokens: Tokens des messages, s'ils sont déjà comptés par l'appelant (évite un second comptage)
+        **params: Paramètres de l'appel (temperature, max_tokens, response_format, stream...)
+    
+    Returns:
+        Réponse du modèle (ou flux si stream=True)
+    
+    Les appels concurrents identiques (fournisseur, modèle, messages, paramètres) partagent
+    une seule réponse; les flux (stream=True) ne sont pas partagés.
+    """
+    client, model = get_async_ai_client(provider)
+    params.setdefault("model", model)
+    
+    # Estimation décomptée du quota TPM, comme le fait Azure: entrée + max_tokens
+    if input_tokens is None:
+        input_tokens = await count_message_tokens_async(messages, params["model"])
+    estimated_tokens = input_tokens + (params.get("max_tokens") or 0)
+    scheduler = get_scheduler(params["model"])
+    
+    def call():
+        return scheduler.run(
+            lambda: client.chat.completions.create(messages=messages, **params),
+            estimated_tokens
+        )
+    
+    if params.get("stream"):
+        return await call()
+    
+    key = make_flight_key(_resolve_provider(provider), messages, params)
+    return await _completions_flight.run(key, call)
+
+def get_single_flight_metrics() -> Dict:
+    """Appels amont et résultats partagés par la déduplication des appels identiques"""
+    return _completions_flight.metrics()
@@ -0,0 +1,298 @@
+"""
+Ordonnanceur des appels IA, conscient des quotas du déploiement
+Placé devant la couche client partagée (llm_client.create_chat_completion):
+- quotas RPM / TPM suivis par seaux à jetons (tokens estimés = entrée + max_tokens, comme Azure)
+- file d'attente équitable: les requêtes sont admises dans l'ordre d'arrivée (FIFO)
+- les 429 mettent en pause tout le déploiement pendant la durée Retry-After, puis la requête
+  est rejouée en tête de file; nouvelles tentatives épuisées: LLMRateLimitedError
+  (renvoyée au client en 503 avec Retry-After au lieu d'un 500)
+- métriques: profondeur de file, requêtes en cours, temps d'attente, 429 reçus
+
+Sous une rafale de requêtes, le débit sature le quota au lieu de s'effondrer en erreurs.
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, Optional
+
+from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+
+# Fenêtre des temps d'attente conservés pour les percentiles
+WAIT_SAMPLES = 500
+
+# Attente max appliquée pour un Retry-After (secondes)
+MAX_RETRY_AFTER = 120
+
+
+class LLMRateLimitedError(Exception):
+    """Quota du déploiement IA toujours dépassé après les nouvelles tentatives"""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(f"Quota du service IA dépassé, réessayez dans {retry_after:.0f}s")
+
+
+class TokenBucket:
+    """Seau à jetons rechargé en continu: capacity jetons par minute"""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def delay_for(self, amount: float) -> float:
+        """Secondes à attendre avant de pouvoir consommer amount jetons (0 si disponible)"""
+        self._refill()
+        # Une requête plus grosse que la capacité passe quand le seau est plein (pas d'interblocage)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, amount: float):
+        """Restituer (ou prélever) la différence entre l'estimation et la consommation réelle"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class DeploymentScheduler:
+    """File d'attente et quotas d'un déploiement (ou modèle)"""
+
+    def __init__(self, name: str, rpm_limit: int, tpm_limit: int, max_retries: int, rate_limit_retries: int):
+        self.name = name
+        self.request_bucket = TokenBucket(rpm_limit) if rpm_limit > 0 else None
+        self.token_bucket = TokenBucket(tpm_limit) if tpm_limit > 0 else None
+        self.max_retries = max_retries
+        self.rate_limit_retries = rate_limit_retries
+
+        self._waiters = deque()
+        self._condition = None
+        self._loop = None
+        self.paused_until = 0.0
+
+        self.in_flight = 0
+        self.requests_total = 0
+        self.rate_limited_total = 0
+        self.retries_total = 0
+        self.failures_total = 0
+        self.tokens_estimated_total = 0
+        self.tokens_used_total = 0
+        self._waits = deque(maxlen=WAIT_SAMPLES)
+
+    def _get_condition(self) -> asyncio.Condition:
+        # La condition est liée à la boucle d'événements (scripts utilisant asyncio.run)
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._loop is not loop:
+            self._condition = asyncio.Condition()
+            self._loop = loop
+            self._waiters.clear()
+        return self._condition
+
+    def _admission_delay(self, estimated_tokens: int) -> float:
+        delays = [self.paused_until - time.monotonic()]
+        if self.request_bucket:
+            delays.append(self.request_bucket.delay_for(1))
+        if self.token_bucket:
+            delays.append(self.token_bucket.delay_for(estimated_tokens))
+        return max(0.0, *delays)
+
+    async def _admit(self, estimated_tokens: int, priority: bool = False):
+        """Attendre son tour (FIFO) puis la disponibilité du quota"""
+        condition = self._get_condition()
+        entry = object()
+
+        async with condition:
+            if priority:
+                self._waiters.appendleft(entry)
+            else:
+                self._waiters.append(entry)
+            try:
+                while True:
+                    timeout = None
+                    if self._waiters[0] is entry:
+                        timeout = self._admission_delay(estimated_tokens)
+                        if timeout <= 0:
+                            break
+                    try:
+                        await asyncio.wait_for(condition.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                self._waiters.remove(entry)
+                condition.notify_all()
+
+            if self.request_bucket:
+                self.request_bucket.consume(1)
+            if self.token_bucket:
+                self.token_bucket.consume(estimated_tokens)
+
+    async def _notify(self):
+        condition = self._get_condition()
+        async with condition:
+            condition.notify_all()
+
+    async def run(self, call: Callable[[], Awaitable], estimated_tokens: int):
+        """
+        Exécuter un appel IA en respectant les quotas
+
+        Args:
+            call: Fonction sans argument retournant la coroutine de l'appel (rejouable)
+            estimated_tokens: Tokens estimés (entrée + max_tokens) décomptés du quota TPM
+
+        Returns:
+            Réponse de l'appel
+        """
+        self.requests_total += 1
+        self.tokens_estimated_total += estimated_tokens
+        queued_at = time.monotonic()
+        retried = False
+        # Compteurs distincts: les 429 n'entament pas le budget ni le backoff des erreurs transitoires
+        transient_errors = 0
+        rate_limited = 0
+
+        while True:
+            await self._admit(estimated_tokens, priority=retried)
+            if not retried:
+                self._waits.append(time.monotonic() - queued_at)
+
+            self.in_flight += 1
+            backoff = 0.0
+            try:
+                response = await call()
+            except RateLimitError as e:
+                self.rate_limited_total += 1
+                rate_limited += 1
+                retry_after = _retry_after_seconds(e, rate_limited)
+                # Pause de tout le déploiement: les requêtes en file n'aggravent pas la saturation
+                self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+                print(f"⏳ Quota IA atteint ({self.name}): pause de {retry_after:.1f}s")
+                if rate_limited > self.rate_limit_retries:
+                    self.failures_total += 1
+                    raise LLMRateLimitedError(retry_after) from e
+            except (APIConnectionError, APITimeoutError, InternalServerError) as e:
+                if transient_errors >= self.max_retries:
+                    self.failures_total += 1
+                    raise
+                backoff = min(30.0, 0.5 * 2 ** transient_errors) * (0.5 + random.random())
+                transient_errors += 1
+                print(f"⚠️ Erreur transitoire du service IA ({type(e).__name__}), nouvelle tentative dans {backoff:.1f}s")
+            else:
+                self._record_usage(response, estimated_tokens)
+                return response
+            finally:
+                self.in_flight -= 1
+                await self._notify()
+
+            await asyncio.sleep(backoff)
+            retried = True
+            self.retries_total += 1
+
+    def _record_usage(self, response, estimated_tokens: int):
+        usage = getattr(response, "usage", None)
+        used = getattr(usage, "total_tokens", None)
+        if not isinstance(used, int):
+            return
+        self.tokens_used_total += used
+        if self.token_bucket:
+            self.token_bucket.adjust(estimated_tokens - used)
+
+    def metrics(self) -> Dict:
+        waits = sorted(self._waits)
+        return {
+            "deployment": self.name,
+            "queue_depth": len(self._waiters),
+            "in_flight": self.in_flight,
+            "requests_total": self.requests_total,
+            "rate_limited_total": self.rate_limited_total,
+            "retries_total": self.retries_total,
+            "failures_total": self.failures_total,
+            "paused_for_s": round(max(0.0, self.paused_until - time.monotonic()), 2),
+            "wait_ms": {
+                "avg": round(sum(waits) / len(waits) * 1000, 1) if waits else 0.0,
+                "p95": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 1) if waits else 0.0,
+                "max": round(waits[-1] * 1000, 1) if waits else 0.0
+            },
+            "tokens": {
+                "estimated_total": self.tokens_estimated_total,
+                "used_total": self.tokens_used_total
+            },
+            "quota": {
+                "rpm_limit": int(self.request_bucket.capacity) if self.request_bucket else None,
+                "tpm_limit": int(self.token_bucket.capacity) if self.token_bucket else None,
+                "rpm_available": int(self.request_bucket.tokens) if self.request_bucket else None,
+                "tpm_available": int(self.token_bucket.tokens) if self.token_bucket else None
+            }
+        }
+
+
+def _retry_after_seconds(error: RateLimitError, attempt: int) -> float:
+    """Durée d'attente demandée par le service (retry-after-ms, retry-after), sinon backoff exponentiel"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+
+    try:
+        if headers.get("retry-after-ms"):
+            return min(MAX_RETRY_AFTER, float(headers["retry-after-ms"]) / 1000)
+    except ValueError:
+        pass
+
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return min(MAX_RETRY_AFTER, float(retry_after))
+        except ValueError:
+            try:
+                return min(MAX_RETRY_AFTER, max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time()))
+            except (TypeError, ValueError):
+                pass
+
+    return min(MAX_RETRY_AFTER, 2.0 ** attempt)
+
+
+_lock = threading.Lock()
+_schedulers = {}
+
+
+def get_scheduler(deployment: Optional[str]) -> DeploymentScheduler:
+    """
+    Ordonnanceur partagé d'un déploiement
+
+    Variables d'environnement (quotas du déploiement Azure, 0 = non limité):
+    - LLM_RPM_LIMIT: requêtes par minute
+    - LLM_TPM_LIMIT: tokens par minute
+    - LLM_MAX_RETRIES: nouvelles tentatives sur erreur transitoire (défaut: 2)
+    - LLM_RATE_LIMIT_RETRIES: nouvelles tentatives après un 429 (défaut: 4)
+    """
+    name = deployment or "default"
+    with _lock:
+        scheduler = _schedulers.get(name)
+        if scheduler is None:
+            scheduler = DeploymentScheduler(
+                name,
+                rpm_limit=int(os.getenv("LLM_RPM_LIMIT", "0")),
+                tpm_limit=int(os.getenv("LLM_TPM_LIMIT", "0")),
+                max_retries=int(os.getenv("LLM_MAX_RETRIES", "2")),
+                rate_limit_retries=int(os.getenv("LLM_RATE_LIMIT_RETRIES", "4"))
+            )
+            _schedulers[name] = scheduler
+    return scheduler
+
+
+def get_scheduler_metrics() -> Dict:
+    """Métriques de tous les déploiements (exposées sur /metrics/llm)"""
+    with _lock:
+        schedulers = list(_schedulers.values())
+    return {"deployments": [scheduler.metrics() for scheduler in schedulers]}
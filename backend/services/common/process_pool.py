@@ -0,0 +1,256 @@
+"""
+Pool de processus de rendu PowerPoint
+La construction python-pptx (formes, puis prs.save() qui écrit le zip) est du calcul pur:
+exécutée dans un handler async, elle bloque la boucle d'événements pour toutes les requêtes.
+
+Les builders (create_powerpoint_diagram, create_powerpoint_from_template,
+structure_to_editable_pptx) sont soumis à un pool de processus:
+- processus pré-chauffés au démarrage (pptx, lxml, builders et assets déjà chargés)
+- délai maximum par rendu, compté à partir du démarrage réel du rendu (pas de l'attente
+  dans la file): minuteur du processus (SIGALRM), puis, si le rendu est bloqué dans du
+  code natif, arrêt du seul processus concerné; les rendus interrompus avec lui sont
+  relancés sur un pool neuf
+- limite mémoire par processus (RLIMIT_AS, systèmes POSIX)
+
+Variables d'environnement:
+- RENDER_POOL_WORKERS: nombre de processus (défaut: nombre de cœurs, max 4; 0 = thread, sans isolation)
+- RENDER_TIMEOUT: délai maximum d'un rendu en secondes (défaut: 120)
+- RENDER_MEMORY_LIMIT_MB: mémoire virtuelle maximale par processus (défaut: 2048, 0 = illimitée)
+"""
+import asyncio
+import itertools
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Optional, Tuple
+
+# Marge laissée au processus pour signaler lui-même le dépassement de délai
+TIMEOUT_GRACE = 5.0
+# Intervalle de vérification du démarrage d'un rendu en file d'attente (secondes)
+START_POLL_INTERVAL = 0.5
+
+_lock = threading.Lock()
+_executor = None
+_executor_workers = 0
+
+# Rendus démarrés (signalés par les processus): identifiant -> (pid, instant de démarrage)
+_job_ids = itertools.count(1)
+_started_jobs: Dict[int, Tuple[int, float]] = {}
+_started_queue = None
+# Processus de rendu: file des démarrages, fixée au lancement du processus
+_worker_started_queue = None
+
+
+def _pool_workers() -> int:
+    return int(os.getenv("RENDER_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+
+def _render_timeout() -> float:
+    return float(os.getenv("RENDER_TIMEOUT", "120"))
+
+
+def _init_worker(memory_limit_mb: int, started_queue):
+    """Initialisation d'un processus de rendu: limite mémoire et chargement des modules"""
+    global _worker_started_queue
+    _worker_started_queue = started_queue
+    if memory_limit_mb > 0:
+        try:
+            import resource
+            limit = memory_limit_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError) as e:
+            print(f"⚠️ [RENDU] Limite mémoire non appliquée: {e}")
+
+    # Pré-chargement: le premier rendu ne paie pas les imports ni la lecture des assets
+    import lxml.etree  # noqa: F401
+    from pptx import Presentation
+    import services.deck_generator.html_to_pptx_converter  # noqa: F401
+    import services.deck_generator.infotel_template_builder as template_builder
+    import services.diagram_generator.pptx_diagram_builder  # noqa: F401
+
+    Presentation()
+    if os.path.exists(template_builder.INFOTEL_LOGO_PATH):
+        with open(template_builder.INFOTEL_LOGO_PATH, "rb") as f:
+            f.read()
+
+
+def _warm_up() -> int:
+    return os.getpid()
+
+
+class RenderTimeout(Exception):
+    """Délai dépassé, signalé par le processus de rendu lui-même"""
+
+
+def _on_timeout(signum, frame):
+    raise RenderTimeout("Délai de rendu dépassé")
+
+
+def _run_job(job_id: int, builder: Callable, payload: Dict, output_path: str, timeout: float):
+    """Exécuté dans le processus de rendu, avec son propre minuteur (SIGALRM)"""
+    # Démarrage signalé au serveur: son délai de secours part d'ici, pas de la mise en file
+    _worker_started_queue.put((job_id, os.getpid(), time.time()))
+    use_alarm = timeout > 0 and hasattr(signal, "SIGALRM")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _on_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return builder(payload, output_path)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def _watch_started_jobs(started_queue):
+    """Thread du serveur: enregistre les rendus démarrés signalés par les processus"""
+    while True:
+        job_id, pid, started_at = started_queue.get()
+        # Horloge murale convertie en horloge monotone du serveur
+        _started_jobs[job_id] = (pid, time.monotonic() - max(0.0, time.time() - started_at))
+
+
+def _get_started_queue():
+    global _started_queue
+    if _started_queue is None:
+        _started_queue = multiprocessing.get_context("spawn").SimpleQueue()
+        threading.Thread(target=_watch_started_jobs, args=(_started_queue,), daemon=True).start()
+    return _started_queue
+
+
+def _get_executor() -> Optional[ProcessPoolExecutor]:
+    global _executor, _executor_workers
+    workers = _pool_workers()
+    if workers <= 0:
+        return None
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=workers,
+                # spawn: pas de fork d'un processus qui a déjà des threads et une boucle asyncio
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(int(os.getenv("RENDER_MEMORY_LIMIT_MB", "2048")), _get_started_queue())
+            )
+            _executor_workers = workers
+        return _executor
+
+
+def _retire_executor(executor: ProcessPoolExecutor) -> bool:
+    """Retirer un pool cassé ou bloqué: le prochain rendu en crée un nouveau (False s'il l'était déjà)"""
+    global _executor
+    with _lock:
+        if _executor is not executor:
+            return False
+        _executor = None
+    # Pas d'annulation: les rendus encore en file échouent avec le pool et sont relancés sur le nouveau
+    executor.shutdown(wait=False)
+    return True
+
+
+def _kill_process(pid: int):
+    """Arrêter le processus d'un rendu bloqué dans du code natif (insensible au minuteur)"""
+    try:
+        os.kill(pid, getattr(signal, "SIGKILL", signal.SIGTERM))
+    except OSError:
+        pass
+
+
+async def _wait_for_job(future: asyncio.Future, job_id: int, timeout: float):
+    """
+    Attendre un rendu; délai de secours (timeout + TIMEOUT_GRACE) compté à partir de son démarrage
+
+    Raises:
+        asyncio.TimeoutError: rendu démarré et toujours bloqué après le délai de secours
+    """
+    if timeout <= 0:
+        return await future
+    while True:
+        started = _started_jobs.get(job_id)
+        if started is None:
+            wait = START_POLL_INTERVAL
+        else:
+            wait = started[1] + timeout + TIMEOUT_GRACE - time.monotonic()
+            if wait <= 0:
+                raise asyncio.TimeoutError()
+        done, _ = await asyncio.wait({future}, timeout=wait)
+        if done:
+            return future.result()
+
+
+async def render_pptx(builder: Callable, payload: Dict, output_path: str, timeout: Optional[float] = None) -> str:
+    """
+    Construire un fichier PowerPoint dans le pool de rendu, sans bloquer la boucle d'événements
+
+    Args:
+        builder: Fonction de module builder(payload, output_path) (ex: create_powerpoint_diagram)
+        payload: Données de la présentation (doivent être sérialisables)
+        output_path: Chemin du fichier .pptx à créer
+        timeout: Délai maximum en secondes (défaut: RENDER_TIMEOUT)
+
+    Returns:
+        Chemin du fichier créé
+    """
+    timeout = _render_timeout() if timeout is None else timeout
+    # Chemin absolu: le répertoire courant des processus est figé à leur démarrage
+    output_path = os.path.abspath(output_path)
+
+    executor = _get_executor()
+    if executor is None:
+        await asyncio.wait_for(asyncio.to_thread(builder, payload, output_path), timeout or None)
+        return output_path
+
+    loop = asyncio.get_running_loop()
+    for attempt in range(2):
+        job_id = next(_job_ids)
+        future = loop.run_in_executor(executor, _run_job, job_id, builder, payload, output_path, timeout)
+        try:
+            await _wait_for_job(future, job_id, timeout)
+            return output_path
+        except RenderTimeout:
+            print(f"⏱️ [RENDU] {builder.__name__} interrompu après {timeout:.0f}s")
+            raise TimeoutError(f"Délai de rendu dépassé ({timeout:.0f}s)")
+        except asyncio.TimeoutError:
+            # Rendu bloqué dans du code natif: seul son processus est arrêté, le pool est remplacé
+            print(f"⏱️ [RENDU] {builder.__name__} bloqué au-delà de {timeout:.0f}s: arrêt de son processus")
+            _retire_executor(executor)
+            _kill_process(_started_jobs[job_id][0])
+            raise TimeoutError(f"Délai de rendu dépassé ({timeout:.0f}s)")
+        except BrokenProcessPool:
+            if not _retire_executor(executor) and attempt == 0:
+                # Pool déjà remplacé à cause d'un autre rendu: ce rendu-ci est relancé sur le nouveau pool
+                print(f"🔁 [RENDU] {builder.__name__} relancé sur un pool neuf")
+                executor = _get_executor()
+                continue
+            # Processus tué (limite mémoire, crash natif): les rendus suivants repartent sur un pool neuf
+            print(f"💥 [RENDU] Processus de rendu interrompu pendant {builder.__name__}: redémarrage du pool")
+            raise Exception("Le rendu PowerPoint a été interrompu (mémoire insuffisante ou erreur interne)")
+        except MemoryError:
+            raise Exception("Le rendu PowerPoint dépasse la limite mémoire (RENDER_MEMORY_LIMIT_MB)")
+        finally:
+            _started_jobs.pop(job_id, None)
+
+
+async def warm_render_pool():
+    """Démarrer et pré-chauffer tous les processus de rendu (au démarrage du serveur)"""
+    executor = _get_executor()
+    if executor is None:
+        return
+    loop = asyncio.get_running_loop()
+    # Soumis ensemble: chaque tâche trouve tous les processus occupés et en démarre un nouveau
+    pids = await asyncio.gather(*[
+        loop.run_in_executor(executor, _warm_up) for _ in range(_executor_workers)
+    ])
+    print(f"🔥 [RENDU] Pool de rendu prêt: {len(set(pids))} processus")
+
+
+def shutdown_render_pool():
+    """Arrêter le pool de rendu (arrêt du serveur)"""
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
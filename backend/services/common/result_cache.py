@@ -0,0 +1,282 @@
+"""
+Cache persistant des résultats IA adressé par contenu
+Clé = hash SHA-256 du texte source + version du prompt + nom du modèle
+
+Backends disponibles (variable RESULT_CACHE_BACKEND):
+- memory: dictionnaire LRU en mémoire du processus (défaut)
+- sqlite: fichier sqlite sur disque, partagé entre les workers
+- redis: serveur Redis (paquet 'redis' requis)
+- none: cache désactivé
+"""
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class MemoryCacheBackend:
+    """Cache LRU en mémoire avec TTL"""
+
+    blocking = False
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at and expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: Optional[int]):
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class SQLiteCacheBackend:
+    """Cache sur disque (sqlite) avec TTL et éviction LRU par date de dernier accès"""
+
+    blocking = True
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS result_cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_result_cache_access ON result_cache(last_access)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM result_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at and expires_at < now:
+                self._conn.execute("DELETE FROM result_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE result_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return value
+
+    def set(self, key: str, value: str, ttl: Optional[int]):
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO result_cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, now)
+            )
+            # Purger les entrées expirées puis évincer les moins récemment utilisées
+            self._conn.execute("DELETE FROM result_cache WHERE expires_at IS NOT NULL AND expires_at < ?", (now,))
+            self._conn.execute(
+                "DELETE FROM result_cache WHERE key IN ("
+                " SELECT key FROM result_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM result_cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM result_cache").fetchone()[0]
+
+
+class RedisCacheBackend:
+    """Cache Redis: TTL natif + index trié par dernier accès pour l'éviction LRU"""
+
+    blocking = True
+    INDEX_KEY = "result_cache:lru"
+
+    def __init__(self, url: str, max_entries: int):
+        try:
+            import redis
+        except ImportError:
+            raise Exception("Backend de cache 'redis' demandé mais le paquet 'redis' n'est pas installé (pip install redis)")
+
+        self.max_entries = max_entries
+        self._redis = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._redis.get(key)
+        if value is None:
+            self._redis.zrem(self.INDEX_KEY, key)
+            return None
+        self._redis.zadd(self.INDEX_KEY, {key: time.time()})
+        return value.decode("utf-8")
+
+    def set(self, key: str, value: str, ttl: Optional[int]):
+        pipe = self._redis.pipeline()
+        pipe.set(key, value, ex=ttl or None)
+        pipe.zadd(self.INDEX_KEY, {key: time.time()})
+        pipe.execute()
+
+        overflow = self._redis.zcard(self.INDEX_KEY) - self.max_entries
+        if overflow > 0:
+            evicted = [member for member, _ in self._redis.zpopmin(self.INDEX_KEY, overflow)]
+            if evicted:
+                self._redis.delete(*evicted)
+
+    def delete(self, key: str):
+        self._redis.delete(key)
+        self._redis.zrem(self.INDEX_KEY, key)
+
+    def count(self) -> int:
+        return self._redis.zcard(self.INDEX_KEY)
+
+
+class ResultCache:
+    """
+    Façade asynchrone du cache: les backends bloquants (sqlite, redis)
+    sont exécutés dans un thread pour ne pas bloquer la boucle d'événements.
+    Une erreur du backend est traitée comme un miss (le cache ne fait jamais échouer une requête).
+    """
+
+    def __init__(self, backend, namespace: str, default_ttl: Optional[int]):
+        self.backend = backend
+        self.namespace = namespace
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, *parts: str) -> str:
+        """Clé adressée par contenu: SHA-256 des différentes parties"""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update((part or "").encode("utf-8"))
+            digest.update(b"\x00")
+        return f"{self.namespace}:{digest.hexdigest()}"
+
+    async def _call(self, method, *args):
+        if self.backend.blocking:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    async def get(self, key: str) -> Optional[Dict]:
+        if self.backend is None:
+            return None
+        try:
+            value = await self._call(self.backend.get, key)
+        except Exception as e:
+            print(f"⚠️ Cache indisponible (lecture): {str(e)}")
+            value = None
+
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(value)
+
+    async def set(self, key: str, value: Dict, ttl: Optional[int] = None):
+        if self.backend is None:
+            return
+        try:
+            await self._call(self.backend.set, key, json.dumps(value, ensure_ascii=False), ttl or self.default_ttl)
+        except Exception as e:
+            print(f"⚠️ Cache indisponible (écriture): {str(e)}")
+
+    async def delete(self, key: str):
+        if self.backend is None:
+            return
+        try:
+            await self._call(self.backend.delete, key)
+        except Exception as e:
+            print(f"⚠️ Cache indisponible (suppression): {str(e)}")
+
+
+_backend_lock = threading.Lock()
+_backend = None
+_backend_initialized = False
+_caches = {}
+
+
+def _create_backend():
+    """Créer le backend selon la configuration d'environnement"""
+    backend_name = os.getenv("RESULT_CACHE_BACKEND", "memory").lower()
+    max_entries = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "500"))
+
+    if backend_name in ("none", "off", "disabled"):
+        return None
+    if backend_name == "sqlite":
+        path = os.getenv("RESULT_CACHE_SQLITE_PATH", os.path.join("cache", "result_cache.sqlite3"))
+        return SQLiteCacheBackend(path, max_entries)
+    if backend_name == "redis":
+        url = os.getenv("RESULT_CACHE_REDIS_URL", "redis://localhost:6379/0")
+        return RedisCacheBackend(url, max_entries)
+    return MemoryCacheBackend(max_entries)
+
+
+def get_result_cache(namespace: str) -> ResultCache:
+    """
+    Obtenir le cache de résultats partagé pour un espace de noms (ex: "rfp_summary")
+
+    Variables d'environnement:
+    - RESULT_CACHE_BACKEND: memory | sqlite | redis | none (défaut: memory)
+    - RESULT_CACHE_TTL: durée de vie en secondes (défaut: 86400)
+    - RESULT_CACHE_MAX_ENTRIES: nombre max d'entrées avant éviction LRU (défaut: 500)
+    - RESULT_CACHE_SQLITE_PATH: chemin du fichier sqlite (défaut: cache/result_cache.sqlite3)
+    - RESULT_CACHE_REDIS_URL: URL Redis (défaut: redis://localhost:6379/0)
+    """
+    global _backend, _backend_initialized
+
+    with _backend_lock:
+        if not _backend_initialized:
+            try:
+                _backend = _create_backend()
+            except Exception as e:
+                print(f"⚠️ Cache de résultats désactivé: {str(e)}")
+                _backend = None
+            _backend_initialized = True
+
+        cache = _caches.get(namespace)
+        if cache is None:
+            cache = ResultCache(_backend, namespace, int(os.getenv("RESULT_CACHE_TTL", "86400")))
+            _caches[namespace] = cache
+
+    return cache
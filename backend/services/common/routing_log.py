@@ -0,0 +1,33 @@
+"""
+Éléments partagés par le routeur d'intention (intent_router) et le classifieur local (intent_classifier)
+- chemin du journal de routage et origines des étiquettes retenues pour l'entraînement
+- features d'un contenu (mots de l'aperçu et extension du fichier)
+
+Module sans dépendance interne: les deux modules l'importent sans s'importer l'un l'autre.
+
+Variables d'environnement:
+- ROUTING_LOG_PATH: journal des décisions (défaut: vide = désactivé)
+"""
+import os
+import re
+from typing import List, Optional
+
+# Longueur du contenu journalisé et utilisé par le classifieur (aperçu)
+LOG_MAX_CHARS = 2000
+
+# Origines des étiquettes utilisées pour entraîner le classifieur local
+TRAINING_TIERS = ("llm", "user")
+
+_WORD = re.compile(r"[^\W\d_]{2,}")
+
+
+def routing_log_path() -> str:
+    return os.getenv("ROUTING_LOG_PATH", "")
+
+
+def routing_features(content: str, filename: Optional[str] = None) -> List[str]:
+    """Mots de l'aperçu (minuscules) et extension du fichier"""
+    features = _WORD.findall((content or "")[:LOG_MAX_CHARS].lower())
+    if filename:
+        features.append(f"ext:{os.path.splitext(filename.lower())[1] or 'none'}")
+    return features
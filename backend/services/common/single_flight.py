@@ -0,0 +1,88 @@
+"""
+Déduplication des appels identiques en cours (single-flight)
+Des requêtes concurrentes avec la même clé partagent un seul appel amont et un seul résultat:
+une action relancée par Teams, ou deux collègues soumettant le même document,
+ne déclenchent plus deux appels IA de 4000 tokens en parallèle.
+
+L'appel partagé tourne dans sa propre tâche: l'annulation d'un des demandeurs
+n'interrompt pas les autres; la tâche n'est annulée que si plus personne ne l'attend.
+"""
+import asyncio
+import hashlib
+import json
+import threading
+from typing import Awaitable, Callable, Dict
+
+
+def make_flight_key(*parts) -> str:
+    """Clé SHA-256 d'un appel (modèle, messages, paramètres...) sérialisé de façon déterministe"""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """Groupe d'appels dédupliqués par clé"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights = {}  # clé -> [tâche, nombre de demandeurs]
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.shared = 0
+
+    async def run(self, key: str, factory: Callable[[], Awaitable]):
+        """
+        Exécuter factory() une seule fois pour tous les demandeurs concurrents de la même clé
+
+        Args:
+            key: Clé de déduplication (voir make_flight_key)
+            factory: Fonction sans argument retournant la coroutine de l'appel
+
+        Returns:
+            Résultat de l'appel (le même objet pour tous les demandeurs)
+        """
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None and (flight[0].done() or flight[0].get_loop() is not loop):
+                flight = None
+            if flight is None:
+                task = loop.create_task(factory())
+                flight = [task, 0]
+                self._flights[key] = flight
+                task.add_done_callback(lambda done, key=key: self._forget(key, done))
+                self.calls += 1
+            else:
+                self.shared += 1
+                print(f"🔗 Appel identique déjà en cours ({self.name}): résultat partagé")
+            flight[1] += 1
+
+        try:
+            return await asyncio.shield(flight[0])
+        except asyncio.CancelledError:
+            with self._lock:
+                flight[1] -= 1
+                abandoned = flight[1] == 0 and not flight[0].done()
+                if abandoned and self._flights.get(key) is flight:
+                    # Plus aucun demandeur: les suivants relanceront un nouvel appel
+                    del self._flights[key]
+            if abandoned:
+                flight[0].cancel()
+            raise
+
+    def _forget(self, key: str, task: asyncio.Task):
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None and flight[0] is task:
+                del self._flights[key]
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            in_flight = len(self._flights)
+        return {
+            "name": self.name,
+            "in_flight": in_flight,
+            "upstream_calls": self.calls,
+            "shared_results": self.shared
+        }
@@ -0,0 +1,305 @@
+"""
+Budget de tokens partagé par tous les agents
+Remplace les troncatures en caractères propres à chaque service par un comptage en tokens:
+- tokenizer mis en cache par modèle (tiktoken si installé, sinon estimation prudente)
+- limites de contexte et de sortie par modèle
+- le prompt système et les messages sont comptés, le contenu est inséré jusqu'à la limite réelle
+
+Évite à la fois le gaspillage de contexte et les appels en échec (dépassement de contexte)
+qui coûtent un aller-retour complet vers le service IA.
+
+Les variantes *_async comptent les textes longs dans un thread: l'estimation coûte
+~0,1 s par million de caractères et bloquerait la boucle d'événements.
+"""
+import asyncio
+import math
+import os
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+# (fenêtre de contexte, tokens de sortie max) par préfixe de modèle / déploiement
+# Le préfixe le plus long l'emporte (ex: "gpt-4o-mini" avant "gpt-4o" avant "gpt-4")
+MODEL_LIMITS = {
+    "gpt-5": (400000, 128000),
+    "gpt-4.1": (1047576, 32768),
+    "gpt-4o": (128000, 16384),
+    "gpt-4-turbo": (128000, 4096),
+    "gpt-4-32k": (32768, 4096),
+    "gpt-4": (8192, 4096),
+    "gpt-35-turbo": (16385, 4096),
+    "gpt-3.5-turbo": (16385, 4096),
+    "o1": (200000, 100000),
+    "o3": (200000, 100000),
+    "o4-mini": (200000, 100000),
+}
+
+DEFAULT_LIMITS = (128000, 16384)
+
+# Surcoût de format par message (rôle, séparateurs) et amorce de la réponse
+TOKENS_PER_MESSAGE = 4
+TOKENS_PER_REPLY = 3
+
+# Marge de sécurité appliquée quand le nombre de tokens est estimé (tiktoken absent)
+ESTIMATE_SAFETY_RATIO = 1.1
+
+TRUNCATION_MARKER = "\n\n[... contenu tronqué ...]\n\n"
+
+_WORD_PATTERN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+# Taille au-delà de laquelle les variantes asynchrones comptent dans un thread
+THREAD_MIN_CHARS = 50000
+
+
+class _EstimatingTokenizer:
+    """
+    Estimation prudente sans tiktoken: un token par signe de ponctuation,
+    un token par tranche de 4 caractères dans les mots (les mots français accentués
+    sont découpés plus finement que les mots anglais)
+    """
+
+    name = "estimate"
+    exact = False
+
+    def count(self, text: str) -> int:
+        tokens = 0
+        for match in _WORD_PATTERN.finditer(text):
+            tokens += max(1, math.ceil((match.end() - match.start()) / 4))
+        return math.ceil(tokens * ESTIMATE_SAFETY_RATIO)
+
+    def truncate(self, text: str, max_tokens: int, from_end: bool = False) -> str:
+        # Un seul passage sur le texte: coupure avant le premier mot qui dépasse le budget
+        limit = max_tokens / ESTIMATE_SAFETY_RATIO
+        matches = _WORD_PATTERN.finditer(text[::-1] if from_end else text)
+        tokens = 0
+        cut = len(text)
+        for match in matches:
+            tokens += max(1, math.ceil((match.end() - match.start()) / 4))
+            if tokens > limit:
+                cut = match.start()
+                break
+        return (text[len(text) - cut:] if cut else "") if from_end else text[:cut]
+
+
+class _TiktokenTokenizer:
+    """Comptage exact avec tiktoken"""
+
+    exact = True
+
+    def __init__(self, encoding):
+        self.encoding = encoding
+        self.name = encoding.name
+
+    def count(self, text: str) -> int:
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def truncate(self, text: str, max_tokens: int, from_end: bool = False) -> str:
+        tokens = self.encoding.encode(text, disallowed_special=())
+        kept = tokens[-max_tokens:] if from_end else tokens[:max_tokens]
+        return self.encoding.decode(kept) if max_tokens > 0 else ""
+
+
+@lru_cache(maxsize=16)
+def get_tokenizer(model: Optional[str] = None):
+    """
+    Tokenizer du modèle, mis en cache (le chargement d'un encodage tiktoken coûte ~100 ms)
+
+    Les noms de déploiement Azure sont libres: si le modèle n'est pas reconnu,
+    l'encodage o200k_base (famille gpt-4o / gpt-5) est utilisé.
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return _EstimatingTokenizer()
+
+    try:
+        return _TiktokenTokenizer(tiktoken.encoding_for_model(model or ""))
+    except KeyError:
+        pass
+    except Exception as e:
+        # Fichier BPE non téléchargeable (hôte sans accès réseau): estimation, mise en cache avec le tokenizer
+        print(f"⚠️ Encodage tiktoken indisponible ({model}), estimation du nombre de tokens: {str(e)}")
+        return _EstimatingTokenizer()
+
+    name = (model or "").lower()
+    encoding_name = "cl100k_base" if re.match(r"gpt-(4(?!o|\.1)|35|3\.5)", name) else "o200k_base"
+    try:
+        return _TiktokenTokenizer(tiktoken.get_encoding(encoding_name))
+    except Exception as e:
+        print(f"⚠️ Encodage tiktoken indisponible ({encoding_name}), estimation du nombre de tokens: {str(e)}")
+        return _EstimatingTokenizer()
+
+
+def get_model_limits(model: Optional[str] = None) -> Tuple[int, int]:
+    """
+    Limites du modèle: (fenêtre de contexte, tokens de sortie max)
+
+    Surchargeables pour un déploiement au nom non standard:
+    - LLM_CONTEXT_WINDOW
+    - LLM_MAX_OUTPUT_TOKENS
+    """
+    name = (model or "").lower()
+    matches = [prefix for prefix in MODEL_LIMITS if name.startswith(prefix)]
+    context_window, max_output = MODEL_LIMITS[max(matches, key=len)] if matches else DEFAULT_LIMITS
+
+    context_window = int(os.getenv("LLM_CONTEXT_WINDOW", context_window))
+    max_output = int(os.getenv("LLM_MAX_OUTPUT_TOKENS", max_output))
+    return context_window, max_output
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Nombre de tokens d'un texte pour le modèle donné"""
+    if not text:
+        return 0
+    return get_tokenizer(model).count(text)
+
+
+def count_message_tokens(messages: List[Dict], model: Optional[str] = None) -> int:
+    """Nombre de tokens d'une liste de messages chat (contenu + surcoût de format)"""
+    total = TOKENS_PER_REPLY
+    for message in messages:
+        total += TOKENS_PER_MESSAGE + count_tokens(message.get("content") or "", model)
+    return total
+
+
+def clamp_output_tokens(requested: int, model: Optional[str] = None) -> int:
+    """Tokens de sortie demandés, bornés par la limite de sortie du modèle"""
+    return min(requested, get_model_limits(model)[1])
+
+
+def get_input_budget(model: Optional[str], messages: List[Dict], max_output_tokens: int) -> int:
+    """
+    Tokens encore disponibles pour le contenu variable, une fois comptés
+    les messages fixes (prompt système, consignes) et la réserve de sortie
+
+    Args:
+        model: Nom du modèle / déploiement
+        messages: Messages fixes de la requête (sans le contenu à insérer)
+        max_output_tokens: Tokens réservés pour la réponse
+
+    Returns:
+        Nombre de tokens disponibles (0 si les messages fixes saturent déjà le contexte)
+    """
+    context_window, _ = get_model_limits(model)
+    used = count_message_tokens(messages, model) + clamp_output_tokens(max_output_tokens, model)
+    return max(0, context_window - used)
+
+
+def _truncate(text: str, max_tokens: int, model: Optional[str], from_end: bool = False) -> str:
+    """Garder au plus max_tokens tokens du début (ou de la fin) du texte"""
+    if max_tokens <= 0:
+        return ""
+    return get_tokenizer(model).truncate(text, max_tokens, from_end)
+
+
+def fit_to_budget(
+    text: str,
+    max_tokens: int,
+    model: Optional[str] = None,
+    keep: str = "head",
+    marker: str = TRUNCATION_MARKER
+) -> Tuple[str, bool]:
+    """
+    Réduire un texte pour qu'il tienne dans max_tokens tokens
+
+    Args:
+        text: Texte à insérer dans le prompt
+        max_tokens: Budget disponible
+        model: Nom du modèle / déploiement
+        keep: "head" (début du texte) ou "head_tail" (début + fin, ex: conclusions en fin de document)
+        marker: Marqueur inséré à l'endroit de la coupure
+
+    Returns:
+        (texte ajusté, True si le texte a été tronqué)
+    """
+    if count_tokens(text, model) <= max_tokens:
+        return text, False
+
+    available = max_tokens - count_tokens(marker, model)
+    if available <= 0:
+        return "", True
+
+    if keep == "head_tail":
+        head = _truncate(text, available - available // 2, model)
+        tail = _truncate(text, available // 2, model, from_end=True)
+        return head + marker + tail, True
+
+    return _truncate(text, available, model) + marker.rstrip(), True
+
+
+def pack_user_content(
+    model: Optional[str],
+    system_prompt: str,
+    user_template: str,
+    content: str,
+    max_output_tokens: int,
+    keep: str = "head",
+    max_content_tokens: Optional[int] = None
+) -> Tuple[str, bool]:
+    """
+    Construire le message utilisateur en insérant le plus de contenu possible
+
+    Args:
+        model: Nom du modèle / déploiement
+        system_prompt: Prompt système (compté dans le budget)
+        user_template: Message utilisateur avec un emplacement {content}
+        content: Contenu variable (document, description...)
+        max_output_tokens: Tokens réservés pour la réponse
+        keep: Stratégie de coupure ("head" ou "head_tail")
+        max_content_tokens: Plafond volontaire du contenu (ex: détection rapide), en plus de la limite du modèle
+
+    Returns:
+        (message utilisateur, True si le contenu a été tronqué)
+    """
+    fixed_messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_template.format(content="")}
+    ]
+    budget = get_input_budget(model, fixed_messages, max_output_tokens)
+    if max_content_tokens is not None:
+        budget = min(budget, max_content_tokens)
+
+    fitted, truncated = fit_to_budget(content, budget, model, keep)
+    if truncated:
+        print(f"✂️ Contenu réduit à {budget} tokens (modèle: {model or 'inconnu'}, tokenizer: {get_tokenizer(model).name})")
+    return user_template.format(content=fitted), truncated
+
+
+async def _offload(size: int, function, *args, **kwargs):
+    """Exécuter un comptage dans un thread si le texte est long, directement sinon"""
+    if size < THREAD_MIN_CHARS:
+        return function(*args, **kwargs)
+    return await asyncio.to_thread(function, *args, **kwargs)
+
+
+async def count_tokens_async(text: str, model: Optional[str] = None) -> int:
+    """count_tokens sans bloquer la boucle d'événements"""
+    return await _offload(len(text or ""), count_tokens, text, model)
+
+
+async def count_message_tokens_async(messages: List[Dict], model: Optional[str] = None) -> int:
+    """count_message_tokens sans bloquer la boucle d'événements"""
+    size = sum(len(message.get("content") or "") for message in messages)
+    return await _offload(size, count_message_tokens, messages, model)
+
+
+async def fit_to_budget_async(text: str, max_tokens: int, model: Optional[str] = None, keep: str = "head",
+                              marker: str = TRUNCATION_MARKER) -> Tuple[str, bool]:
+    """fit_to_budget sans bloquer la boucle d'événements"""
+    return await _offload(len(text or ""), fit_to_budget, text, max_tokens, model, keep, marker)
+
+
+async def pack_user_content_async(
+    model: Optional[str],
+    system_prompt: str,
+    user_template: str,
+    content: str,
+    max_output_tokens: int,
+    keep: str = "head",
+    max_content_tokens: Optional[int] = None
+) -> Tuple[str, bool]:
+    """pack_user_content sans bloquer la boucle d'événements"""
+    return await _offload(
+        len(content or ""),
+        pack_user_content, model, system_prompt, user_template, content, max_output_tokens, keep, max_content_tokens
+    )
@@ -0,0 +1,145 @@
+"""
+Réception des uploads multipart: taille plafonnée et empreinte calculée au fil de l'eau
+- le corps est lu par morceaux vers un tampon gardé en mémoire jusqu'au seuil de spooling
+  (EXTRACT_SPOOL_MAX_MB), puis sur disque
+- taille maximale (UPLOAD_MAX_MB, défaut: 100): un Content-Length trop grand est refusé en 413
+  avant toute lecture, un envoi sans Content-Length est interrompu dès le dépassement
+- SHA-256 de chaque fichier calculé pendant la réception (upload.sha256): les caches
+  peuvent s'en servir comme clé sans relire le fichier
+
+Branché via la classe de route FastAPI (app.router.route_class = IngestingRoute):
+les paramètres UploadFile = File(...) des endpoints reçoivent des IngestedUpload.
+"""
+import hashlib
+import os
+from typing import Callable, Optional, Union
+
+from fastapi import HTTPException, Request, UploadFile
+from fastapi.routing import APIRoute
+from starlette.datastructures import FormData
+from starlette.formparsers import MultiPartException, MultiPartParser
+from starlette.requests import parse_options_header
+
+from services.rfp_summarizer.document_source import spool_max_bytes
+
+
+def upload_max_bytes() -> int:
+    return int(float(os.getenv("UPLOAD_MAX_MB", "100")) * 1024 * 1024)
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class IngestedUpload(UploadFile):
+    """UploadFile dont la taille et l'empreinte SHA-256 sont connues dès la fin de la réception"""
+
+    sha256: Optional[str] = None
+
+
+def _too_large_error(max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"Fichier trop volumineux (maximum {max_bytes // (1024 * 1024)} Mo)"
+    )
+
+
+class IngestingMultiPartParser(MultiPartParser):
+    """Parseur multipart de Starlette, avec plafond de taille et hachage des fichiers en réception"""
+
+    def __init__(self, *args, max_bytes: int, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_file_size = spool_max_bytes()
+        self.max_bytes = max_bytes
+        self._received = 0
+        self._hasher = None
+
+    def on_headers_finished(self) -> None:
+        super().on_headers_finished()
+        upload = self._current_part.file
+        if upload is not None:
+            self._current_part.file = IngestedUpload(
+                file=upload.file,
+                size=0,
+                filename=upload.filename,
+                headers=upload.headers
+            )
+            self._hasher = hashlib.sha256()
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        self._received += end - start
+        if self._received > self.max_bytes:
+            raise UploadTooLarge()
+        if self._current_part.file is not None:
+            self._hasher.update(data[start:end])
+        super().on_part_data(data, start, end)
+
+    def on_part_end(self) -> None:
+        if self._current_part.file is not None:
+            self._current_part.file.sha256 = self._hasher.hexdigest()
+        super().on_part_end()
+
+    async def parse(self) -> FormData:
+        try:
+            return await super().parse()
+        except UploadTooLarge:
+            for file in self._files_to_close_on_error:
+                file.close()
+            raise _too_large_error(self.max_bytes)
+
+
+class IngestingRequest(Request):
+    async def _get_form(
+        self,
+        *,
+        max_files: Union[int, float] = 1000,
+        max_fields: Union[int, float] = 1000
+    ) -> FormData:
+        if self._form is None:
+            content_type, _ = parse_options_header(self.headers.get("Content-Type"))
+            if content_type == b"multipart/form-data":
+                max_bytes = upload_max_bytes()
+                # Refus avant de lire le corps quand la taille annoncée dépasse déjà la limite
+                try:
+                    declared = int(self.headers.get("Content-Length", "0"))
+                except ValueError:
+                    declared = 0
+                if declared > max_bytes:
+                    raise _too_large_error(max_bytes)
+
+                parser = IngestingMultiPartParser(
+                    self.headers,
+                    self.stream(),
+                    max_files=max_files,
+                    max_fields=max_fields,
+                    max_bytes=max_bytes
+                )
+                try:
+                    self._form = await parser.parse()
+                except MultiPartException as exc:
+                    raise HTTPException(status_code=400, detail=exc.message)
+        return await super()._get_form(max_files=max_files, max_fields=max_fields)
+
+
+class IngestingRoute(APIRoute):
+    """Route FastAPI dont les formulaires multipart passent par IngestingMultiPartParser"""
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def ingesting_handler(request: Request):
+            return await handler(IngestingRequest(request.scope, request.receive))
+
+        return ingesting_handler
+
+
+def upload_sha256(upload: Optional[UploadFile]) -> Optional[str]:
+    """Empreinte SHA-256 d'un upload reçu par IngestingRoute (None sinon)"""
+    return getattr(upload, "sha256", None)
+
+
+def describe_upload(upload: UploadFile) -> str:
+    """Résumé d'un upload pour les logs: nom, taille, début de l'empreinte"""
+    sha256 = upload_sha256(upload)
+    size = f"{upload.size / 1024:.0f} Ko" if upload.size is not None else "taille inconnue"
+    return f"{upload.filename} ({size}, sha256 {sha256[:12]})" if sha256 else f"{upload.filename} ({size})"
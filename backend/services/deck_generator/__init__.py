@@ -15,7 +15,20 @@ from .html_deck_generator import (
     validate_html_deck,
     generate_and_validate_html_deck
 )
-from .html_to_pptx_converter import html_to_editable_pptx, parse_html_to_structure
+from .deck_validator import validate_deck_locally
+from .html_to_pptx_converter import (
+    html_to_editable_pptx,
+    parse_html_to_structure,
+    structure_from_slides_data,
+    structure_to_editable_pptx
+)
+from .deck_session import save_deck_session, load_deck_session, delete_deck_session
+from .pptx_prerender import (
+    start_pptx_prerender,
+    take_prerendered_pptx,
+    discard_pptx_prerender,
+    discard_all_pptx_prerenders
+)
 
 # Backup builder (compatibilité)
 from .pptx_deck_builder import create_powerpoint_deck
@@ -30,7 +43,17 @@ __all__ = [
     'generate_html_deck_with_ai',
     'validate_html_deck',
     'generate_and_validate_html_deck',
+    'validate_deck_locally',
     'html_to_editable_pptx',
-    'parse_html_to_structure'
+    'parse_html_to_structure',
+    'structure_from_slides_data',
+    'structure_to_editable_pptx',
+    'save_deck_session',
+    'load_deck_session',
+    'delete_deck_session',
+    'start_pptx_prerender',
+    'take_prerendered_pptx',
+    'discard_pptx_prerender',
+    'discard_all_pptx_prerenders'
 ]
 
@@ -2,10 +2,10 @@
 PowerPoint presentation plan generator with AI
 Creates professional Infotel-style presentation plans
 """
-import os
 import json
 from typing import Dict, List
-from openai import AzureOpenAI, OpenAI
+from services.common.llm_client import create_chat_completion, get_model_name
+from services.common.token_budget import clamp_output_tokens, pack_user_content_async
 
 # System prompt for presentation generation (skywork.ai level)
 SYSTEM_PROMPT = """You are a world-class expert in creating commercial and technical presentations at skywork.ai level for Infotel.
@@ -123,37 +123,6 @@ SYSTEM_PROMPT = """You are a world-class expert in creating commercial and techn
 Respond ONLY in strict valid JSON, without additional text or markdown formatting.
 """
 
-def get_ai_client():
-    """Get OpenAI or Azure OpenAI client according to configuration"""
-    from services.common.http_client_helper import remove_proxy_env_vars, restore_proxy_env_vars
-    
-    old_proxies = remove_proxy_env_vars()
-    try:
-        # Check Azure OpenAI configuration
-        azure_endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
-        azure_key = os.getenv("AZURE_OPENAI_KEY")
-        azure_deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT")
-        
-        if azure_endpoint and azure_key:
-            return AzureOpenAI(
-                api_key=azure_key,
-                api_version="2024-02-15-preview",
-                azure_endpoint=azure_endpoint
-            ), azure_deployment
-        
-        # Fallback to OpenAI
-        openai_key = os.getenv("OPENAI_API_KEY")
-        if openai_key:
-            return OpenAI(api_key=openai_key), os.getenv("AZURE_OPENAI_DEPLOYMENT")
-        
-        raise Exception(
-            "No AI service configured. Please configure:\n"
-            "- AZURE_OPENAI_ENDPOINT, AZURE_OPENAI_KEY, AZURE_OPENAI_DEPLOYMENT\n"
-            "- OR OPENAI_API_KEY"
-        )
-    finally:
-        restore_proxy_env_vars(old_proxies)
-
 async def generate_deck_plan_with_ai(content: str) -> Dict:
     """
     Generate a PowerPoint presentation plan with AI
@@ -166,22 +135,26 @@ async def generate_deck_plan_with_ai(content: str) -> Dict:
     """
     
     try:
-        client, model = get_ai_client()
+        model = get_model_name()
         
-        # Truncate if too long
-        max_chars = 120000  # ~30k tokens for GPT-5
-        if len(content) > max_chars:
-            content = content[:max_chars] + "\n\n[... Content truncated for analysis ...]"
+        # Fit content to the model's real context (system prompt and output reserve included)
+        max_output_tokens = clamp_output_tokens(4000, model)
+        user_message, _ = await pack_user_content_async(
+            model,
+            SYSTEM_PROMPT,
+            "Create a professional PowerPoint presentation from this content:\n\n{content}",
+            content,
+            max_output_tokens
+        )
         
         # Call AI
-        response = client.chat.completions.create(
-            model=model,
+        response = await create_chat_completion(
             messages=[
                 {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": f"Create a professional PowerPoint presentation from this content:\n\n{content}"}
+                {"role": "user", "content": user_message}
             ],
             temperature=0.7,  # A bit of creativity for presentation
-            max_tokens=4000,
+            max_tokens=max_output_tokens,
             response_format={"type": "json_object"}
         )
         
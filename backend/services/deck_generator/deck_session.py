@@ -0,0 +1,106 @@
+"""
+Session de présentation entre l'étape 1 (HTML validé) et l'étape 2 (PowerPoint)
+La structure canonique slides_data est conservée à côté du HTML:
+- generated_files/presentation_{html_id}.html: HTML prévisualisé (modifiable à la main)
+- generated_files/presentation_{html_id}.json: slides_data + empreinte SHA-256 du HTML
+
+La carte et le PowerPoint sont construits directement depuis slides_data; le HTML n'est
+re-parsé (BeautifulSoup) que si son empreinte ne correspond plus, c'est-à-dire s'il a été modifié.
+"""
+import hashlib
+import json
+import os
+import uuid
+from datetime import datetime
+from typing import Dict, Optional
+
+from services.deck_generator.html_to_pptx_converter import parse_html_to_structure, structure_from_slides_data
+
+SESSION_DIR = "generated_files"
+
+
+def _session_paths(html_id: str):
+    base = os.path.join(SESSION_DIR, f"presentation_{html_id}")
+    return f"{base}.html", f"{base}.json"
+
+
+def _html_hash(html_content: str) -> str:
+    return hashlib.sha256(html_content.encode("utf-8")).hexdigest()
+
+
+def save_deck_session(html_content: str, slides_data: Dict, html_id: Optional[str] = None) -> str:
+    """
+    Enregistrer le HTML et sa structure canonique
+
+    Args:
+        html_content: HTML complet de la présentation
+        slides_data: Structure JSON à partir de laquelle le HTML a été rendu
+        html_id: Identifiant de session (généré si absent)
+
+    Returns:
+        html_id de la session
+    """
+    html_id = html_id or str(uuid.uuid4())[:8]
+    html_path, data_path = _session_paths(html_id)
+    os.makedirs(SESSION_DIR, exist_ok=True)
+
+    with open(html_path, "w", encoding="utf-8") as f:
+        f.write(html_content)
+
+    with open(data_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "slides_data": slides_data,
+            "html_sha256": _html_hash(html_content),
+            "date": datetime.now().strftime("%d/%m/%Y"),
+            "created_at": datetime.now().isoformat()
+        }, f, ensure_ascii=False)
+
+    return html_id
+
+
+def load_deck_session(html_id: str) -> Optional[Dict]:
+    """
+    Charger une session et sa structure de slides
+
+    Returns:
+        Dict avec html, structure, source ("slides_data" ou "html"), ou None si la session n'existe pas
+    """
+    html_path, data_path = _session_paths(html_id)
+    if not os.path.exists(html_path):
+        return None
+
+    with open(html_path, "r", encoding="utf-8") as f:
+        html_content = f.read()
+
+    session = None
+    if os.path.exists(data_path):
+        try:
+            with open(data_path, "r", encoding="utf-8") as f:
+                session = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Session {html_id} illisible, lecture du HTML: {e}")
+
+    if session and session.get("html_sha256") == _html_hash(html_content):
+        structure = structure_from_slides_data(session["slides_data"], date=session.get("date"))
+        source = "slides_data"
+    else:
+        # HTML modifié à la main (ou session antérieure sans slides_data): il fait foi
+        print(f"✏️ HTML {html_id} modifié depuis la génération: re-parsing du HTML")
+        structure = parse_html_to_structure(html_content)
+        source = "html"
+
+    return {
+        "html_id": html_id,
+        "html": html_content,
+        "structure": structure,
+        "source": source
+    }
+
+
+def delete_deck_session(html_id: str):
+    """Supprimer les fichiers de la session (après conversion)"""
+    for path in _session_paths(html_id):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,317 @@
+"""
+Validateur local (déterministe) des présentations HTML/CSS
+Vérifie en quelques microsecondes ce que validate_html_deck demandait à l'IA:
+- 6 bullets max par slide (les listes trop longues sont réparties sur des slides "(suite)")
+- types de slides valides (normalisés: "cover" → "title", "closing" → "conclusion"...)
+- attributs data-* présents sur chaque slide
+- couleurs hexadécimales de la charte Infotel (hors charte → couleur de charte la plus proche)
+- HTML bien formé (balises fermées et correctement imbriquées)
+
+Seules les questions sémantiques qu'il ne peut pas trancher (slides vides, titres dupliqués,
+nombre de slides atypique...) justifient un appel au validateur IA.
+"""
+import html as html_lib
+import re
+from html.parser import HTMLParser
+from typing import Dict, List, Tuple
+
+from services.common.extract_infotel_colors import INFOTEL_BRAND_COLORS
+
+MAX_BULLETS = 6
+
+VALID_SLIDE_TYPES = ("title", "section", "content", "comparison", "conclusion")
+
+SLIDE_TYPE_ALIASES = {
+    "cover": "title", "titre": "title", "title_slide": "title", "intro": "title", "couverture": "title",
+    "chapter": "section", "chapitre": "section", "divider": "section", "separator": "section", "transition": "section",
+    "bullets": "content", "bullet": "content", "text": "content", "texte": "content", "contenu": "content",
+    "list": "content", "agenda": "content", "sommaire": "content",
+    "compare": "comparison", "comparaison": "comparison", "versus": "comparison", "vs": "comparison",
+    "closing": "conclusion", "end": "conclusion", "fin": "conclusion", "cta": "conclusion", "call_to_action": "conclusion",
+}
+
+# Couleurs autorisées: charte Infotel + neutres du template CSS
+CHARTER_COLORS = {color["hex"].upper() for color in INFOTEL_BRAND_COLORS.values()} | {
+    "#FFFFFF", "#F5F5F5", "#333333", "#1A1A1A", "#000000"
+}
+
+REQUIRED_SLIDE_ATTRIBUTES = ("data-slide-type", "data-slide-index")
+
+# Nombre de slides attendu par le prompt de génération (au-delà: revue sémantique)
+EXPECTED_SLIDE_RANGE = (6, 20)
+
+HEX_COLOR_PATTERN = re.compile(r"#(?:[0-9A-Fa-f]{6}|[0-9A-Fa-f]{3})\b")
+TAG_PATTERN = re.compile(r"<[^>]+>")
+
+VOID_ELEMENTS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+
+def _expand_hex(color: str) -> str:
+    color = color.upper()
+    if len(color) == 4:
+        color = "#" + "".join(char * 2 for char in color[1:])
+    return color
+
+
+def _nearest_charter_color(color: str) -> str:
+    """Couleur de la charte la plus proche (distance RGB)"""
+    red, green, blue = (int(color[i:i + 2], 16) for i in (1, 3, 5))
+    return min(
+        CHARTER_COLORS,
+        key=lambda allowed: sum((a - b) ** 2 for a, b in zip((red, green, blue), (int(allowed[i:i + 2], 16) for i in (1, 3, 5))))
+    )
+
+
+def _clean_text(value) -> str:
+    """Texte brut d'un champ de slide (les balises générées par l'IA sont retirées)"""
+    if value is None:
+        return ""
+    if isinstance(value, dict):
+        value = value.get("text") or value.get("content") or " ".join(str(item) for item in value.values())
+    return html_lib.unescape(TAG_PATTERN.sub("", str(value))).strip()
+
+
+def normalize_slide_type(slide_type) -> str:
+    """Type de slide valide ("content" par défaut)"""
+    normalized = str(slide_type or "").strip().lower().replace("-", "_").replace(" ", "_")
+    if normalized in VALID_SLIDE_TYPES:
+        return normalized
+    return SLIDE_TYPE_ALIASES.get(normalized, "content")
+
+
+def normalize_slides_data(slides_data: Dict) -> Tuple[Dict, List[str]]:
+    """
+    Corriger les problèmes mécaniques de la structure JSON
+
+    Returns:
+        (structure corrigée, liste des corrections appliquées)
+    """
+    fixes = []
+    slides = slides_data.get("slides") if isinstance(slides_data, dict) else None
+    if not isinstance(slides, list):
+        slides = []
+        fixes.append("Structure sans liste de slides")
+
+    normalized_slides = []
+    for index, slide in enumerate(slides, start=1):
+        if not isinstance(slide, dict):
+            fixes.append(f"Slide {index}: format invalide ignoré")
+            continue
+
+        slide = dict(slide)
+        slide_type = normalize_slide_type(slide.get("type"))
+        if slide_type != slide.get("type"):
+            fixes.append(f"Slide {index}: type '{slide.get('type')}' normalisé en '{slide_type}'")
+        slide["type"] = slide_type
+
+        for field in ("title", "subtitle", "notes"):
+            if field in slide:
+                cleaned = _clean_text(slide[field])
+                if cleaned != slide[field]:
+                    fixes.append(f"Slide {index}: champ '{field}' nettoyé")
+                slide[field] = cleaned
+
+        raw_bullets = slide.get("bullets") or []
+        if isinstance(raw_bullets, str):
+            raw_bullets = [line for line in raw_bullets.splitlines()]
+        bullets = [text for text in (_clean_text(bullet) for bullet in raw_bullets) if text]
+        if bullets != raw_bullets and raw_bullets:
+            fixes.append(f"Slide {index}: bullets nettoyés")
+        slide["bullets"] = bullets
+
+        # Listes trop longues: réparties sur des slides de continuation
+        if len(bullets) > MAX_BULLETS and slide_type != "title":
+            parts = [bullets[start:start + MAX_BULLETS] for start in range(0, len(bullets), MAX_BULLETS)]
+            fixes.append(f"Slide {index}: {len(bullets)} bullets répartis sur {len(parts)} slides")
+            for part_index, part in enumerate(parts):
+                continuation = dict(slide, bullets=part)
+                if part_index > 0:
+                    continuation["title"] = f"{slide.get('title', '')} (suite)".strip()
+                    continuation.pop("subtitle", None)
+                normalized_slides.append(continuation)
+            continue
+
+        normalized_slides.append(slide)
+
+    corrected = dict(slides_data) if isinstance(slides_data, dict) else {}
+    corrected["slides"] = normalized_slides
+    if not _clean_text(corrected.get("title")):
+        first_title = next((slide.get("title") for slide in normalized_slides if slide.get("title")), "Présentation")
+        corrected["title"] = first_title
+        fixes.append("Titre de la présentation manquant: titre de la première slide utilisé")
+    return corrected, fixes
+
+
+class _WellFormednessChecker(HTMLParser):
+    """Balises non fermées ou mal imbriquées"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack = []
+        self.errors = []
+        self.slides = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "div" and "slide" in (dict(attrs).get("class") or "").split():
+            self.slides.append(dict(attrs))
+        if tag not in VOID_ELEMENTS:
+            self.stack.append((tag, self.getpos()[0]))
+
+    def handle_startendtag(self, tag, attrs):
+        pass
+
+    def handle_endtag(self, tag):
+        if tag in VOID_ELEMENTS:
+            return
+        if not self.stack:
+            self.errors.append(f"Balise fermante </{tag}> sans ouverture (ligne {self.getpos()[0]})")
+            return
+        if self.stack[-1][0] == tag:
+            self.stack.pop()
+            return
+        if any(open_tag == tag for open_tag, _ in self.stack):
+            while self.stack and self.stack[-1][0] != tag:
+                open_tag, line = self.stack.pop()
+                self.errors.append(f"Balise <{open_tag}> non fermée (ligne {line})")
+            self.stack.pop()
+        else:
+            self.errors.append(f"Balise fermante </{tag}> inattendue (ligne {self.getpos()[0]})")
+
+    def close(self):
+        super().close()
+        for open_tag, line in self.stack:
+            if open_tag not in ("html", "body", "head"):
+                self.errors.append(f"Balise <{open_tag}> non fermée (ligne {line})")
+
+
+def check_html(html_content: str) -> Dict:
+    """
+    Contrôles du HTML généré: bien formé, attributs data-*, couleurs de la charte
+
+    Returns:
+        {"html_errors": [...], "charter_violations": [...], "slide_count": n}
+    """
+    checker = _WellFormednessChecker()
+    checker.feed(html_content)
+    checker.close()
+
+    html_errors = list(checker.errors)
+    for index, attrs in enumerate(checker.slides, start=1):
+        missing = [name for name in REQUIRED_SLIDE_ATTRIBUTES if name not in attrs]
+        if missing:
+            html_errors.append(f"Slide {index}: attributs manquants {', '.join(missing)}")
+        elif attrs.get("data-slide-type") not in VALID_SLIDE_TYPES:
+            html_errors.append(f"Slide {index}: data-slide-type invalide '{attrs.get('data-slide-type')}'")
+
+    off_charter = sorted({
+        _expand_hex(color) for color in HEX_COLOR_PATTERN.findall(html_content)
+    } - CHARTER_COLORS)
+    charter_violations = [f"Couleur hors charte {color}" for color in off_charter]
+
+    return {
+        "html_errors": html_errors,
+        "charter_violations": charter_violations,
+        "slide_count": len(checker.slides)
+    }
+
+
+def fix_charter_colors(html_content: str) -> Tuple[str, List[str]]:
+    """Remplacer les couleurs hors charte par la couleur de charte la plus proche"""
+    fixes = []
+
+    def replace(match):
+        color = _expand_hex(match.group(0))
+        if color in CHARTER_COLORS:
+            return match.group(0)
+        nearest = _nearest_charter_color(color)
+        fixes.append(f"Couleur {color} remplacée par {nearest}")
+        return nearest
+
+    return HEX_COLOR_PATTERN.sub(replace, html_content), fixes
+
+
+def find_semantic_issues(slides_data: Dict) -> List[str]:
+    """
+    Points que les règles ne peuvent pas trancher (revue par le validateur IA)
+    """
+    issues = []
+    slides = slides_data.get("slides", [])
+
+    low, high = EXPECTED_SLIDE_RANGE
+    if not low <= len(slides) <= high:
+        issues.append(f"{len(slides)} slides (attendu: {low} à {high})")
+    if slides and slides[0].get("type") != "title":
+        issues.append("La présentation ne commence pas par une slide de titre")
+    if slides and slides[-1].get("type") != "conclusion":
+        issues.append("La présentation ne se termine pas par une conclusion")
+
+    seen_titles = {}
+    for index, slide in enumerate(slides, start=1):
+        title = slide.get("title", "")
+        if not title:
+            issues.append(f"Slide {index}: titre vide")
+        elif not title.endswith("(suite)"):
+            key = title.lower()
+            if key in seen_titles:
+                issues.append(f"Slide {index}: titre identique à la slide {seen_titles[key]}")
+            seen_titles.setdefault(key, index)
+        if slide.get("type") in ("content", "comparison") and not slide.get("bullets"):
+            issues.append(f"Slide {index}: slide de contenu sans bullets")
+
+    return issues
+
+
+def validate_deck_locally(html_content: str, slides_data: Dict) -> Dict:
+    """
+    Valider et corriger localement une présentation
+
+    Args:
+        html_content: HTML généré
+        slides_data: Structure JSON des slides
+
+    Returns:
+        Même format que validate_html_deck, plus:
+        - fixes_applied: corrections mécaniques appliquées
+        - semantic_issues: points nécessitant une revue par le validateur IA
+        - corrected_slides_data / corrected_html: si des corrections ont été appliquées
+    """
+    from services.deck_generator.html_deck_generator import build_html_from_structure
+
+    corrected_data, fixes = normalize_slides_data(slides_data)
+    rebuilt = bool(fixes)
+    corrected_html = build_html_from_structure(corrected_data) if rebuilt else html_content
+    corrected_html, color_fixes = fix_charter_colors(corrected_html)
+    fixes.extend(color_fixes)
+
+    checks = check_html(corrected_html)
+    if checks["html_errors"] and not rebuilt:
+        # HTML mal formé ou attributs manquants: la structure JSON fait foi, le HTML est reconstruit
+        fixes.append(f"HTML reconstruit depuis la structure ({len(checks['html_errors'])} erreur(s))")
+        corrected_html, color_fixes = fix_charter_colors(build_html_from_structure(corrected_data))
+        fixes.extend(color_fixes)
+        checks = check_html(corrected_html)
+    semantic_issues = find_semantic_issues(corrected_data)
+
+    if checks["html_errors"] or checks["charter_violations"]:
+        status = "invalid"
+    elif semantic_issues:
+        status = "warning"
+    else:
+        status = "valid"
+
+    result = {
+        "validation_status": status,
+        "validator": "local",
+        "html_errors": checks["html_errors"],
+        "css_errors": [],
+        "charter_violations": checks["charter_violations"],
+        "content_issues": semantic_issues,
+        "semantic_issues": semantic_issues,
+        "suggestions": [],
+        "fixes_applied": fixes,
+        "needs_correction": bool(fixes)
+    }
+    if fixes:
+        result["corrected_slides_data"] = corrected_data
+        result["corrected_html"] = corrected_html
+    return result
@@ -4,16 +4,48 @@ Qualité skywork.ai avec validation loop
 """
 
 import os
+import re
 from datetime import datetime
+from html import escape
 from typing import Dict, List, Optional
-from openai import AsyncAzureOpenAI, AsyncOpenAI
 
+from services.common.llm_client import create_chat_completion, get_model_name
+from services.common.token_budget import clamp_output_tokens, fit_to_budget_async, get_input_budget
+from services.deck_generator.deck_validator import validate_deck_locally
 from services.deck_generator.infotel_html_template import (
     get_infotel_css,
     get_html_template,
     create_slide_html
 )
 
+# Extraits envoyés au validateur IA: balisage des slides (sans CSS ni scripts) et début du contenu source.
+# Couleurs, polices et structure sont déjà vérifiées par le validateur local (deck_validator).
+VALIDATION_HTML_MAX_TOKENS = 3000
+VALIDATION_SOURCE_MAX_TOKENS = 1000
+VALIDATION_MAX_OUTPUT_TOKENS = 4000
+
+_NON_CONTENT_MARKUP = re.compile(r"<(style|script|head)\b[^>]*>.*?</\1\s*>|<!--.*?-->", re.IGNORECASE | re.DOTALL)
+_BLANK_RUNS = re.compile(r"\n\s*\n+")
+
+
+def _build_generation_prompt(content: str, title: Optional[str]) -> str:
+    """Message utilisateur de génération (utilisé aussi pour mesurer le budget du contenu)"""
+    return f"""Génère une présentation professionnelle complète sur le sujet suivant:
+
+CONTENU SOURCE:
+{content}
+
+{"TITRE IMPOSÉ: " + title if title else ""}
+
+Analyse ce contenu en profondeur et crée une présentation:
+1. Structure narrative claire avec fil rouge
+2. Titres percutants orientés bénéfices
+3. Bullets concis et impactants (max 6 par slide)
+4. Suggestions visuelles dans les notes
+5. Ton professionnel Infotel (tech, moderne, expert)
+
+Génère le JSON complet maintenant."""
+
 
 async def generate_html_deck_with_ai(
     content: str,
@@ -32,23 +64,9 @@ async def generate_html_deck_with_ai(
         Dict avec 'html', 'slides_data', 'title', 'metadata'
     """
     
-    # Initialiser le client IA
-    from services.common.http_client_helper import remove_proxy_env_vars, restore_proxy_env_vars
-    
-    old_proxies = remove_proxy_env_vars()
-    try:
-        if use_azure:
-            client = AsyncAzureOpenAI(
-                api_key=os.getenv("AZURE_OPENAI_KEY"),
-                api_version="2024-08-01-preview",
-                azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
-            )
-            model = os.getenv("AZURE_OPENAI_DEPLOYMENT")
-        else:
-            client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-            model = os.getenv("AZURE_OPENAI_DEPLOYMENT")
-    finally:
-        restore_proxy_env_vars(old_proxies)
+    # Client IA partagé (pool de connexions keep-alive) et ordonnanceur du déploiement
+    provider = None if use_azure else "openai"
+    model = get_model_name()
     
     # Prompt système ultra-détaillé (Optimisé - Skywork.ai Professional Level)
     system_prompt = """# EXPERT HTML/CSS PRESENTATION ARCHITECT - SKYWORK.AI LEVEL
@@ -241,31 +259,25 @@ If validation fails, you'll be asked to regenerate. **Get it right the first tim
 
 You are NOT just a slide generator. You are a strategic storyteller who creates executive-ready presentations that inspire action and drive decisions at skywork.ai professional level."""
 
-    user_prompt = f"""Génère une présentation professionnelle complète sur le sujet suivant:
-
-CONTENU SOURCE:
-{content}
-
-{"TITRE IMPOSÉ: " + title if title else ""}
-
-Analyse ce contenu en profondeur et crée une présentation:
-1. Structure narrative claire avec fil rouge
-2. Titres percutants orientés bénéfices
-3. Bullets concis et impactants (max 6 par slide)
-4. Suggestions visuelles dans les notes
-5. Ton professionnel Infotel (tech, moderne, expert)
-
-Génère le JSON complet maintenant."""
-
+    # Ajuster le contenu source au contexte réel du modèle (prompts et réserve de sortie comptés)
+    max_output_tokens = clamp_output_tokens(4000, model)
+    content_budget = get_input_budget(
+        model,
+        [{"role": "system", "content": system_prompt}, {"role": "user", "content": _build_generation_prompt("", title)}],
+        max_output_tokens
+    )
+    content, _ = await fit_to_budget_async(content, content_budget, model)
+    user_prompt = _build_generation_prompt(content, title)
+    
     # Appel IA
-    response = await client.chat.completions.create(
-        model=model,
+    response = await create_chat_completion(
+        provider=provider,
         messages=[
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt}
         ],
         temperature=0.8,
-        max_tokens=4000,
+        max_tokens=max_output_tokens,
         response_format={"type": "json_object"}
     )
     
@@ -304,10 +316,10 @@ def build_html_from_structure(slides_data: Dict) -> str:
     html = html.replace("{{INFOTEL_CSS}}", get_infotel_css())
     
     # Métadonnées
-    html = html.replace("{{PRESENTATION_TITLE}}", slides_data.get("title", "Présentation"))
-    html = html.replace("{{PRESENTATION_SUBTITLE}}", slides_data.get("subtitle", ""))
-    html = html.replace("{{PRESENTATION_DATE}}", datetime.now().strftime("%d/%m/%Y"))
-    html = html.replace("{{DATE}}", datetime.now().strftime("%d/%m/%Y"))
+    date = datetime.now().strftime("%d/%m/%Y")
+    html = html.replace("{{PRESENTATION_TITLE}}", escape(str(slides_data.get("title") or "Présentation")))
+    html = html.replace("{{PRESENTATION_SUBTITLE}}", escape(str(slides_data.get("subtitle") or "")))
+    html = html.replace("{{PRESENTATION_DATE}}", date)
     
     # Générer le HTML de chaque slide
     slides_html = ""
@@ -315,11 +327,43 @@ def build_html_from_structure(slides_data: Dict) -> str:
         slides_html += create_slide_html(slide, idx)
         slides_html += "\n"
     
+    # Date des slides de titre (placeholder présent dans le HTML des slides)
+    slides_html = slides_html.replace("{{DATE}}", date)
     html = html.replace("{{SLIDES_CONTENT}}", slides_html)
     
     return html
 
 
+def _build_validation_prompt(html_content: str, slides_data: Dict, original_content: str) -> str:
+    """Message utilisateur de validation (utilisé aussi pour mesurer le budget disponible)"""
+    return f"""Validate this HTML/CSS presentation:
+
+GENERATED HTML (slide markup, stylesheet omitted):
+{html_content}
+
+JSON STRUCTURE:
+{slides_data}
+
+ORIGINAL SOURCE CONTENT:
+{original_content}
+
+Check:
+1. HTML/CSS syntactically correct
+2. Infotel 2025 charter respected (colors, fonts)
+3. Content coherent with request
+4. Max 6 bullets per slide
+5. All data-attributes present
+6. Correct semantic structure
+
+Respond in JSON."""
+
+
+def _slide_markup(html_content: str) -> str:
+    """Balisage des slides à valider: sans <head>, <style>, <script> ni commentaires"""
+    markup = _NON_CONTENT_MARKUP.sub("", html_content)
+    return _BLANK_RUNS.sub("\n", markup).strip()
+
+
 async def validate_html_deck(
     html_content: str,
     original_content: str,
@@ -342,23 +386,9 @@ async def validate_html_deck(
         Dict avec validation_status, errors, suggestions, corrected_html
     """
     
-    # Initialiser le client IA
-    from services.common.http_client_helper import remove_proxy_env_vars, restore_proxy_env_vars
-    
-    old_proxies = remove_proxy_env_vars()
-    try:
-        if use_azure:
-            client = AsyncAzureOpenAI(
-                api_key=os.getenv("AZURE_OPENAI_KEY"),
-                api_version="2024-08-01-preview",
-                azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
-            )
-            model = os.getenv("AZURE_OPENAI_DEPLOYMENT")
-        else:
-            client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-            model = os.getenv("AZURE_OPENAI_DEPLOYMENT")
-    finally:
-        restore_proxy_env_vars(old_proxies)
+    # Client IA partagé (pool de connexions keep-alive) et ordonnanceur du déploiement
+    provider = None if use_azure else "openai"
+    model = get_model_name()
     
     system_prompt = """You are an expert validation agent specializing in:
 1. HTML/CSS (W3C standards, linting)
@@ -395,34 +425,29 @@ JSON RESPONSE:
   "corrected_slides_data": {...}  // If correction needed
 }"""
 
-    user_prompt = f"""Validate this HTML/CSS presentation:
-
-GENERATED HTML:
-{html_content[:3000]}... (excerpt)
-
-JSON STRUCTURE:
-{slides_data}
-
-ORIGINAL SOURCE CONTENT:
-{original_content[:1000]}...
-
-Check:
-1. HTML/CSS syntactically correct
-2. Infotel 2025 charter respected (colors, fonts)
-3. Content coherent with request
-4. Max 6 bullets per slide
-5. All data-attributes present
-6. Correct semantic structure
-
-Respond in JSON."""
-
-    response = await client.chat.completions.create(
-        model=model,
+    # Extraits bornés: balisage des slides sans CSS inline, début du contenu source
+    # (bornés aussi par le contexte réel du modèle, structure JSON complète comptée)
+    max_output_tokens = clamp_output_tokens(VALIDATION_MAX_OUTPUT_TOKENS, model)
+    budget = get_input_budget(
+        model,
+        [{"role": "system", "content": system_prompt}, {"role": "user", "content": _build_validation_prompt("", slides_data, "")}],
+        max_output_tokens
+    )
+    html_budget = min(VALIDATION_HTML_MAX_TOKENS, budget * 3 // 4)
+    source_budget = min(VALIDATION_SOURCE_MAX_TOKENS, budget - html_budget)
+    html_excerpt, _ = await fit_to_budget_async(_slide_markup(html_content), html_budget, model)
+    # Seul le début du contenu source est envoyé: inutile de compter tout le document
+    original_excerpt, _ = await fit_to_budget_async(original_content[:source_budget * 8], source_budget, model)
+    user_prompt = _build_validation_prompt(html_excerpt, slides_data, original_excerpt)
+    
+    response = await create_chat_completion(
+        provider=provider,
         messages=[
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt}
         ],
         temperature=0.3,
+        max_tokens=max_output_tokens,
         response_format={"type": "json_object"}
     )
     
@@ -446,6 +471,10 @@ async def generate_and_validate_html_deck(
     """
     Génère et valide une présentation HTML avec loop de correction
     
+    Le validateur local (deck_validator) corrige d'abord les problèmes mécaniques
+    (bullets, types de slides, attributs, couleurs, HTML); le validateur IA n'est appelé
+    que pour les questions sémantiques (DECK_LLM_VALIDATION: auto | always | never).
+    
     Args:
         content: Contenu source
         title: Titre de la présentation (optionnel)
@@ -457,11 +486,21 @@ async def generate_and_validate_html_deck(
     """
     iterations_history = []
     current_iteration = 0
+    llm_validation = os.getenv("DECK_LLM_VALIDATION", "auto").lower()
     
     # Première génération
     print(f"🎨 [GÉNÉRATION HTML] Génération initiale de la présentation...")
     deck_result = await generate_html_deck_with_ai(content, title, use_azure)
     
+    # Validation locale: corrige les problèmes mécaniques sans appel IA
+    validation = _apply_local_validation(deck_result, iterations_history)
+    
+    # Validateur IA uniquement pour les questions sémantiques que les règles ne tranchent pas
+    if llm_validation == "never" or (llm_validation == "auto" and not validation["semantic_issues"]):
+        max_iterations = 0
+    elif llm_validation == "auto":
+        print(f"🧐 [VALIDATION IA] Revue sémantique nécessaire: {validation['semantic_issues']}")
+    
     while current_iteration < max_iterations:
         current_iteration += 1
         print(f"🔍 [VALIDATION {current_iteration}/{max_iterations}] Validation en cours...")
@@ -475,7 +514,8 @@ async def generate_and_validate_html_deck(
         )
         
         iterations_history.append({
-            "iteration": current_iteration,
+            "iteration": len(iterations_history) + 1,
+            "validator": "ai",
             "validation": validation,
             "html_length": len(deck_result["html"])
         })
@@ -485,11 +525,15 @@ async def generate_and_validate_html_deck(
             print(f"✅ [VALIDATION] Présentation validée avec succès!")
             break
         
-        # Si correction disponible, l'appliquer
+        # Si correction disponible, l'appliquer puis revalider localement
         if validation.get("corrected_html"):
             print(f"🔧 [CORRECTION] Application des corrections...")
             deck_result["html"] = validation["corrected_html"]
             deck_result["slides_data"] = validation.get("corrected_slides_data", deck_result["slides_data"])
+            local_validation = _apply_local_validation(deck_result, iterations_history)
+            if not local_validation["semantic_issues"]:
+                validation = local_validation
+                break
         else:
             # Sinon warning mais on continue
             print(f"⚠️ [WARNING] Validation avec warnings, mais génération continue")
@@ -503,3 +547,24 @@ async def generate_and_validate_html_deck(
         "final_status": validation.get("validation_status", "unknown")
     }
 
+
+def _apply_local_validation(deck_result: Dict, iterations_history: List[Dict]) -> Dict:
+    """Valider localement et appliquer les corrections mécaniques au résultat"""
+    validation = validate_deck_locally(deck_result["html"], deck_result["slides_data"])
+    
+    if validation.get("corrected_html"):
+        deck_result["html"] = validation["corrected_html"]
+        deck_result["slides_data"] = validation["corrected_slides_data"]
+        deck_result["metadata"]["slide_count"] = len(deck_result["slides_data"].get("slides", []))
+    
+    iterations_history.append({
+        "iteration": len(iterations_history) + 1,
+        "validator": "local",
+        "validation": validation,
+        "html_length": len(deck_result["html"])
+    })
+    
+    if validation["fixes_applied"]:
+        print(f"🔧 [VALIDATION LOCALE] {len(validation['fixes_applied'])} correction(s): {validation['fixes_applied']}")
+    print(f"✅ [VALIDATION LOCALE] Statut: {validation['validation_status']}")
+    return validation
@@ -4,6 +4,7 @@ Parse le HTML structuré et reconstruit nativement avec python-pptx
 """
 
 import re
+from datetime import datetime
 from typing import Dict, List
 from bs4 import BeautifulSoup
 from pptx import Presentation
@@ -128,6 +129,65 @@ def parse_html_to_structure(html_content: str) -> Dict:
     }
 
 
+def structure_from_slides_data(slides_data: Dict, date: str = None) -> Dict:
+    """
+    Construit directement depuis slides_data la structure que parse_html_to_structure
+    extrairait du HTML rendu par build_html_from_structure (sans parsing BeautifulSoup)
+    
+    Args:
+        slides_data: Structure JSON canonique de la présentation
+        date: Date affichée sur les slides de titre (défaut: aujourd'hui)
+    
+    Returns:
+        Dict avec title, subtitle, slides (list)
+    """
+    date = date or datetime.now().strftime("%d/%m/%Y")
+    slides = []
+    
+    for slide in slides_data.get("slides", []):
+        slide_type = str(slide.get("type", "content"))
+        title = str(slide.get("title", "")).strip()
+        subtitle = str(slide.get("subtitle", "")).strip()
+        bullets = [str(bullet).strip() for bullet in slide.get("bullets", [])]
+        
+        slide_data = {
+            "type": slide_type,
+            "notes": str(slide.get("notes", "")),
+            "title": title
+        }
+        
+        if slide_type == "title":
+            if subtitle:
+                slide_data["subtitle"] = subtitle
+            slide_data["author"] = "Infotel"
+            slide_data["date"] = date
+        
+        elif slide_type == "conclusion":
+            # Le HTML regroupe les bullets dans un seul paragraphe
+            joined = " ".join(bullets).strip()
+            if joined:
+                slide_data["bullets"] = [joined]
+        
+        elif slide_type == "comparison":
+            mid = len(bullets) // 2
+            slide_data["bullets"] = ["**Option A**", *bullets[:mid], "**Option B**", *bullets[mid:]]
+        
+        elif slide_type != "section":
+            if subtitle:
+                slide_data["subtitle"] = subtitle
+            bullets = [bullet for bullet in bullets if bullet]
+            if bullets:
+                slide_data["bullets"] = bullets
+        
+        slides.append(slide_data)
+    
+    return {
+        "title": str(slides_data.get("title") or "Présentation").strip(),
+        "subtitle": str(slides_data.get("subtitle") or "").strip(),
+        "slides": slides
+    }
+
+
 def html_to_editable_pptx(html_content: str, output_path: str) -> str:
     """
     Convertit le HTML en PowerPoint ÉDITABLE natif
@@ -142,7 +202,21 @@ def html_to_editable_pptx(html_content: str, output_path: str) -> str:
     """
     print("🔄 [HTML→PPTX] Parsing du HTML...")
     structure = parse_html_to_structure(html_content)
+    return structure_to_editable_pptx(structure, output_path)
+
+
+def structure_to_editable_pptx(structure: Dict, output_path: str) -> str:
+    """
+    Construit le PowerPoint ÉDITABLE natif à partir de la structure des slides
+    (parse_html_to_structure ou structure_from_slides_data)
+    
+    Args:
+        structure: Dict avec title, subtitle, slides (list)
+        output_path: Chemin du fichier .pptx à créer
     
+    Returns:
+        Chemin du fichier créé
+    """
     print(f"📊 [HTML→PPTX] {len(structure['slides'])} slides détectées")
     
     # Créer la présentation PowerPoint
@@ -3,6 +3,8 @@ Template HTML/CSS pour génération de présentations Infotel
 Charte graphique 2025 complète intégrée
 """
 
+from html import escape
+
 from services.common.extract_infotel_colors import INFOTEL_BRAND_COLORS
 
 def get_infotel_css() -> str:
@@ -542,11 +544,12 @@ def create_slide_html(slide_data: dict, slide_index: int) -> str:
     Returns:
         HTML de la slide
     """
-    slide_type = slide_data.get('type', 'content')
-    title = slide_data.get('title', '')
-    subtitle = slide_data.get('subtitle', '')
-    bullets = slide_data.get('bullets', [])
-    notes = slide_data.get('notes', '')
+    # Texte échappé: un "<", "&" ou guillemet dans le contenu ne doit pas casser le HTML
+    slide_type = escape(str(slide_data.get('type', 'content')))
+    title = escape(str(slide_data.get('title', '')))
+    subtitle = escape(str(slide_data.get('subtitle', '')))
+    bullets = [escape(str(bullet)) for bullet in slide_data.get('bullets', [])]
+    notes = escape(str(slide_data.get('notes', '')))
     
     html = f'<div class="slide" data-slide-type="{slide_type}" data-slide-index="{slide_index}" data-notes="{notes}">\n'
     
@@ -555,7 +558,7 @@ def create_slide_html(slide_data: dict, slide_index: int) -> str:
         if subtitle:
             html += f'  <p class="slide-subtitle" data-editable="true">{subtitle}</p>\n'
         html += f'  <p class="slide-author" data-editable="true">Infotel</p>\n'
-        html += f'  <p class="slide-date" data-editable="true">{{DATE}}</p>\n'
+        html += '  <p class="slide-date" data-editable="true">{{DATE}}</p>\n'
     
     elif slide_type == 'section':
         html += f'  <h2 class="slide-title" data-editable="true">{title}</h2>\n'
@@ -0,0 +1,134 @@
+"""
+Pré-rendu du PowerPoint pendant que l'utilisateur relit le plan
+Dès que le HTML est validé (étape 1), le PowerPoint ÉDITABLE est construit en tâche de fond
+(pool de rendu, services/common/process_pool.py),
+indexé par html_id: à la confirmation (étape 2), le fichier est prêt, ou il ne reste
+que la fin de la construction à attendre.
+
+Les pré-rendus jamais confirmés sont évincés après DECK_PRERENDER_TTL secondes
+(défaut: 1800, 0 = désactivé) et leur fichier supprimé.
+"""
+import asyncio
+import os
+import time
+import uuid
+from typing import Dict, Optional
+
+from services.common.process_pool import render_pptx
+from services.deck_generator.html_to_pptx_converter import structure_to_editable_pptx
+
+OUTPUT_DIR = "generated_files"
+
+_jobs = {}  # html_id -> {"task", "filename", "created_at", "timer"}
+
+
+def _prerender_ttl() -> float:
+    return float(os.getenv("DECK_PRERENDER_TTL", "1800"))
+
+
+def start_pptx_prerender(html_id: str, structure: Dict) -> bool:
+    """
+    Lancer la construction du PowerPoint en tâche de fond
+
+    Args:
+        html_id: Identifiant de la session de présentation
+        structure: Structure des slides (structure_from_slides_data)
+
+    Returns:
+        True si le pré-rendu a été lancé
+    """
+    ttl = _prerender_ttl()
+    if ttl <= 0:
+        return False
+
+    discard_pptx_prerender(html_id)
+
+    loop = asyncio.get_running_loop()
+    filename = f"presentation_{str(uuid.uuid4())[:8]}.pptx"
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    output_path = os.path.join(OUTPUT_DIR, filename)
+
+    task = loop.create_task(render_pptx(structure_to_editable_pptx, structure, output_path))
+    task.add_done_callback(lambda done: _report_failure(html_id, done))
+    job = {"task": task, "filename": filename, "created_at": time.monotonic(), "timer": None}
+    job["timer"] = loop.call_later(ttl, _evict, html_id, job)
+    _jobs[html_id] = job
+
+    print(f"⏩ [PRÉ-RENDU] Construction du PowerPoint lancée pour {html_id}")
+    return True
+
+
+async def take_prerendered_pptx(html_id: str) -> Optional[str]:
+    """
+    Récupérer le PowerPoint pré-rendu d'une session (en attendant la fin de sa construction)
+
+    Returns:
+        Nom du fichier dans generated_files, ou None s'il n'y a pas de pré-rendu utilisable
+    """
+    job = _jobs.get(html_id)
+    if job is None or job["task"].get_loop() is not asyncio.get_running_loop():
+        return None
+
+    waited_from = time.perf_counter()
+    try:
+        # shield: un client qui abandonne la confirmation ne perd pas le pré-rendu
+        await asyncio.shield(job["task"])
+    except Exception as e:
+        print(f"⚠️ [PRÉ-RENDU] Pré-rendu {html_id} inutilisable, construction à la demande: {e}")
+        discard_pptx_prerender(html_id)
+        return None
+
+    if _jobs.get(html_id) is not job:
+        # Évincé pendant l'attente
+        return None
+
+    del _jobs[html_id]
+    job["timer"].cancel()
+    waited = time.perf_counter() - waited_from
+    age = time.monotonic() - job["created_at"]
+    print(f"⚡ [PRÉ-RENDU] PowerPoint prêt pour {html_id} (lancé il y a {age:.1f}s, attente {waited * 1000:.0f} ms)")
+    return job["filename"]
+
+
+def discard_pptx_prerender(html_id: str):
+    """Abandonner le pré-rendu d'une session (HTML modifié, session régénérée...)"""
+    job = _jobs.pop(html_id, None)
+    if job is not None:
+        _drop(job)
+
+
+def discard_all_pptx_prerenders():
+    """Abandonner tous les pré-rendus en cours (arrêt du serveur)"""
+    for html_id in list(_jobs):
+        discard_pptx_prerender(html_id)
+
+
+def _evict(html_id: str, job: Dict):
+    if _jobs.get(html_id) is job:
+        del _jobs[html_id]
+        print(f"🗑️ [PRÉ-RENDU] {html_id} non confirmé, PowerPoint évincé")
+        _drop(job)
+
+
+def _report_failure(html_id: str, task: asyncio.Task):
+    # Récupère l'exception même si personne ne confirme (pas d'avertissement asyncio)
+    if not task.cancelled() and task.exception() is not None:
+        print(f"⚠️ [PRÉ-RENDU] Échec de la construction pour {html_id}: {task.exception()}")
+
+
+def _drop(job: Dict):
+    job["timer"].cancel()
+    path = os.path.join(OUTPUT_DIR, job["filename"])
+
+    def _remove_file(_task=None):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    task = job["task"]
+    if task.done():
+        _remove_file()
+    else:
+        # Le rendu en cours termine quand même: supprimer le fichier à la fin
+        task.add_done_callback(_remove_file)
@@ -2,10 +2,10 @@
 AI-powered Diagram Generation Service
 Creates corporate-style PowerPoint diagrams like napkin.ai
 """
-import os
 import json
 from typing import Dict, List
-from openai import AzureOpenAI, OpenAI
+from services.common.llm_client import create_chat_completion, get_model_name
+from services.common.token_budget import clamp_output_tokens, pack_user_content_async
 
 # System prompt for diagram generation (Optimisé - Napkin.ai Professional Level)
 DIAGRAM_PROMPT = """# EXPERT DIAGRAM ARCHITECT - VISUAL COMMUNICATION DESIGNER
@@ -235,31 +235,6 @@ Your diagram must achieve napkin.ai professional standards:
 You are NOT just a diagram tool. You are a visual storyteller who transforms complexity into instant clarity at napkin.ai professional level.
 """
 
-def get_ai_client():
-    """Get OpenAI or Azure OpenAI client"""
-    from services.common.http_client_helper import remove_proxy_env_vars, restore_proxy_env_vars
-    
-    old_proxies = remove_proxy_env_vars()
-    try:
-        azure_endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
-        azure_key = os.getenv("AZURE_OPENAI_KEY")
-        azure_deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT")
-        
-        if azure_endpoint and azure_key:
-            return AzureOpenAI(
-                api_key=azure_key,
-                api_version="2024-02-15-preview",
-                azure_endpoint=azure_endpoint
-            ), azure_deployment
-        
-        openai_key = os.getenv("OPENAI_API_KEY")
-        if openai_key:
-            return OpenAI(api_key=openai_key), os.getenv("AZURE_OPENAI_DEPLOYMENT")
-        
-        raise Exception("No AI service configured for diagram generation")
-    finally:
-        restore_proxy_env_vars(old_proxies)
-
 async def generate_diagram_spec_with_ai(description: str) -> Dict:
     """
     Generate diagram specification using AI
@@ -271,23 +246,27 @@ async def generate_diagram_spec_with_ai(description: str) -> Dict:
         Diagram specification dict
     """
     try:
-        client, model = get_ai_client()
+        model = get_model_name()
         
-        # Truncate if too long
-        max_chars = 30000
-        if len(description) > max_chars:
-            description = description[:max_chars] + "\n\n[... Truncated for diagram generation ...]"
+        # Fit description to the model's real context (system prompt and output reserve included)
+        max_output_tokens = clamp_output_tokens(3000, model)
+        user_message, _ = await pack_user_content_async(
+            model,
+            DIAGRAM_PROMPT,
+            "Create a corporate diagram for this:\n\n{content}",
+            description,
+            max_output_tokens
+        )
         
         # Call AI
         print(f"🎨 Generating diagram specification ({len(description)} chars)...")
-        response = client.chat.completions.create(
-            model=model,
+        response = await create_chat_completion(
             messages=[
                 {"role": "system", "content": DIAGRAM_PROMPT},
-                {"role": "user", "content": f"Create a corporate diagram for this:\n\n{description}"}
+                {"role": "user", "content": user_message}
             ],
             temperature=0.7,  # More creative for visual design
-            max_tokens=3000,
+            max_tokens=max_output_tokens,
             response_format={"type": "json_object"}
         )
         
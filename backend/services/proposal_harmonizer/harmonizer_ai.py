@@ -2,10 +2,10 @@
 Module IA pour harmoniser et restructurer des présentations PowerPoint
 Utilise GPT-5 pour analyser et réorganiser le contenu selon les best practices Infotel
 """
-import os
 import json
 from typing import Dict
-from openai import AzureOpenAI, OpenAI
+from services.common.llm_client import create_chat_completion, get_model_name
+from services.common.token_budget import clamp_output_tokens, pack_user_content_async
 
 # Prompt système pour l'harmonisation de présentations (Optimisé - Niveau Professionnel)
 HARMONIZATION_PROMPT = """# EXPERT POWERPOINT HARMONIZER - BRAND STANDARDIZATION SPECIALIST
@@ -214,37 +214,6 @@ Before returning JSON, verify:
 You are NOT just a formatter. You are a brand guardian who transforms chaos into executive-ready excellence while preserving every critical insight.
 """
 
-def get_ai_client():
-    """Obtenir le client OpenAI ou Azure OpenAI selon la configuration"""
-    from services.common.http_client_helper import remove_proxy_env_vars, restore_proxy_env_vars
-    
-    old_proxies = remove_proxy_env_vars()
-    try:
-        # Vérifier la configuration Azure OpenAI
-        azure_endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
-        azure_key = os.getenv("AZURE_OPENAI_KEY")
-        azure_deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT")
-        
-        if azure_endpoint and azure_key:
-            return AzureOpenAI(
-                api_key=azure_key,
-                api_version="2024-02-15-preview",
-                azure_endpoint=azure_endpoint
-            ), azure_deployment
-        
-        # Fallback vers OpenAI
-        openai_key = os.getenv("OPENAI_API_KEY")
-        if openai_key:
-            return OpenAI(api_key=openai_key), os.getenv("AZURE_OPENAI_DEPLOYMENT")
-        
-        raise Exception(
-            "Aucun service IA configuré. Veuillez configurer:\n"
-            "- AZURE_OPENAI_ENDPOINT, AZURE_OPENAI_KEY, AZURE_OPENAI_DEPLOYMENT\n"
-            "- OU OPENAI_API_KEY"
-        )
-    finally:
-        restore_proxy_env_vars(old_proxies)
-
 async def harmonize_presentation_with_ai(extracted_content: Dict) -> Dict:
     """
     Harmoniser et restructurer une présentation avec l'IA
@@ -257,7 +226,7 @@ async def harmonize_presentation_with_ai(extracted_content: Dict) -> Dict:
     """
     
     try:
-        client, model = get_ai_client()
+        model = get_model_name()
         
         # Convertir le contenu extrait en texte pour l'IA
         content_text = f"""Présentation à harmoniser:
@@ -279,15 +248,24 @@ Contenu des slides:
             if slide.get('notes'):
                 content_text += f"Notes: {slide['notes']}\n"
         
+        # Ajuster le contenu au contexte réel du modèle
+        max_output_tokens = clamp_output_tokens(4000, model)
+        user_message, _ = await pack_user_content_async(
+            model,
+            HARMONIZATION_PROMPT,
+            "Harmonise cette présentation selon les standards Infotel:\n\n{content}",
+            content_text,
+            max_output_tokens
+        )
+        
         # Appel à l'IA
-        response = client.chat.completions.create(
-            model=model,
+        response = await create_chat_completion(
             messages=[
                 {"role": "system", "content": HARMONIZATION_PROMPT},
-                {"role": "user", "content": f"Harmonise cette présentation selon les standards Infotel:\n\n{content_text}"}
+                {"role": "user", "content": user_message}
             ],
             temperature=0.5,  # Équilibre entre créativité et fidélité
-            max_tokens=4000,
+            max_tokens=max_output_tokens,
             response_format={"type": "json_object"}
         )
         
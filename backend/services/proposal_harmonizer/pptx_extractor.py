@@ -3,15 +3,15 @@ Extracteur de contenu PowerPoint
 Lit un fichier .pptx existant et extrait son contenu structuré
 """
 from pptx import Presentation
-from typing import Dict, List
+from typing import BinaryIO, Dict, List, Union
 import os
 
-def extract_content_from_pptx(pptx_path: str) -> Dict:
+def extract_content_from_pptx(pptx_source: Union[str, BinaryIO]) -> Dict:
     """
     Extraire le contenu structuré d'un fichier PowerPoint existant
     
     Args:
-        pptx_path: Chemin vers le fichier .pptx à analyser
+        pptx_source: Chemin vers le fichier .pptx, ou fichier binaire ouvert (ex: UploadFile.file)
     
     Returns:
         Dict contenant le contenu structuré:
@@ -30,10 +30,13 @@ def extract_content_from_pptx(pptx_path: str) -> Dict:
         }
     """
     
-    if not os.path.exists(pptx_path):
-        raise FileNotFoundError(f"Fichier PowerPoint introuvable: {pptx_path}")
+    if isinstance(pptx_source, (str, os.PathLike)):
+        if not os.path.exists(pptx_source):
+            raise FileNotFoundError(f"Fichier PowerPoint introuvable: {pptx_source}")
+    elif pptx_source.seekable():
+        pptx_source.seek(0)
     
-    prs = Presentation(pptx_path)
+    prs = Presentation(pptx_source)
     
     extracted_data = {
         "title": "",
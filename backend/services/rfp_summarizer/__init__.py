@@ -2,13 +2,28 @@
 Agent RFP Summarizer
 Analyse et résume les appels d'offres (RFP) avec IA
 """
-from .ai_summarizer import summarize_rfp_with_ai
-from .file_extractor import extract_text_from_file
+from .ai_summarizer import summarize_rfp_with_ai, stream_rfp_summary
+from .file_extractor import extract_text_from_file, extract_text_preview
+from .text_normalizer import normalize_document_text, prepare_text_for_llm
+from .speculative_summary import (
+    start_speculative_summary,
+    take_speculative_summary,
+    cancel_speculative_summary,
+    cancel_all_speculative_summaries
+)
 from .sharepoint_extractor import extract_text_from_sharepoint, is_sharepoint_url
 
 __all__ = [
     'summarize_rfp_with_ai',
+    'stream_rfp_summary',
     'extract_text_from_file',
+    'extract_text_preview',
+    'normalize_document_text',
+    'prepare_text_for_llm',
+    'start_speculative_summary',
+    'take_speculative_summary',
+    'cancel_speculative_summary',
+    'cancel_all_speculative_summaries',
     'extract_text_from_sharepoint',
     'is_sharepoint_url'
 ]
@@ -2,10 +2,21 @@
 Service d'analyse d'appels d'offres (RFP) avec IA
 Utilise Azure OpenAI ou OpenAI pour générer des résumés structurés
 """
-import os
 import json
-from typing import List
-from openai import AzureOpenAI, OpenAI
+import os
+import time
+from typing import AsyncIterator, List, Tuple
+from services.common.llm_client import create_chat_completion, get_model_name
+from services.common.incremental_json import IncrementalJSONParser
+from services.common.result_cache import get_result_cache
+from services.common.token_budget import clamp_output_tokens, count_message_tokens, count_tokens_async, get_input_budget
+from .chunked_analyzer import analyze_in_chunks
+
+# Version du prompt: à incrémenter à chaque modification de SYSTEM_PROMPT ou du schéma
+# (invalide automatiquement les analyses en cache)
+PROMPT_VERSION = "2025.2"
+
+USER_PREFIX = "Analysez cet appel d'offres:\n\n"
 
 # Prompt système pour l'analyse d'appels d'offres (Optimisé - Niveau Professionnel)
 SYSTEM_PROMPT = """# EXPERT RFP ANALYZER - SENIOR CONSULTANT
@@ -300,76 +311,60 @@ Your analysis must meet these standards:
 You are NOT just an analyzer. You are a strategic consultant providing decision intelligence that determines bid success.
 """
 
-def get_ai_client():
-    """Obtenir le client OpenAI ou Azure OpenAI selon la configuration d'environnement"""
-    from services.common.http_client_helper import remove_proxy_env_vars, restore_proxy_env_vars
-    
-    # Supprimer les proxies avant de créer les clients
-    old_proxies = remove_proxy_env_vars()
-    
-    try:
-        # Vérifier la configuration Azure OpenAI
-        azure_endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
-        azure_key = os.getenv("AZURE_OPENAI_KEY")
-        azure_deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT")
-        
-        if azure_endpoint and azure_key:
-            return AzureOpenAI(
-                api_key=azure_key,
-                api_version="2024-02-15-preview",
-                azure_endpoint=azure_endpoint
-            ), azure_deployment
-        
-        # Repli sur OpenAI Direct
-        openai_key = os.getenv("OPENAI_API_KEY")
-        if openai_key:
-            return OpenAI(api_key=openai_key), os.getenv("AZURE_OPENAI_DEPLOYMENT")
-        
-        raise Exception(
-            "Aucun service IA configuré. Veuillez configurer:\n"
-            "- AZURE_OPENAI_ENDPOINT, AZURE_OPENAI_KEY, AZURE_OPENAI_DEPLOYMENT\n"
-            "- OU OPENAI_API_KEY"
-        )
-    finally:
-        restore_proxy_env_vars(old_proxies)
-
-async def summarize_rfp_with_ai(rfp_text: str) -> dict:
+async def summarize_rfp_with_ai(rfp_text: str, use_cache: bool = True) -> dict:
     """
     Résumer un appel d'offres avec l'IA
     
+    Les analyses sont mises en cache par hash du texte extrait + version du prompt
+    + modèle: un même DCE ré-uploadé est servi sans nouvel appel IA.
+    
     Args:
         rfp_text: Contenu complet de l'appel d'offres
+        use_cache: Utiliser le cache de résultats (lecture et écriture)
     
     Returns:
-        Résumé structuré au format dict conforme au schéma API
+        Résumé structuré au format dict conforme au schéma API,
+        avec "metadata" indiquant le statut du cache (hit / miss)
     """
     
+    started_at = time.perf_counter()
+    model = get_model_name()
+    cache = get_result_cache("rfp_summary")
+    cache_key = cache.make_key(PROMPT_VERSION, model, rfp_text)
+    
+    if use_cache:
+        cached = await cache.get(cache_key)
+        if cached is not None:
+            print("⚡ Analyse trouvée dans le cache")
+            cached["metadata"] = _build_metadata("hit", cache_key, model, started_at)
+            return cached
+    
+    analysis_mode = "single"
+    chunk_count = 1
+    failed_chunks = 0
+    
     try:
-        client, model = get_ai_client()
+        max_output_tokens, needs_chunking, document_tokens, message_tokens = await _plan_analysis(rfp_text, model)
         
-        # Tronquer si trop long (garder les premiers 80% de la limite de tokens)
-        max_chars = 120000  # Environ 30k tokens pour GPT-5
-        if len(rfp_text) > max_chars:
-            rfp_text = rfp_text[:max_chars] + "\n\n[... Document tronqué pour analyse ...]"
+        # Document trop long pour un seul appel: analyse map-reduce par parties
+        # (plus de troncature: les clauses en fin de DCE sont analysées)
+        if needs_chunking:
+            result, chunk_count, failed_chunks = await _analyze_long_document(rfp_text, model, document_tokens)
+            analysis_mode = "chunked"
+            return await _finalize(result, cache, cache_key, use_cache, model, started_at, analysis_mode, chunk_count, failed_chunks)
         
         # Appeler l'IA
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": f"Analysez cet appel d'offres:\n\n{rfp_text}"}
-            ],
+        response = await create_chat_completion(
+            messages=_build_messages(rfp_text),
+            input_tokens=message_tokens,
             temperature=0.2,
-            max_tokens=4000,  # Augmenté pour l'analyse détaillée en français
+            max_tokens=max_output_tokens,
             response_format={"type": "json_object"}
         )
         
         # Parser la réponse
         result_text = response.choices[0].message.content
         result = json.loads(result_text)
-        
-        # Retourner la réponse structurée complète
-        return result
     
     except json.JSONDecodeError as e:
         print(f"Erreur lors du parsing de la réponse IA: {str(e)}")
@@ -377,4 +372,160 @@ async def summarize_rfp_with_ai(rfp_text: str) -> dict:
     except Exception as e:
         print(f"Erreur lors de l'appel au service IA: {str(e)}")
         raise Exception(f"Échec de l'analyse de l'appel d'offres: {str(e)}")
+    
+    return await _finalize(result, cache, cache_key, use_cache, model, started_at, analysis_mode, chunk_count, failed_chunks)
 
+async def stream_rfp_summary(rfp_text: str, use_cache: bool = True) -> AsyncIterator[Tuple[str, dict]]:
+    """
+    Résumer un appel d'offres en streaming
+    
+    Le modèle est appelé avec stream=True et chaque section de premier niveau
+    (informations_generales, lots, calendrier...) est restituée dès qu'elle est complète.
+    Un résultat en cache est restitué immédiatement, section par section.
+    Les documents longs (analyse par parties) restituent leurs sections après la fusion.
+    
+    Args:
+        rfp_text: Contenu complet de l'appel d'offres
+        use_cache: Utiliser le cache de résultats (lecture et écriture)
+    
+    Yields:
+        ("section", {"name": ..., "data": ...}) pour chaque section terminée,
+        puis ("complete", résumé complet avec "metadata")
+    """
+    
+    started_at = time.perf_counter()
+    model = get_model_name()
+    cache = get_result_cache("rfp_summary")
+    cache_key = cache.make_key(PROMPT_VERSION, model, rfp_text)
+    
+    if use_cache:
+        cached = await cache.get(cache_key)
+        if cached is not None:
+            print("⚡ Analyse trouvée dans le cache")
+            for name, data in cached.items():
+                yield "section", {"name": name, "data": data}
+            cached["metadata"] = _build_metadata("hit", cache_key, model, started_at)
+            yield "complete", cached
+            return
+    
+    try:
+        max_output_tokens, needs_chunking, document_tokens, message_tokens = await _plan_analysis(rfp_text, model)
+        
+        if needs_chunking:
+            result, chunk_count, failed_chunks = await _analyze_long_document(rfp_text, model, document_tokens)
+            for name, data in result.items():
+                yield "section", {"name": name, "data": data}
+            yield "complete", await _finalize(
+                result, cache, cache_key, use_cache, model, started_at, "chunked", chunk_count, failed_chunks
+            )
+            return
+        
+        stream = await create_chat_completion(
+            messages=_build_messages(rfp_text),
+            input_tokens=message_tokens,
+            temperature=0.2,
+            max_tokens=max_output_tokens,
+            response_format={"type": "json_object"},
+            stream=True
+        )
+        
+        parser = IncrementalJSONParser()
+        first_section_at = None
+        finish_reason = None
+        async for chunk in stream:
+            # Azure peut envoyer des morceaux sans choix (filtrage de contenu)
+            if not chunk.choices:
+                continue
+            # Raison de fin (dernier morceau): "stop" seulement si la génération est allée à son terme
+            finish_reason = getattr(chunk.choices[0], "finish_reason", None) or finish_reason
+            if not chunk.choices[0].delta.content:
+                continue
+            for name, data in parser.feed(chunk.choices[0].delta.content):
+                if first_section_at is None:
+                    first_section_at = time.perf_counter()
+                    print(f"⚡ Première section disponible après {first_section_at - started_at:.1f}s: {name}")
+                yield "section", {"name": name, "data": data}
+        
+        result = parser.finish()
+        if not result:
+            raise Exception("L'IA a retourné un format de réponse invalide")
+        
+        # Sortie coupée (max_tokens, coupure réseau, filtrage): sections réparées restituées, non mises en cache
+        truncated = parser.repaired or finish_reason != "stop"
+        if truncated:
+            print(f"⚠️ Analyse tronquée (fin: {finish_reason}, JSON réparé: {parser.repaired})")
+            for name, data in result.items():
+                if name not in parser.completed:
+                    yield "section", {"name": name, "data": data}
+    
+    except Exception as e:
+        print(f"Erreur lors de l'appel au service IA: {str(e)}")
+        raise Exception(f"Échec de l'analyse de l'appel d'offres: {str(e)}")
+    
+    yield "complete", await _finalize(
+        result, cache, cache_key, use_cache, model, started_at, "single", 1, truncated=truncated
+    )
+
+def _build_messages(rfp_text: str) -> List[dict]:
+    """Messages de l'analyse en un seul appel"""
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": f"{USER_PREFIX}{rfp_text}"}
+    ]
+
+async def _plan_analysis(rfp_text: str, model: str) -> Tuple[int, bool, int, int]:
+    """
+    Budget réel du modèle: prompt système + consignes + réserve de sortie comptés en tokens
+    
+    Le document est compté une seule fois (hors de la boucle d'événements s'il est long),
+    et ce comptage est transmis à l'appel IA et à l'analyse par parties.
+    
+    Returns:
+        (tokens de sortie, True si le document doit être analysé par parties,
+         tokens du document, tokens des messages de l'analyse en un seul appel)
+    """
+    max_output_tokens = clamp_output_tokens(4000, model)  # Augmenté pour l'analyse détaillée en français
+    fixed_messages = _build_messages("")
+    input_budget = get_input_budget(model, fixed_messages, max_output_tokens)
+    single_call_tokens = min(input_budget, int(os.getenv("RFP_SINGLE_CALL_MAX_TOKENS", "40000")))
+    document_tokens = await count_tokens_async(rfp_text, model)
+    message_tokens = count_message_tokens(fixed_messages, model) + document_tokens
+    return max_output_tokens, document_tokens > single_call_tokens, document_tokens, message_tokens
+
+async def _analyze_long_document(rfp_text: str, model: str, document_tokens: int) -> Tuple[dict, int, int]:
+    """Analyse map-reduce par parties d'un document trop long pour un seul appel"""
+    chunk_tokens = int(os.getenv("RFP_CHUNK_MAX_TOKENS", "20000"))
+    print(f"📚 Document long: analyse par parties de {chunk_tokens} tokens max")
+    return await analyze_in_chunks(rfp_text, model, SYSTEM_PROMPT, chunk_tokens, document_tokens=document_tokens)
+
+async def _finalize(result: dict, cache, cache_key: str, use_cache: bool, model: str,
+                    started_at: float, analysis_mode: str, chunk_count: int, failed_chunks: int = 0,
+                    truncated: bool = False) -> dict:
+    """Mettre en cache l'analyse et ajouter les métadonnées de traitement"""
+    # Analyse incomplète (parties en échec, sortie tronquée): non mise en cache, la prochaine demande la recalcule
+    if use_cache and not failed_chunks and not truncated:
+        await cache.set(cache_key, result)
+    elif failed_chunks:
+        print(f"⚠️ Analyse incomplète ({failed_chunks} partie(s) en échec): non mise en cache")
+    elif truncated:
+        print("⚠️ Analyse tronquée: non mise en cache")
+    
+    # Retourner la réponse structurée complète
+    metadata = _build_metadata("miss" if use_cache else "bypass", cache_key, model, started_at)
+    metadata["analysis_mode"] = analysis_mode
+    metadata["chunk_count"] = chunk_count
+    metadata["failed_chunks"] = failed_chunks
+    if truncated:
+        metadata["truncated"] = True
+    result["metadata"] = metadata
+    return result
+
+def _build_metadata(cache_status: str, cache_key: str, model: str, started_at: float) -> dict:
+    """Métadonnées de traitement ajoutées à la réponse"""
+    return {
+        "cache": cache_status,
+        "cache_key": cache_key.split(":", 1)[-1][:16],
+        "prompt_version": PROMPT_VERSION,
+        "model": model,
+        "duration_ms": round((time.perf_counter() - started_at) * 1000, 1)
+    }
@@ -0,0 +1,287 @@
+"""
+Analyse map-reduce des appels d'offres volumineux
+1. Découpage du document sur les limites de sections (articles, chapitres, titres numérotés)
+2. Extraction des informations partielles de chaque partie en parallèle (concurrence bornée)
+3. Fusion des résultats partiels dans le même schéma JSON que l'analyse complète
+
+Remplace la troncature à 120k caractères: pénalités, clauses CCAP et grille
+d'évaluation situées en fin de DCE ne sont plus ignorées.
+"""
+import asyncio
+import json
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+from services.common.llm_client import create_chat_completion
+from services.common.token_budget import clamp_output_tokens, count_message_tokens, count_tokens, get_input_budget
+
+# Débuts de ligne considérés comme des titres de section
+SECTION_HEADING_PATTERN = re.compile(
+    r"^[ \t]*(?:"
+    r"(?:ARTICLE|Article|CHAPITRE|Chapitre|TITRE|Titre|PARTIE|Partie|SECTION|Section|ANNEXE|Annexe|LOT|Lot)\b"
+    r"|\d{1,2}(?:\.\d{1,2}){0,3}[\.\)]?[ \t]+[A-ZÀ-Ý]"
+    r"|[A-ZÀ-Ý][A-ZÀ-Ý0-9 '’\-]{8,}$"
+    r")",
+    re.MULTILINE
+)
+
+CHUNK_INSTRUCTIONS = """
+
+## PARTIAL DOCUMENT MODE
+
+You are analyzing PART {index} of {total} of a long RFP document (the document was split on section boundaries).
+- Extract ONLY the information present in THIS part, using the exact same JSON schema.
+- Use "NON SPÉCIFIÉ" for every field not covered by this part (other parts will fill it).
+- Use empty arrays for lists with no data in this part.
+- Do not infer anything from content that is not in this part.
+"""
+
+NOT_SPECIFIED_VALUES = {"", "non spécifié", "non specifie", "non précisé", "not specified", "n/a", "nc"}
+
+URGENCY_ORDER = {"STANDARD": 0, "ÉLEVÉ": 1, "ELEVE": 1, "CRITIQUE": 2}
+
+# Clés identifiant un élément de liste (ex: deux résultats partiels sur le même lot sont fusionnés)
+IDENTITY_KEYS = ("numero", "lot", "critere", "type", "intitule", "profil")
+
+
+def split_into_sections(text: str, max_chars: int) -> List[str]:
+    """
+    Découper le document en parties d'au plus max_chars caractères,
+    en coupant de préférence sur les titres de section puis sur les paragraphes
+
+    Args:
+        text: Texte complet du document
+        max_chars: Taille maximale d'une partie
+
+    Returns:
+        Liste des parties, dans l'ordre du document
+    """
+    boundaries = [match.start() for match in SECTION_HEADING_PATTERN.finditer(text)]
+    if not boundaries or boundaries[0] != 0:
+        boundaries.insert(0, 0)
+    boundaries.append(len(text))
+
+    sections = [text[start:end] for start, end in zip(boundaries, boundaries[1:]) if text[start:end].strip()]
+
+    # Sections trop longues: couper sur les paragraphes, puis en dur
+    pieces = []
+    for section in sections:
+        if len(section) <= max_chars:
+            pieces.append(section)
+            continue
+        current = ""
+        for paragraph in re.split(r"(?<=\n)\s*\n", section):
+            while len(paragraph) > max_chars:
+                if current:
+                    pieces.append(current)
+                    current = ""
+                pieces.append(paragraph[:max_chars])
+                paragraph = paragraph[max_chars:]
+            if len(current) + len(paragraph) > max_chars:
+                pieces.append(current)
+                current = ""
+            current += paragraph
+        if current.strip():
+            pieces.append(current)
+
+    # Regrouper les sections consécutives jusqu'à la taille maximale
+    chunks = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + len(piece) > max_chars:
+            chunks.append(current)
+            current = ""
+        current += piece
+    if current.strip():
+        chunks.append(current)
+
+    return chunks
+
+
+def _is_specified(value) -> bool:
+    if value is None:
+        return False
+    if isinstance(value, str):
+        return value.strip().lower() not in NOT_SPECIFIED_VALUES
+    if isinstance(value, (list, dict)):
+        return len(value) > 0
+    return True
+
+
+def _identity(item: Dict):
+    for key in IDENTITY_KEYS:
+        if _is_specified(item.get(key)):
+            return (key, str(item[key]).strip().lower())
+    return None
+
+
+def _merge_lists(left: List, right: List) -> List:
+    merged = list(left)
+    seen = {json.dumps(item, sort_keys=True, ensure_ascii=False) for item in merged}
+
+    for item in right:
+        if isinstance(item, dict):
+            identity = _identity(item)
+            match = next(
+                (i for i, existing in enumerate(merged) if isinstance(existing, dict) and identity and _identity(existing) == identity),
+                None
+            )
+            if match is not None:
+                merged[match] = _merge_values(merged[match], item)
+                continue
+        if not _is_specified(item):
+            continue
+        fingerprint = json.dumps(item, sort_keys=True, ensure_ascii=False)
+        if fingerprint not in seen:
+            seen.add(fingerprint)
+            merged.append(item)
+
+    return merged
+
+
+def _merge_values(left, right, key: str = ""):
+    if isinstance(left, dict) and isinstance(right, dict):
+        merged = dict(left)
+        for child_key, value in right.items():
+            merged[child_key] = _merge_values(merged[child_key], value, child_key) if child_key in merged else value
+        return merged
+
+    if isinstance(left, list) and isinstance(right, list):
+        return _merge_lists(left, right)
+
+    if key == "niveau_urgence" and isinstance(left, str) and isinstance(right, str):
+        return max(left, right, key=lambda level: URGENCY_ORDER.get(level.strip().upper(), -1))
+
+    # Valeur scalaire: la première valeur renseignée (ordre du document) l'emporte
+    return left if _is_specified(left) else right
+
+
+def merge_partial_analyses(partials: List[Dict]) -> Dict:
+    """
+    Fusionner les analyses partielles (une par partie du document) en une seule analyse
+
+    - Objets: fusion champ par champ
+    - Listes: concaténation dédoublonnée, éléments de même identité (lot, critère...) fusionnés
+    - Valeurs simples: première valeur renseignée dans l'ordre du document
+    - niveau_urgence: niveau le plus critique
+    """
+    merged = {}
+    for partial in partials:
+        merged = _merge_values(merged, partial)
+    return merged
+
+
+def split_by_tokens(text: str, max_tokens: int, model: str, total_tokens: Optional[int] = None) -> List[str]:
+    """
+    Découper le document en parties d'au plus max_tokens tokens
+
+    La taille en caractères est dérivée de la densité réelle du document
+    (caractères par token), puis les parties encore trop longues sont redécoupées.
+
+    Args:
+        total_tokens: Tokens du document, s'ils sont déjà comptés par l'appelant
+    """
+    return [chunk for chunk, _ in _split_with_counts(text, max_tokens, model, total_tokens)]
+
+
+def _split_with_counts(text: str, max_tokens: int, model: str, total_tokens: Optional[int] = None) -> List[Tuple[str, int]]:
+    """Parties du document avec leur nombre de tokens (chaque partie est comptée une fois)"""
+    if total_tokens is None:
+        total_tokens = count_tokens(text, model)
+    if total_tokens <= max_tokens:
+        return [(text, total_tokens)]
+
+    chunks = []
+    pending = split_into_sections(text, max(1, int(len(text) * max_tokens / total_tokens)))
+    while pending:
+        chunk = pending.pop(0)
+        chunk_tokens = count_tokens(chunk, model)
+        if chunk_tokens <= max_tokens or len(chunk) <= 1:
+            chunks.append((chunk, chunk_tokens))
+            continue
+        # Partie plus dense que la moyenne: redécouper avec sa propre densité (marge de 10%)
+        pending[:0] = split_into_sections(chunk, max(1, int(len(chunk) * max_tokens / chunk_tokens * 0.9)))
+
+    return chunks
+
+
+async def analyze_in_chunks(
+    rfp_text: str,
+    model: str,
+    system_prompt: str,
+    max_chunk_tokens: int,
+    max_concurrency: int = None,
+    document_tokens: Optional[int] = None
+) -> Tuple[Dict, int, int]:
+    """
+    Analyser un document long par parties en parallèle puis fusionner
+
+    Args:
+        rfp_text: Texte complet du document
+        model: Nom du déploiement / modèle
+        system_prompt: Prompt système de l'analyse complète (même schéma JSON)
+        max_chunk_tokens: Taille maximale d'une partie en tokens (bornée par le contexte du modèle)
+        max_concurrency: Nombre max d'appels IA simultanés (RFP_CHUNK_CONCURRENCY, défaut 4)
+        document_tokens: Tokens du document, s'ils sont déjà comptés par l'appelant
+
+    Returns:
+        (analyse fusionnée, nombre de parties, nombre de parties en échec);
+        les parties en échec sont aussi signalées dans points_attention
+    """
+    if max_concurrency is None:
+        max_concurrency = int(os.getenv("RFP_CHUNK_CONCURRENCY", "4"))
+
+    max_output_tokens = clamp_output_tokens(4000, model)
+    fixed_messages = [
+        {"role": "system", "content": system_prompt + CHUNK_INSTRUCTIONS.format(index=999, total=999)},
+        {"role": "user", "content": "Analysez cette partie (999/999) de l'appel d'offres:\n\n"}
+    ]
+    chunk_budget = get_input_budget(model, fixed_messages, max_output_tokens)
+    if chunk_budget <= 0:
+        raise Exception(f"Contexte du modèle {model} insuffisant pour le prompt d'analyse")
+
+    # Découpage et comptage des parties hors de la boucle d'événements (document long)
+    fixed_tokens = count_message_tokens(fixed_messages, model)
+    chunks = await asyncio.to_thread(
+        _split_with_counts, rfp_text, min(max_chunk_tokens, chunk_budget), model, document_tokens
+    )
+    total = len(chunks)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    print(f"🧩 Analyse par parties: {total} parties, {max_concurrency} appels IA simultanés max")
+
+    async def analyze_chunk(index: int, chunk: str, chunk_tokens: int) -> Dict:
+        async with semaphore:
+            response = await create_chat_completion(
+                messages=[
+                    {"role": "system", "content": system_prompt + CHUNK_INSTRUCTIONS.format(index=index, total=total)},
+                    {"role": "user", "content": f"Analysez cette partie ({index}/{total}) de l'appel d'offres:\n\n{chunk}"}
+                ],
+                input_tokens=fixed_tokens + chunk_tokens,
+                temperature=0.2,
+                max_tokens=max_output_tokens,
+                response_format={"type": "json_object"}
+            )
+            print(f"   ✅ Partie {index}/{total} analysée")
+            return json.loads(response.choices[0].message.content)
+
+    results = await asyncio.gather(
+        *(analyze_chunk(index, chunk, chunk_tokens) for index, (chunk, chunk_tokens) in enumerate(chunks, start=1)),
+        return_exceptions=True
+    )
+
+    partials = [result for result in results if not isinstance(result, BaseException)]
+    failed = [index for index, result in enumerate(results, start=1) if isinstance(result, BaseException)]
+
+    if not partials:
+        raise results[0]
+
+    merged = merge_partial_analyses(partials)
+
+    if failed:
+        print(f"⚠️ Parties non analysées: {failed}")
+        merged.setdefault("points_attention", []).append(
+            f"ATTENTION: {len(failed)} partie(s) du document sur {total} n'ont pas pu être analysées (parties {', '.join(map(str, failed))})"
+        )
+
+    return merged, total, len(failed)
@@ -0,0 +1,95 @@
+"""
+Sources de documents pour l'extraction de texte
+Les extracteurs acceptent un chemin, un contenu en mémoire (bytes, memoryview)
+ou un fichier binaire déjà ouvert (UploadFile.file, tampon de téléchargement):
+un upload n'est plus recopié dans un fichier temporaire puis relu par chemin.
+"""
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Union
+
+# Source d'un document: chemin, contenu en mémoire ou fichier ouvert en binaire
+DocumentSource = Union[str, os.PathLike, bytes, bytearray, memoryview, BinaryIO]
+
+
+def spool_max_bytes() -> int:
+    """Taille gardée en mémoire avant bascule sur disque (EXTRACT_SPOOL_MAX_MB, défaut: 8)"""
+    return int(float(os.getenv("EXTRACT_SPOOL_MAX_MB", "8")) * 1024 * 1024)
+
+
+def spooled_buffer() -> tempfile.SpooledTemporaryFile:
+    """Tampon binaire gardé en mémoire jusqu'au seuil de spooling, puis basculé dans un fichier temporaire"""
+    return tempfile.SpooledTemporaryFile(max_size=spool_max_bytes())
+
+
+def is_path_source(source: DocumentSource) -> bool:
+    return isinstance(source, (str, os.PathLike))
+
+
+@contextmanager
+def open_source(source: DocumentSource) -> Iterator[BinaryIO]:
+    """Ouvrir une source en flux binaire positionné au début (sans copier les fichiers ouverts)"""
+    if is_path_source(source):
+        with open(source, 'rb') as file:
+            yield file
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        yield io.BytesIO(source)
+    else:
+        if source.seekable():
+            source.seek(0)
+        yield source
+
+
+def read_source_bytes(source: DocumentSource) -> bytes:
+    """Contenu binaire complet d'une source"""
+    if isinstance(source, bytes):
+        return source
+    if isinstance(source, (bytearray, memoryview)):
+        return bytes(source)
+    with open_source(source) as stream:
+        return stream.read()
+
+
+@contextmanager
+def source_path(source: DocumentSource, suffix: str = "") -> Iterator[str]:
+    """
+    Chemin d'une source, pour la relire depuis d'autres processus
+    Chemin ou fichier nommé sur disque: utilisé tel quel; sinon contenu écrit une fois
+    dans un fichier temporaire (par blocs), supprimé en sortie.
+    """
+    if is_path_source(source):
+        yield os.fspath(source)
+        return
+    name = getattr(source, "name", None)
+    if isinstance(name, str) and os.path.isfile(name):
+        yield name
+        return
+
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as temporary:
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            temporary.write(source)
+        else:
+            with open_source(source) as stream:
+                shutil.copyfileobj(stream, temporary, 1024 * 1024)
+    try:
+        yield temporary.name
+    finally:
+        try:
+            os.remove(temporary.name)
+        except OSError:
+            pass
+
+
+def source_sha256(source: DocumentSource) -> str:
+    """Empreinte SHA-256 du contenu d'une source (lu par blocs, sans copie complète en mémoire)"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(source).hexdigest()
+    digest = hashlib.sha256()
+    with open_source(source) as stream:
+        for block in iter(lambda: stream.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
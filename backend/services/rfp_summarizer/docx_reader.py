@@ -0,0 +1,130 @@
+"""
+Lecture en flux du texte d'un DOCX (word/document.xml lu directement dans le zip)
+- parseur incrémental (iterparse): chaque paragraphe ou tableau est émis puis libéré,
+  sans construire le modèle objet python-docx du document entier
+- paragraphes et tableaux dans l'ordre du document (un tableau reste à sa place dans le texte)
+- tableaux rendus de façon compacte: une ligne par rangée, cellules séparées par " | "
+- cellules fusionnées émises une seule fois (fusion horizontale gridSpan/hMerge,
+  verticale vMerge: les cases de continuation sont ignorées)
+"""
+import zipfile
+from typing import Iterator, List
+from xml.etree.ElementTree import Element, iterparse
+
+from .document_source import DocumentSource, open_source
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+MC = "{http://schemas.openxmlformats.org/markup-compatibility/2006}"
+
+CELL_SEPARATOR = " | "
+
+# Propriétés (w:tabs/w:tab y définit des taquets, pas des tabulations) et mc:Fallback,
+# qui répète le contenu de mc:Choice (zones de texte): jamais lus
+_SKIPPED_TAGS = {f"{W}pPr", f"{W}rPr", f"{MC}Fallback"}
+
+
+def _paragraph_text(paragraph: Element) -> str:
+    parts = []
+    _collect_text(paragraph, parts)
+    return "".join(parts)
+
+
+def _collect_text(element: Element, parts: List[str]):
+    for node in element:
+        if node.tag == f"{W}t":
+            parts.append(node.text or "")
+        elif node.tag == f"{W}tab":
+            parts.append("\t")
+        elif node.tag in (f"{W}br", f"{W}cr"):
+            parts.append("\n")
+        elif node.tag not in _SKIPPED_TAGS:
+            _collect_text(node, parts)
+
+
+def _is_merge_continuation(cell: Element) -> bool:
+    """Case recouverte par une cellule fusionnée (son texte appartient à la cellule d'origine)"""
+    properties = cell.find(f"{W}tcPr")
+    if properties is None:
+        return False
+    for tag in (f"{W}vMerge", f"{W}hMerge"):
+        merge = properties.find(tag)
+        if merge is not None and merge.get(f"{W}val", "continue") == "continue":
+            return True
+    return False
+
+
+def _cell_text(cell: Element) -> str:
+    parts = []
+    for child in cell:
+        if child.tag == f"{W}p":
+            parts.append(_paragraph_text(child).strip())
+        elif child.tag == f"{W}tbl":
+            # Tableau imbriqué: aplati dans la cellule
+            parts.append(" ; ".join(_table_rows(child)))
+        elif child.tag == f"{W}sdt":
+            content = child.find(f"{W}sdtContent")
+            if content is not None:
+                parts.append(_cell_text(content))
+    return " ".join(part for part in parts if part)
+
+
+def _row_cells(row: Element) -> Iterator[Element]:
+    for child in row:
+        if child.tag == f"{W}tc":
+            yield child
+        elif child.tag == f"{W}sdt":
+            # Cellule dans un contrôle de contenu
+            yield from child.iterfind(f"{W}sdtContent/{W}tc")
+
+
+def _table_rows(table: Element) -> List[str]:
+    rows = []
+    for row in table.iterfind(f"{W}tr"):
+        cells = [_cell_text(cell) for cell in _row_cells(row) if not _is_merge_continuation(cell)]
+        cells = [cell for cell in cells if cell]
+        if cells:
+            rows.append(CELL_SEPARATOR.join(cells))
+    return rows
+
+
+def iter_docx_blocks(source: DocumentSource) -> Iterator[str]:
+    """
+    Texte d'un DOCX bloc par bloc, dans l'ordre du document
+    Un bloc est un paragraphe ou un tableau complet (rangées séparées par des retours à la ligne).
+
+    Args:
+        source: Chemin, contenu (bytes, memoryview) ou fichier binaire ouvert du .docx
+    """
+    with open_source(source) as stream, zipfile.ZipFile(stream) as archive:
+        with archive.open("word/document.xml") as xml_stream:
+            body = None
+            open_paragraphs = 0
+            open_tables = 0
+            for event, element in iterparse(xml_stream, events=("start", "end")):
+                tag = element.tag
+                if event == "start":
+                    if tag == f"{W}body":
+                        body = element
+                    elif tag == f"{W}p":
+                        open_paragraphs += 1
+                    elif tag == f"{W}tbl":
+                        open_tables += 1
+                    continue
+
+                if tag == f"{W}p":
+                    open_paragraphs -= 1
+                    if open_paragraphs or open_tables:
+                        continue
+                    yield _paragraph_text(element)
+                elif tag == f"{W}tbl":
+                    open_tables -= 1
+                    if open_paragraphs or open_tables:
+                        continue
+                    yield "\n".join(_table_rows(element))
+                else:
+                    continue
+
+                # Bloc émis: libéré avant de lire la suite
+                element.clear()
+                if body is not None:
+                    body.clear()
@@ -0,0 +1,166 @@
+"""
+Cache persistant du texte extrait des documents
+Clé = SHA-256 du contenu du fichier + extension + version des extracteurs (EXTRACTOR_VERSION):
+un même document envoyé à /summarizeRfp, /generateDeckFromText, /generateDiagramFromText
+ou à l'aperçu de détection n'est parsé qu'une fois.
+
+Stockage: fichier sqlite (index + texte compressé), partagé entre les workers
+- compression zstd si le paquet 'zstandard' est installé, zlib sinon
+  (le codec est enregistré avec chaque entrée: les deux se relisent)
+- éviction LRU selon la taille totale compressée
+
+Variables d'environnement:
+- EXTRACTION_CACHE_PATH: chemin du fichier sqlite (défaut: cache/extracted_text.sqlite3)
+- EXTRACTION_CACHE_MAX_MB: taille maximale du cache en Mo (défaut: 512, 0 = désactivé)
+"""
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def _compress(text: str):
+    data = text.encode("utf-8")
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=3).compress(data)
+    return "zlib", zlib.compress(data, 6)
+
+
+def _decompress(codec: str, blob: bytes) -> str:
+    if codec == "zstd":
+        if zstandard is None:
+            raise ValueError("entrée compressée en zstd mais le paquet 'zstandard' n'est pas installé")
+        data = zstandard.ZstdDecompressor().decompress(blob)
+    else:
+        data = zlib.decompress(blob)
+    return data.decode("utf-8")
+
+
+class ExtractionCache:
+    """Cache sqlite du texte extrait, borné par la taille totale compressée (éviction LRU)"""
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS extracted_text ("
+            " key TEXT PRIMARY KEY,"
+            " codec TEXT NOT NULL,"
+            " content BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " text_length INTEGER NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_extracted_text_access ON extracted_text(last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(content_sha256: str, extension: str, extractor_version: str) -> str:
+        return f"{extractor_version}:{extension.lower()}:{content_sha256}"
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT codec, content FROM extracted_text WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE extracted_text SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        self.hits += 1
+        return _decompress(*row)
+
+    def set(self, key: str, text: str):
+        codec, blob = _compress(text)
+        if len(blob) > self.max_bytes:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO extracted_text (key, codec, content, size, text_length, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, codec, blob, len(blob), len(text), time.time())
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Évincer les entrées les moins récemment utilisées jusqu'à repasser sous la taille maximale"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM extracted_text").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for key, size in self._conn.execute("SELECT key, size FROM extracted_text ORDER BY last_access ASC"):
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM extracted_text WHERE key = ?", evicted)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM extracted_text WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM extracted_text"
+            ).fetchone()
+        return {"entries": entries, "size_bytes": size, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_cache_lock = threading.Lock()
+_cache = None
+_cache_initialized = False
+
+
+def get_extraction_cache() -> Optional[ExtractionCache]:
+    """Cache partagé du texte extrait (None si désactivé ou indisponible)"""
+    global _cache, _cache_initialized
+
+    with _cache_lock:
+        if not _cache_initialized:
+            max_bytes = int(float(os.getenv("EXTRACTION_CACHE_MAX_MB", "512")) * 1024 * 1024)
+            if max_bytes > 0:
+                path = os.getenv("EXTRACTION_CACHE_PATH", os.path.join("cache", "extracted_text.sqlite3"))
+                try:
+                    _cache = ExtractionCache(path, max_bytes)
+                except Exception as e:
+                    print(f"⚠️ Cache d'extraction désactivé: {str(e)}")
+                    _cache = None
+            _cache_initialized = True
+        return _cache
+
+
+def reset_extraction_cache():
+    """Fermer le cache partagé (arrêt du serveur, ou changement de configuration)"""
+    global _cache, _cache_initialized
+
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+        _cache = None
+        _cache_initialized = False
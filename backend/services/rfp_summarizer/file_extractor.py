@@ -3,78 +3,156 @@ Service d'extraction de texte depuis des fichiers
 Supporte: PDF, DOCX, TXT et autres formats de documents courants
 """
 import os
-from typing import Optional
-import PyPDF2
-from docx import Document
-import chardet
+from contextlib import closing
+from typing import Iterator, Optional
 
-def extract_text_from_pdf(file_path: str) -> str:
-    """Extraire le texte d'un fichier PDF"""
-    text = ""
+from .docx_reader import iter_docx_blocks
+from .document_source import DocumentSource, source_sha256
+from .extraction_cache import get_extraction_cache
+from .pdf_engine import PAGE_SEPARATOR, extract_pdf, iter_pdf_pages
+from .text_decoder import decode_text_source
+
+# À incrémenter quand un extracteur change de résultat: les textes en cache sont alors ignorés
+EXTRACTOR_VERSION = "4"
+
+def extract_text_from_pdf(source: DocumentSource) -> str:
+    """Extraire le texte d'un fichier PDF (pages extraites en parallèle, voir pdf_engine)"""
     try:
-        with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            for page_num in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_num]
-                text += page.extract_text() + "\n"
-        return text.strip()
+        result = extract_pdf(source)
+        timings = result['page_timings_ms']
+        if timings:
+            slowest = max(range(len(timings)), key=timings.__getitem__)
+            print(f"📄 PDF: {result['page_count']} pages en {result['elapsed_ms']:.0f} ms "
+                  f"({result['backend']}, {result['workers']} processus, page la plus lente: "
+                  f"n°{slowest + 1} en {timings[slowest]:.0f} ms)")
+        return result['text']
     except Exception as e:
         raise Exception(f"Erreur lors de l'extraction du texte PDF: {str(e)}")
 
-def extract_text_from_docx(file_path: str) -> str:
-    """Extraire le texte d'un fichier DOCX"""
+def extract_text_from_docx(source: DocumentSource) -> str:
+    """Extraire le texte d'un fichier DOCX (lecture en flux du XML, ordre du document, voir docx_reader)"""
     try:
-        doc = Document(file_path)
-        text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-        
-        # Extraire également le texte des tableaux
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    text += "\n" + cell.text
-        
-        return text.strip()
+        return "\n".join(iter_docx_blocks(source)).strip()
     except Exception as e:
         raise Exception(f"Erreur lors de l'extraction du texte DOCX: {str(e)}")
 
-def extract_text_from_txt(file_path: str) -> str:
-    """Extraire le texte d'un fichier TXT avec détection d'encodage"""
+def extract_text_from_txt(source: DocumentSource) -> str:
+    """Extraire le texte d'un fichier TXT avec détection d'encodage (par échantillons, voir text_decoder)"""
     try:
-        # Détecter l'encodage
-        with open(file_path, 'rb') as file:
-            raw_data = file.read()
-            result = chardet.detect(raw_data)
-            encoding = result['encoding'] or 'utf-8'
-        
-        # Lire avec l'encodage détecté
-        with open(file_path, 'r', encoding=encoding, errors='ignore') as file:
-            return file.read().strip()
+        text, _ = decode_text_source(source)
+        # Fins de ligne normalisées comme en lecture en mode texte
+        return text.replace('\r\n', '\n').replace('\r', '\n').strip()
     except Exception as e:
         raise Exception(f"Erreur lors de l'extraction du texte TXT: {str(e)}")
 
-def extract_text_from_file(file_path: str, filename: str) -> str:
+def extract_text_from_file(source: DocumentSource, filename: str, content_sha256: Optional[str] = None) -> str:
     """
     Extraire le texte d'un fichier uploadé selon son extension
+    Le texte extrait est mis en cache par empreinte du contenu (voir extraction_cache):
+    un document déjà vu n'est pas parsé à nouveau.
     
     Args:
-        file_path: Chemin vers le fichier temporaire
+        source: Chemin, contenu (bytes, memoryview) ou fichier binaire ouvert (ex: UploadFile.file)
         filename: Nom de fichier original avec extension
+        content_sha256: Empreinte SHA-256 du contenu si déjà connue (ex: upload.sha256), calculée sinon
     
     Returns:
         Contenu textuel extrait
     """
     # Obtenir l'extension du fichier
     _, ext = os.path.splitext(filename.lower())
-    
+
+    cache = get_extraction_cache()
+    key = None
+    if cache is not None:
+        try:
+            key = cache.make_key(content_sha256 or source_sha256(source), ext, EXTRACTOR_VERSION)
+            cached_text = cache.get(key)
+            if cached_text is not None:
+                print(f"♻️ Texte extrait de {filename} réutilisé depuis le cache ({len(cached_text)} caractères)")
+                return cached_text
+        except Exception as e:
+            # Le cache ne fait jamais échouer une extraction
+            print(f"⚠️ Cache d'extraction indisponible (lecture): {str(e)}")
+
+    text = _extract_text_by_extension(source, ext)
+
+    if key is not None:
+        try:
+            cache.set(key, text)
+        except Exception as e:
+            print(f"⚠️ Cache d'extraction indisponible (écriture): {str(e)}")
+    return text
+
+def _extract_text_by_extension(source: DocumentSource, ext: str) -> str:
     if ext == '.pdf':
-        return extract_text_from_pdf(file_path)
+        return extract_text_from_pdf(source)
     elif ext in ['.docx', '.doc']:
-        return extract_text_from_docx(file_path)
+        return extract_text_from_docx(source)
     elif ext in ['.txt', '.text', '.md', '.markdown']:
-        return extract_text_from_txt(file_path)
+        return extract_text_from_txt(source)
     else:
         # Essayer de lire comme texte par défaut
         try:
-            return extract_text_from_txt(file_path)
+            return extract_text_from_txt(source)
         except:
             raise Exception(f"Format de fichier non supporté: {ext}. Formats supportés: PDF, DOCX, TXT")
+
+def _iter_text_blocks(source: DocumentSource, ext: str) -> Iterator[str]:
+    """Texte par blocs (pages PDF, paragraphes DOCX), extraits au fur et à mesure de la consommation"""
+    if ext == '.pdf':
+        yield from iter_pdf_pages(source)
+    elif ext in ['.docx', '.doc']:
+        yield from iter_docx_blocks(source)
+    else:
+        # Texte brut: décodé en une fois (pas de parsing à économiser)
+        yield _extract_text_by_extension(source, ext)
+
+def extract_text_preview(
+    source: DocumentSource,
+    filename: str,
+    max_chars: int = 2000,
+    content_sha256: Optional[str] = None
+) -> str:
+    """
+    Extraire seulement le début du texte d'un fichier (aperçu pour la détection d'intention)
+    L'extraction s'arrête dès que max_chars caractères sont obtenus: pour un PDF de 400 pages,
+    seules les premières pages sont lues. Si le texte complet est déjà en cache, il est réutilisé.
+    
+    Args:
+        source: Chemin, contenu (bytes, memoryview) ou fichier binaire ouvert
+        filename: Nom de fichier original avec extension
+        max_chars: Nombre maximum de caractères
+        content_sha256: Empreinte SHA-256 du contenu si déjà connue
+    
+    Returns:
+        Les max_chars premiers caractères du texte (même début que extract_text_from_file)
+    """
+    _, ext = os.path.splitext(filename.lower())
+
+    cache = get_extraction_cache()
+    if cache is not None:
+        try:
+            key = cache.make_key(content_sha256 or source_sha256(source), ext, EXTRACTOR_VERSION)
+            cached_text = cache.get(key)
+            if cached_text is not None:
+                return cached_text[:max_chars]
+        except Exception as e:
+            print(f"⚠️ Cache d'extraction indisponible (lecture): {str(e)}")
+
+    separator = PAGE_SEPARATOR if ext == '.pdf' else "\n"
+    blocks = []
+    length = 0
+    # closing: le document est refermé dès l'arrêt, sans attendre le ramasse-miettes
+    with closing(_iter_text_blocks(source, ext)) as text_blocks:
+        for block in text_blocks:
+            if not blocks:
+                block = block.lstrip()
+                if not block:
+                    continue
+            blocks.append(block)
+            # Même séparateur entre blocs que le texte complet
+            length += len(block) + 1
+            if length > max_chars:
+                break
+    return separator.join(blocks).strip()[:max_chars]
@@ -0,0 +1,279 @@
+"""
+Moteur d'extraction de texte PDF
+- pages extraites par plages en parallèle dans des processus dédiés (DCE de plusieurs centaines de pages)
+- texte assemblé en une seule passe (pas de concaténation page par page)
+- backend interchangeable: PyPDF2 par défaut, PyMuPDF (plus rapide) s'il est installé
+- durée d'extraction de chaque page mesurée
+- lecture paresseuse page par page (iter_pdf_pages) pour les aperçus: arrêt dès que l'appelant a assez de texte
+
+Variables d'environnement:
+- PDF_EXTRACT_BACKEND: auto | pypdf2 | pymupdf (défaut: auto = le plus rapide disponible)
+- PDF_EXTRACT_WORKERS: processus d'extraction (défaut: nombre de cœurs, 0 ou 1 = séquentiel)
+- PDF_PARALLEL_MIN_PAGES: nombre de pages à partir duquel l'extraction est parallélisée (défaut: 40)
+"""
+import io
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .document_source import DocumentSource, is_path_source, read_source_bytes, source_path
+
+# Séparateur des pages dans le texte extrait
+PAGE_SEPARATOR = "\f"
+
+# Plages par processus: plusieurs plages plus petites équilibrent les pages lentes (scans, tableaux)
+RANGES_PER_WORKER = 2
+
+
+class PdfBackend:
+    """
+    Interface d'un backend d'extraction
+
+    Un backend est instancié dans chaque processus: open() est appelé une fois par plage de pages.
+    """
+
+    name = ""
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return True
+
+    def open(self, source: DocumentSource):
+        """Ouvrir le document: chemin, bytes ou flux binaire (retourne un objet passé aux autres méthodes)"""
+        raise NotImplementedError
+
+    def page_count(self, document) -> int:
+        raise NotImplementedError
+
+    def extract_page(self, document, index: int) -> str:
+        raise NotImplementedError
+
+    def close(self, document):
+        pass
+
+
+class PyPDF2Backend(PdfBackend):
+    name = "pypdf2"
+
+    def open(self, source: DocumentSource):
+        import PyPDF2
+        if is_path_source(source):
+            handle = open(source, "rb")
+            return handle, PyPDF2.PdfReader(handle)
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = io.BytesIO(source)
+        # Flux fourni par l'appelant: lu sur place, fermé par l'appelant
+        return None, PyPDF2.PdfReader(source)
+
+    def page_count(self, document) -> int:
+        return len(document[1].pages)
+
+    def extract_page(self, document, index: int) -> str:
+        return document[1].pages[index].extract_text() or ""
+
+    def close(self, document):
+        if document[0] is not None:
+            document[0].close()
+
+
+class PyMuPDFBackend(PdfBackend):
+    name = "pymupdf"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        try:
+            import fitz  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def open(self, source: DocumentSource):
+        import fitz
+        if is_path_source(source):
+            return fitz.open(source)
+        return fitz.open(stream=read_source_bytes(source), filetype="pdf")
+
+    def page_count(self, document) -> int:
+        return document.page_count
+
+    def extract_page(self, document, index: int) -> str:
+        return document.load_page(index).get_text()
+
+    def close(self, document):
+        document.close()
+
+
+# Backends par ordre de préférence pour "auto"
+PDF_BACKENDS = {
+    PyMuPDFBackend.name: PyMuPDFBackend,
+    PyPDF2Backend.name: PyPDF2Backend
+}
+
+
+def register_pdf_backend(backend_class, preferred: bool = False):
+    """
+    Ajouter un backend d'extraction (doit être importable par les processus d'extraction)
+
+    Args:
+        backend_class: Sous-classe de PdfBackend
+        preferred: Le placer en tête du choix "auto"
+    """
+    global PDF_BACKENDS
+    if preferred:
+        PDF_BACKENDS = {backend_class.name: backend_class, **PDF_BACKENDS}
+    else:
+        PDF_BACKENDS[backend_class.name] = backend_class
+
+
+def get_pdf_backend(name: Optional[str] = None) -> PdfBackend:
+    """Backend demandé (ou PDF_EXTRACT_BACKEND), sinon le plus rapide disponible"""
+    name = (name or os.getenv("PDF_EXTRACT_BACKEND", "auto")).lower()
+    if name != "auto":
+        backend_class = PDF_BACKENDS.get(name)
+        if backend_class is None:
+            raise ValueError(f"Backend PDF inconnu: {name} (disponibles: {', '.join(PDF_BACKENDS)})")
+        if backend_class.is_available():
+            return backend_class()
+        print(f"⚠️ Backend PDF {name} non installé, choix automatique")
+
+    for backend_class in PDF_BACKENDS.values():
+        if backend_class.is_available():
+            return backend_class()
+    raise RuntimeError("Aucun backend d'extraction PDF disponible")
+
+
+def _extract_pages(backend: PdfBackend, document, start: int, end: int) -> Tuple[List[str], List[float]]:
+    pages, timings = [], []
+    for index in range(start, end):
+        started = time.perf_counter()
+        pages.append(backend.extract_page(document, index))
+        timings.append((time.perf_counter() - started) * 1000)
+    return pages, timings
+
+
+def _extract_range(backend_name: str, source, start: int, end: int) -> Tuple[List[str], List[float]]:
+    """Extraire les pages [start, end) dans un processus d'extraction (source: chemin)"""
+    backend = get_pdf_backend(backend_name)
+    document = backend.open(source)
+    try:
+        return _extract_pages(backend, document, start, end)
+    finally:
+        backend.close(document)
+
+
+# Nombre de processus par défaut, plafonné comme le pool de rendu (process_pool.py)
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+
+_lock = threading.Lock()
+# Un pool par taille: changer de taille ne ferme pas un pool utilisé par une extraction en cours
+_executors: Dict[int, ProcessPoolExecutor] = {}
+
+
+def _get_executor(workers: int) -> ProcessPoolExecutor:
+    with _lock:
+        executor = _executors.get(workers)
+        if executor is None:
+            # spawn: l'extraction est appelée depuis un serveur qui a des threads
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _executors[workers] = executor
+        return executor
+
+
+def _reset_executor(executor: ProcessPoolExecutor):
+    """Arrêter un pool cassé; la prochaine extraction de cette taille en crée un nouveau"""
+    with _lock:
+        for workers, current in list(_executors.items()):
+            if current is executor:
+                del _executors[workers]
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_pdf_workers():
+    """Arrêter les processus d'extraction (arrêt du serveur)"""
+    with _lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _page_ranges(page_count: int, chunks: int) -> List[Tuple[int, int]]:
+    size = -(-page_count // chunks)
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def extract_pdf(source: DocumentSource, backend: Optional[str] = None, workers: Optional[int] = None) -> Dict:
+    """
+    Extraire le texte d'un PDF, en parallèle par plages de pages pour les gros documents
+
+    Args:
+        source: Chemin, contenu (bytes, memoryview) ou flux binaire du PDF
+        backend: Nom du backend (défaut: PDF_EXTRACT_BACKEND)
+        workers: Nombre de processus (défaut: PDF_EXTRACT_WORKERS, sinon min(4, nombre de cœurs))
+
+    Returns:
+        Dict avec text, page_count, backend, workers, page_timings_ms, elapsed_ms
+    """
+    started = time.perf_counter()
+    engine = get_pdf_backend(backend)
+    if workers is None:
+        workers = int(os.getenv("PDF_EXTRACT_WORKERS", str(DEFAULT_WORKERS)))
+
+    if not is_path_source(source) and hasattr(source, "seek") and source.seekable():
+        source.seek(0)
+    document = engine.open(source)
+    try:
+        page_count = engine.page_count(document)
+        parallel = workers > 1 and page_count >= int(os.getenv("PDF_PARALLEL_MIN_PAGES", "40"))
+        if parallel:
+            ranges = _page_ranges(page_count, min(page_count, workers * RANGES_PER_WORKER))
+            executor = _get_executor(workers)
+            try:
+                # Les processus rouvrent le document par son chemin: un upload en mémoire est écrit
+                # une seule fois sur disque au lieu d'être transmis (copié) à chaque plage
+                with source_path(source, ".pdf") as shared_path:
+                    futures = [executor.submit(_extract_range, engine.name, shared_path, start, end) for start, end in ranges]
+                    results = [future.result() for future in futures]
+            except BrokenProcessPool:
+                # Processus d'extraction interrompu: repli séquentiel pour ce document
+                _reset_executor(executor)
+                parallel = False
+        if not parallel:
+            workers = 1
+            results = [_extract_pages(engine, document, 0, page_count)]
+    finally:
+        engine.close(document)
+
+    pages = [page for result_pages, _ in results for page in result_pages]
+    timings = [timing for _, result_timings in results for timing in result_timings]
+
+    return {
+        # Une seule passe d'assemblage (la concaténation page par page est quadratique);
+        # pages séparées par un saut de page, utilisé par la normalisation (text_normalizer)
+        "text": PAGE_SEPARATOR.join(pages).strip(),
+        "page_count": page_count,
+        "backend": engine.name,
+        "workers": workers,
+        "page_timings_ms": [round(timing, 2) for timing in timings],
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+    }
+
+
+def iter_pdf_pages(source: DocumentSource, backend: Optional[str] = None) -> Iterator[str]:
+    """
+    Texte d'un PDF page par page, extrait à la demande (séquentiel, dans le processus appelant)
+    Les pages ne sont extraites que si l'appelant les consomme: un aperçu s'arrête aux premières pages.
+    """
+    engine = get_pdf_backend(backend)
+    if not is_path_source(source) and hasattr(source, "seek") and source.seekable():
+        source.seek(0)
+    document = engine.open(source)
+    try:
+        for index in range(engine.page_count(document)):
+            yield engine.extract_page(document, index)
+    finally:
+        engine.close(document)
@@ -4,10 +4,10 @@ Extrait le texte depuis des liens de documents SharePoint
 """
 import os
 import re
-import tempfile
 from typing import Optional
 from office365.sharepoint.client_context import ClientContext
 from office365.runtime.auth.client_credential import ClientCredential
+from .document_source import spooled_buffer
 from .file_extractor import extract_text_from_file
 
 def is_sharepoint_url(text: str) -> bool:
@@ -78,23 +78,13 @@ def extract_text_from_sharepoint(sharepoint_url: str) -> str:
         file.get().execute_query()
         filename = file.properties.get("Name", "document.pdf")
         
-        # Télécharger vers un fichier temporaire
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(filename)[1]) as tmp_file:
-            tmp_path = tmp_file.name
-        
-        try:
-            # Télécharger le contenu du fichier
-            with open(tmp_path, "wb") as local_file:
-                file.download(local_file).execute_query()
+        # Télécharger en mémoire (fichier temporaire seulement au-delà du seuil de spooling)
+        with spooled_buffer() as buffer:
+            file.download(buffer).execute_query()
             
             # Extraire le texte
-            text = extract_text_from_file(tmp_path, filename)
+            text = extract_text_from_file(buffer, filename)
             return text
-            
-        finally:
-            # Nettoyer le fichier temporaire
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
     
     except Exception as e:
         raise Exception(f"Erreur lors de l'accès à SharePoint: {str(e)}")
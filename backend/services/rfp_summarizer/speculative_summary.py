@@ -0,0 +1,196 @@
+"""
+Analyse spéculative des appels d'offres déposés via /ingest (opt-in)
+Quand la détection suggère "summarize" avec un score d'appel d'offres élevé, l'analyse IA
+est lancée en tâche de fond dès l'ingestion, indexée par file_id: si l'utilisateur confirme
+(/summarizeRfp avec ce file_id), le résultat est prêt ou il ne reste que la fin de l'appel
+à attendre. S'il choisit une autre action, l'analyse est annulée.
+
+Le coût est plafonné:
+- SPECULATIVE_SUMMARY: 1 | 0 (défaut: 0, désactivé)
+- SPECULATIVE_MIN_RFP_SCORE: indicateurs d'appel d'offres requis (défaut: 3)
+- SPECULATIVE_MAX_CONCURRENT: analyses spéculatives simultanées (défaut: 2)
+- SPECULATIVE_MAX_DOC_TOKENS: taille max d'un document analysé par avance (défaut: 60000)
+- SPECULATIVE_TOKENS_PER_HOUR: tokens de documents lancés par heure glissante (défaut: 500000)
+- SPECULATIVE_TTL: secondes avant éviction d'une analyse jamais confirmée (défaut: 1800)
+
+L'analyse passe par summarize_rfp_with_ai (cache de résultats, single-flight, ordonnanceur):
+une confirmation par un nouvel upload du même document en profite aussi.
+"""
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from services.common.token_budget import count_tokens_async
+
+from .ai_summarizer import summarize_rfp_with_ai
+
+_jobs = {}  # file_id -> {"task", "tokens", "created_at", "timer"}
+_launched = deque()  # (instant de lancement, tokens) sur l'heure glissante
+
+_metrics = {
+    "started": 0,
+    "confirmed": 0,
+    "cancelled": 0,
+    "evicted": 0,
+    "failed": 0,
+    "skipped_concurrency": 0,
+    "skipped_document_size": 0,
+    "skipped_budget": 0,
+    "tokens_started": 0,
+    "tokens_wasted": 0
+}
+
+
+def _enabled() -> bool:
+    return os.getenv("SPECULATIVE_SUMMARY", "0").lower() in ("1", "true", "yes", "on")
+
+
+def _tokens_last_hour() -> int:
+    horizon = time.monotonic() - 3600
+    while _launched and _launched[0][0] < horizon:
+        _launched.popleft()
+    return sum(tokens for _, tokens in _launched)
+
+
+def _running_jobs() -> int:
+    return sum(1 for job in _jobs.values() if not job["task"].done())
+
+
+async def start_speculative_summary(file_id: str, text: str, detection: Dict) -> bool:
+    """
+    Lancer l'analyse d'un fichier ingéré avant que l'utilisateur ne la demande
+
+    Args:
+        file_id: Identifiant du fichier ingéré
+        text: Texte extrait et normalisé
+        detection: Résultat de detect_content_intent (suggested_action, rfp_score)
+
+    Returns:
+        True si l'analyse spéculative a été lancée
+    """
+    if not _enabled() or not text:
+        return False
+    if detection.get("suggested_action") != "summarize":
+        return False
+    if detection.get("rfp_score", 0) < int(os.getenv("SPECULATIVE_MIN_RFP_SCORE", "3")):
+        return False
+
+    # Compté avant les vérifications de capacité: aucune attente entre la vérification et le lancement
+    tokens = await count_tokens_async(text)
+
+    if _running_jobs() >= int(os.getenv("SPECULATIVE_MAX_CONCURRENT", "2")):
+        _metrics["skipped_concurrency"] += 1
+        print(f"⏸️ [SPÉCULATIF] Analyse de {file_id} non lancée: trop d'analyses en cours")
+        return False
+
+    if tokens > int(os.getenv("SPECULATIVE_MAX_DOC_TOKENS", "60000")):
+        _metrics["skipped_document_size"] += 1
+        print(f"⏸️ [SPÉCULATIF] Analyse de {file_id} non lancée: document trop long ({tokens} tokens)")
+        return False
+    if _tokens_last_hour() + tokens > int(os.getenv("SPECULATIVE_TOKENS_PER_HOUR", "500000")):
+        _metrics["skipped_budget"] += 1
+        print(f"⏸️ [SPÉCULATIF] Analyse de {file_id} non lancée: budget horaire atteint")
+        return False
+
+    cancel_speculative_summary(file_id)
+
+    loop = asyncio.get_running_loop()
+    task = loop.create_task(summarize_rfp_with_ai(text))
+    task.add_done_callback(lambda done: _report_failure(file_id, done))
+    job = {"task": task, "tokens": tokens, "created_at": time.monotonic(), "timer": None}
+    job["timer"] = loop.call_later(float(os.getenv("SPECULATIVE_TTL", "1800")), _evict, file_id, job)
+    _jobs[file_id] = job
+
+    _launched.append((time.monotonic(), tokens))
+    _metrics["started"] += 1
+    _metrics["tokens_started"] += tokens
+    print(f"⏩ [SPÉCULATIF] Analyse de l'appel d'offres lancée pour {file_id} ({tokens} tokens)")
+    return True
+
+
+async def take_speculative_summary(file_id: str) -> Optional[Dict]:
+    """
+    Récupérer l'analyse spéculative d'un fichier ingéré (en attendant la fin de l'appel)
+
+    Returns:
+        Résumé (metadata["speculative"] = True), ou None s'il n'y a pas d'analyse utilisable
+    """
+    job = _jobs.get(file_id)
+    if job is None or job["task"].get_loop() is not asyncio.get_running_loop():
+        return None
+
+    waited_from = time.perf_counter()
+    try:
+        # shield: un client qui abandonne la confirmation ne perd pas l'analyse
+        summary = await asyncio.shield(job["task"])
+    except asyncio.CancelledError:
+        if job["task"].cancelled():
+            # Analyse annulée pendant l'attente: analyse à la demande
+            return None
+        raise
+    except Exception as e:
+        print(f"⚠️ [SPÉCULATIF] Analyse {file_id} inutilisable, analyse à la demande: {e}")
+        _discard(file_id, job)
+        return None
+
+    if _jobs.get(file_id) is job:
+        del _jobs[file_id]
+        job["timer"].cancel()
+    _metrics["confirmed"] += 1
+
+    waited = time.perf_counter() - waited_from
+    age = time.monotonic() - job["created_at"]
+    print(f"⚡ [SPÉCULATIF] Analyse prête pour {file_id} (lancée il y a {age:.1f}s, attente {waited * 1000:.0f} ms)")
+    summary = dict(summary)
+    summary["metadata"] = {**summary.get("metadata", {}), "speculative": True}
+    return summary
+
+
+def cancel_speculative_summary(file_id: str):
+    """Annuler l'analyse spéculative d'un fichier (l'utilisateur a choisi une autre action)"""
+    job = _jobs.get(file_id)
+    if job is not None:
+        if not job["task"].done():
+            print(f"🛑 [SPÉCULATIF] Analyse de {file_id} annulée")
+            _metrics["cancelled"] += 1
+        _discard(file_id, job)
+
+
+def cancel_all_speculative_summaries():
+    """Annuler toutes les analyses spéculatives en cours (arrêt du serveur)"""
+    for file_id in list(_jobs):
+        cancel_speculative_summary(file_id)
+
+
+def get_speculation_metrics() -> Dict:
+    """Analyses lancées, confirmées, annulées et tokens engagés sans confirmation"""
+    metrics = dict(_metrics)
+    metrics["running"] = _running_jobs()
+    metrics["pending"] = len(_jobs)
+    metrics["tokens_last_hour"] = _tokens_last_hour()
+    return metrics
+
+
+def _discard(file_id: str, job: Dict):
+    if _jobs.get(file_id) is job:
+        del _jobs[file_id]
+    job["timer"].cancel()
+    _metrics["tokens_wasted"] += job["tokens"]
+    # Annule l'appel IA s'il est en cours (le single-flight le garde si une requête le partage)
+    job["task"].cancel()
+
+
+def _evict(file_id: str, job: Dict):
+    if _jobs.get(file_id) is job:
+        print(f"🗑️ [SPÉCULATIF] {file_id} non confirmé, analyse évincée")
+        _metrics["evicted"] += 1
+        _discard(file_id, job)
+
+
+def _report_failure(file_id: str, task: asyncio.Task):
+    # Récupère l'exception même si personne ne confirme (pas d'avertissement asyncio)
+    if not task.cancelled() and task.exception() is not None:
+        _metrics["failed"] += 1
+        print(f"⚠️ [SPÉCULATIF] Échec de l'analyse pour {file_id}: {task.exception()}")
@@ -0,0 +1,115 @@
+"""
+Décodage des fichiers texte avec détection d'encodage par échantillons
+chardet sur le fichier entier est très lent sur les exports de plusieurs Mo:
+1. BOM (UTF-8, UTF-16, UTF-32): encodage connu sans analyse
+2. UTF-8 strict: la grande majorité des fichiers, décodés sans chardet
+3. sinon chardet sur des fenêtres bornées: début, tranches au milieu et fin du fichier
+
+Le contenu est ensuite décodé par blocs (décodeur incrémental), sans copie binaire complète.
+"""
+import codecs
+from typing import BinaryIO, List, Tuple
+
+import chardet
+
+from .document_source import DocumentSource, open_source
+
+BLOCK_SIZE = 1024 * 1024
+
+# Fenêtres analysées par chardet quand le fichier n'est pas en UTF-8
+HEAD_SAMPLE_BYTES = 64 * 1024
+TAIL_SAMPLE_BYTES = 64 * 1024
+MIDDLE_SAMPLES = 4
+MIDDLE_SAMPLE_BYTES = 16 * 1024
+
+# Repli quand les échantillons ne contiennent que de l'ASCII mais que le fichier n'est pas en UTF-8
+FALLBACK_ENCODING = "cp1252"
+
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+def _bom_encoding(head: bytes):
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+    return None
+
+
+def _decode_stream(stream: BinaryIO, encoding: str, errors: str) -> str:
+    decoder = codecs.getincrementaldecoder(encoding)(errors=errors)
+    parts = [decoder.decode(block) for block in iter(lambda: stream.read(BLOCK_SIZE), b"")]
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts)
+
+
+def _sample_windows(stream: BinaryIO) -> List[bytes]:
+    """Début, tranches réparties au milieu et fin du fichier"""
+    size = stream.seek(0, 2)
+    if size <= HEAD_SAMPLE_BYTES + TAIL_SAMPLE_BYTES + MIDDLE_SAMPLES * MIDDLE_SAMPLE_BYTES:
+        stream.seek(0)
+        return [stream.read()]
+
+    offsets = [0]
+    step = (size - HEAD_SAMPLE_BYTES - TAIL_SAMPLE_BYTES) // (MIDDLE_SAMPLES + 1)
+    offsets += [HEAD_SAMPLE_BYTES + step * (index + 1) for index in range(MIDDLE_SAMPLES)]
+    lengths = [HEAD_SAMPLE_BYTES] + [MIDDLE_SAMPLE_BYTES] * MIDDLE_SAMPLES
+
+    windows = []
+    for offset, length in zip(offsets, lengths):
+        stream.seek(offset)
+        windows.append(stream.read(length))
+    stream.seek(size - TAIL_SAMPLE_BYTES)
+    windows.append(stream.read(TAIL_SAMPLE_BYTES))
+    return windows
+
+
+def detect_sampled_encoding(stream: BinaryIO) -> str:
+    """Encodage probable d'un fichier non UTF-8, d'après des fenêtres bornées (chardet)"""
+    detector = chardet.UniversalDetector()
+    for window in _sample_windows(stream):
+        detector.feed(window)
+        if detector.done:
+            break
+    detector.close()
+    encoding = detector.result.get("encoding")
+    if not encoding or encoding.lower() in ("ascii", "utf-8"):
+        # Les fenêtres ne contiennent pas les octets non UTF-8 trouvés ailleurs
+        return FALLBACK_ENCODING
+    try:
+        name = codecs.lookup(encoding).name
+    except LookupError:
+        return FALLBACK_ENCODING
+    # cp1252 contient latin-1 (hors caractères de contrôle) et ajoute €, œ, les guillemets typographiques
+    return FALLBACK_ENCODING if name == "iso8859-1" else encoding
+
+
+def decode_text_source(source: DocumentSource) -> Tuple[str, str]:
+    """
+    Décoder le contenu d'un fichier texte
+
+    Args:
+        source: Chemin, contenu (bytes, memoryview) ou fichier binaire ouvert
+
+    Returns:
+        (texte, encodage utilisé)
+    """
+    with open_source(source) as stream:
+        encoding = _bom_encoding(stream.read(4))
+        stream.seek(0)
+        if encoding:
+            return _decode_stream(stream, encoding, errors="ignore"), encoding
+
+        try:
+            return _decode_stream(stream, "utf-8", errors="strict"), "utf-8"
+        except UnicodeDecodeError:
+            pass
+
+        encoding = detect_sampled_encoding(stream)
+        stream.seek(0)
+        return _decode_stream(stream, encoding, errors="ignore"), encoding
@@ -0,0 +1,173 @@
+"""
+Normalisation du texte extrait avant tout appel IA
+Le texte brut d'un DCE contient beaucoup de tokens inutiles pour le modèle:
+- en-têtes et pieds de page répétés sur chaque page PDF, numéros de page
+- sommaires (lignes à points de conduite "Article 3 ........ 12"), uniquement sous un titre
+  "Sommaire" / "Table des matières" ou en série: une ligne isolée "Pénalité ........ 500" est conservée
+- mots coupés en fin de ligne ("presta-\\ntions")
+- espaces multiples, tabulations, lignes vides en série
+
+Les pages PDF sont séparées par "\\f" (voir pdf_engine): les lignes répétées sont
+détectées en tête et en pied des pages. Les réductions (caractères et tokens) sont
+journalisées et cumulées pour /metrics/llm.
+
+Variables d'environnement:
+- TEXT_NORMALIZATION: 1 | 0 (défaut: 1)
+"""
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, List
+
+from services.common.token_budget import count_tokens
+
+from .pdf_engine import PAGE_SEPARATOR
+
+# Lignes examinées en tête et en pied de chaque page
+EDGE_LINES = 3
+# Une ligne est un en-tête/pied de page si elle revient sur au moins cette part des pages
+REPEATED_LINE_MIN_RATIO = 0.5
+REPEATED_LINE_MIN_PAGES = 3
+# Lignes à points de conduite consécutives formant un sommaire sans titre
+TOC_MIN_RUN = 3
+
+_DIGITS = re.compile(r"\d+")
+_SPACES = re.compile(r"[ \t\u00a0\u2009\u202f]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+_PAGE_NUMBER = re.compile(
+    r"^[-–—\s]*(?:page|p\.)?\s*\d{1,4}(?:\s*(?:/|sur|of)\s*\d{1,4})?[-–—\s]*$", re.IGNORECASE
+)
+_TOC_LINE = re.compile(r"^\S.*?(?:(?:\.\s?){4,}|…+|_{4,})\s*\d{1,4}$")
+_TOC_HEADING = re.compile(r"^(?:table des mati[èe]res|sommaire|table of contents)\s*:?$", re.IGNORECASE)
+_RULE_LINE = re.compile(r"^[-_=*·•.\s]{4,}$")
+_HYPHENATION = re.compile(r"([a-zà-öø-ÿ])-\n([a-zà-öø-ÿ])")
+
+_metrics_lock = threading.Lock()
+_metrics = {"documents": 0, "chars_before": 0, "chars_after": 0, "tokens_before": 0, "tokens_after": 0}
+
+
+def _line_key(line: str) -> str:
+    # Numéros variables (page 3 / page 4) confondus
+    return _DIGITS.sub("#", line.lower())
+
+
+def _edge_indexes(lines: List[str]) -> List[int]:
+    filled = [index for index, line in enumerate(lines) if line]
+    return sorted(set(filled[:EDGE_LINES] + filled[-EDGE_LINES:]))
+
+
+def _strip_page_furniture(pages: List[List[str]], stats: Dict):
+    """Retirer en place les en-têtes/pieds de page répétés et les numéros de page"""
+    repeated = set()
+    if len(pages) >= REPEATED_LINE_MIN_PAGES:
+        counts = Counter()
+        for lines in pages:
+            counts.update({_line_key(lines[index]) for index in _edge_indexes(lines)})
+        threshold = max(REPEATED_LINE_MIN_PAGES, math.ceil(len(pages) * REPEATED_LINE_MIN_RATIO))
+        repeated = {key for key, count in counts.items() if count >= threshold}
+
+    for lines in pages:
+        for index in _edge_indexes(lines):
+            if _PAGE_NUMBER.match(lines[index]):
+                stats["page_numbers"] += 1
+            elif _line_key(lines[index]) in repeated:
+                stats["repeated_lines"] += 1
+            else:
+                continue
+            lines[index] = ""
+
+
+def _toc_runs(lines: List[str]) -> List[List[int]]:
+    """Suites de lignes à points de conduite (lignes vides et filets entre deux entrées ignorés)"""
+    runs, current = [], []
+    for index, line in enumerate(lines):
+        if _TOC_LINE.match(line):
+            current.append(index)
+        elif line and not _RULE_LINE.match(line) and current:
+            runs.append(current)
+            current = []
+    if current:
+        runs.append(current)
+    return runs
+
+
+def _strip_table_of_contents(lines: List[str], stats: Dict) -> List[str]:
+    """Retirer les sommaires: entrées sous un titre "Sommaire" ou en série d'au moins TOC_MIN_RUN lignes"""
+    dropped = set()
+    for run in _toc_runs(lines):
+        heading = next(
+            (index for index in range(run[0] - 1, -1, -1) if lines[index] and not _RULE_LINE.match(lines[index])),
+            None
+        )
+        under_heading = heading is not None and _TOC_HEADING.match(lines[heading])
+        if under_heading or len(run) >= TOC_MIN_RUN:
+            dropped.update(run)
+            if under_heading:
+                dropped.add(heading)
+    stats["toc_lines"] += len(dropped)
+    return [line for index, line in enumerate(lines) if index not in dropped and not _RULE_LINE.match(line)]
+
+
+def normalize_document_text(text: str) -> Dict:
+    """
+    Normaliser un texte extrait pour l'envoyer au modèle
+
+    Args:
+        text: Texte extrait (pages PDF séparées par "\\f")
+
+    Returns:
+        Dict avec text, chars_before, chars_after, tokens_before, tokens_after
+        et le détail des suppressions (repeated_lines, page_numbers, toc_lines, hyphenations)
+    """
+    stats = {"repeated_lines": 0, "page_numbers": 0, "toc_lines": 0, "hyphenations": 0}
+
+    pages = [
+        [_SPACES.sub(" ", line).strip() for line in page.splitlines()]
+        for page in text.split(PAGE_SEPARATOR)
+    ]
+    if len(pages) > 1:
+        _strip_page_furniture(pages, stats)
+
+    normalized = "\n\n".join("\n".join(_strip_table_of_contents(lines, stats)) for lines in pages)
+    normalized, stats["hyphenations"] = _HYPHENATION.subn(r"\1\2", normalized)
+    normalized = _BLANK_LINES.sub("\n\n", normalized).strip()
+
+    result = {
+        "text": normalized,
+        "chars_before": len(text),
+        "chars_after": len(normalized),
+        "tokens_before": count_tokens(text),
+        "tokens_after": count_tokens(normalized),
+        **stats
+    }
+    with _metrics_lock:
+        _metrics["documents"] += 1
+        for key in ("chars_before", "chars_after", "tokens_before", "tokens_after"):
+            _metrics[key] += result[key]
+    return result
+
+
+def prepare_text_for_llm(text: str) -> str:
+    """Texte normalisé (TEXT_NORMALIZATION), avec la réduction obtenue dans les logs"""
+    if os.getenv("TEXT_NORMALIZATION", "1").lower() in ("0", "false", "no", "off"):
+        return text
+
+    result = normalize_document_text(text)
+    saved_tokens = result["tokens_before"] - result["tokens_after"]
+    if result["chars_before"]:
+        ratio = 100 * (result["chars_before"] - result["chars_after"]) / result["chars_before"]
+        print(f"🧹 Texte normalisé: {result['chars_before']} → {result['chars_after']} caractères (-{ratio:.1f}%), "
+              f"-{saved_tokens} tokens ({result['repeated_lines']} en-têtes/pieds, {result['page_numbers']} n° de page, "
+              f"{result['toc_lines']} lignes de sommaire, {result['hyphenations']} césures)")
+    return result["text"]
+
+
+def get_normalization_metrics() -> Dict:
+    """Réductions cumulées depuis le démarrage"""
+    with _metrics_lock:
+        metrics = dict(_metrics)
+    metrics["tokens_saved"] = metrics["tokens_before"] - metrics["tokens_after"]
+    metrics["chars_saved"] = metrics["chars_before"] - metrics["chars_after"]
+    return metrics
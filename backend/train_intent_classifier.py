@@ -0,0 +1,71 @@
+"""
+Entraînement hors ligne du classifieur d'intention local (TF-IDF + régression logistique)
+À partir du journal de routage (ROUTING_LOG_PATH, désactivé par défaut): décisions sûres de l'IA
+et actions réellement choisies par les utilisateurs pour les fichiers ingérés.
+
+Le modèle est évalué sur un jeu de test mis de côté, puis réentraîné sur tous les exemples
+et enregistré (INTENT_MODEL_PATH): le serveur le recharge automatiquement.
+
+Usage:
+    python train_intent_classifier.py                     # journal ROUTING_LOG_PATH
+    python train_intent_classifier.py --log cache/routing_decisions.jsonl --output cache/intent_classifier.json
+"""
+
+import argparse
+import random
+import sys
+from typing import List, Optional
+
+from services.common.intent_classifier import (
+    evaluate_intent_classifier,
+    intent_model_path,
+    load_routing_examples,
+    train_intent_classifier
+)
+from services.common.routing_log import routing_log_path
+
+
+def split_examples(examples: List[dict], holdout: float, seed: int):
+    """Séparer exemples d'entraînement et jeu de test (mélange reproductible)"""
+    shuffled = list(examples)
+    random.Random(seed).shuffle(shuffled)
+    test_size = int(len(shuffled) * holdout)
+    return shuffled[test_size:], shuffled[:test_size]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Entraîner le classifieur d'intention local")
+    parser.add_argument(
+        "--log", default=routing_log_path() or None, required=not routing_log_path(),
+        help="Journal de routage (JSON lines, défaut: ROUTING_LOG_PATH)"
+    )
+    parser.add_argument("--output", default=intent_model_path(), help="Fichier du modèle entraîné")
+    parser.add_argument("--holdout", type=float, default=0.2, help="Part des exemples gardés pour l'évaluation")
+    parser.add_argument("--epochs", type=int, default=30)
+    parser.add_argument("--min-df", type=int, default=2, help="Exemples minimum contenant un terme")
+    parser.add_argument("--min-examples", type=int, default=20, help="Exemples requis pour entraîner")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    examples = load_routing_examples(args.log)
+    print(f"📚 {len(examples)} exemples étiquetés dans {args.log}")
+    if len(examples) < args.min_examples:
+        print(f"❌ Pas assez d'exemples pour entraîner (minimum: {args.min_examples})")
+        return 1
+
+    train, test = split_examples(examples, args.holdout, args.seed)
+    if test:
+        model = train_intent_classifier(train, epochs=args.epochs, min_df=args.min_df, seed=args.seed)
+        report = evaluate_intent_classifier(model, test)
+        print(f"🎯 Jeu de test ({report['examples']} exemples): exactitude {report['accuracy']:.1%}, "
+              f"latence moyenne {report['latency_ms_mean']:.3f} ms (p95 {report['latency_ms_p95']:.3f} ms)")
+
+    model = train_intent_classifier(examples, epochs=args.epochs, min_df=args.min_df, seed=args.seed)
+    model.save(args.output)
+    print(f"✅ Modèle enregistré: {args.output} ({model.metadata['vocabulary']} termes, "
+          f"{model.metadata['training_seconds']}s, actions: {model.metadata['classes']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the DOCX extraction
+Compares the previous python-docx extraction (object model, tables appended at the end,
+merged cells repeated) with the streaming XML reader on a generated CCTP-like document
+
+Usage:
+    python benchmark_docx_extraction.py [--sections N]
+"""
+
+import argparse
+import io
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+
+def make_cctp_docx(sections: int) -> bytes:
+    """Generate a DOCX with numbered articles and a table with merged cells per section"""
+    from docx import Document
+
+    document = Document()
+    for section in range(sections):
+        document.add_heading(f"Article {section + 1} - Prestations attendues", level=2)
+        for line in range(12):
+            document.add_paragraph(
+                f"{section + 1}.{line + 1} Le titulaire assure la maintenance corrective et évolutive "
+                f"du lot {line % 5 + 1}, dans le respect des niveaux de service définis en annexe."
+            )
+        table = document.add_table(rows=4, cols=4)
+        table.cell(0, 0).text = "Lot"
+        table.cell(0, 1).text = "Prestation"
+        table.cell(0, 2).text = "Délai"
+        table.cell(0, 3).text = "Pénalité"
+        table.cell(1, 0).merge(table.cell(3, 0)).text = f"Lot {section % 5 + 1}"
+        for row in range(1, 4):
+            table.cell(row, 1).merge(table.cell(row, 2)).text = f"Prestation {row} de l'article {section + 1}"
+            table.cell(row, 3).text = f"{row * 100} € par jour"
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def legacy_extract(data: bytes) -> str:
+    """Previous implementation: python-docx paragraphs, then every table cell"""
+    from docx import Document
+
+    doc = Document(io.BytesIO(data))
+    text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
+    for table in doc.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                text += "\n" + cell.text
+    return text.strip()
+
+
+def measure(function, data: bytes):
+    tracemalloc.start()
+    started = time.perf_counter()
+    text = function(data)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return text, elapsed_ms, peak / (1024 * 1024)
+
+
+def main():
+    from services.rfp_summarizer.file_extractor import extract_text_from_docx
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sections", type=int, default=300, help="Articles in the generated document (~200 pages for 300)")
+    args = parser.parse_args()
+
+    data = make_cctp_docx(args.sections)
+    print(f"Document: {args.sections} articles, {len(data) / 1024:.0f} KB")
+    print(f"{'extractor':<12} {'time (ms)':>10} {'peak (MB)':>10} {'characters':>11}")
+    for name, function in (("python-docx", legacy_extract), ("streaming", extract_text_from_docx)):
+        text, elapsed_ms, peak_mb = measure(function, data)
+        print(f"{name:<12} {elapsed_ms:>10.0f} {peak_mb:>10.1f} {len(text):>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the intent routers on a held-out set
+Compares the keyword rules, the naive Bayes router, the offline TF-IDF + logistic
+regression classifier and (with --llm and Azure OpenAI configured) analyze_content_with_ai
+on accuracy and per-prediction latency, on the labelled decisions of the routing log.
+The LLM is only scored against the choices made by users: its own suggestions in the log
+would score it against itself. A call that returns no analysis counts as a miss.
+
+--smoke-test replaces the log with a synthetic French dataset whose classes are easy to
+separate: it checks that the routers run, its accuracy figures say nothing about real traffic.
+
+Usage:
+    python benchmark_intent_router.py --log backend/cache/routing_decisions.jsonl [--llm]
+    python benchmark_intent_router.py --smoke-test
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+PHRASES = {
+    "summarize": [
+        "le règlement de consultation précise les critères de sélection",
+        "la date limite de remise des offres est fixée au 15 mars",
+        "le candidat joint l'acte d'engagement et le mémoire technique",
+        "le marché est alloti et la durée du contrat est de trois ans",
+        "les pénalités de retard s'appliquent au titulaire",
+    ],
+    "diagram": [
+        "les machines virtuelles sont placées derrière le pare-feu",
+        "le répartiteur de charge distribue le trafic vers le cluster",
+        "la base de données est répliquée entre deux zones",
+        "l'API passe par une passerelle et un bus de messages",
+        "les conteneurs sont orchestrés par Kubernetes",
+    ],
+    "deck": [
+        "le chiffre d'affaires du trimestre progresse nettement",
+        "nos objectifs commerciaux pour l'année prochaine",
+        "la feuille de route produit et les prochaines étapes",
+        "présentation des résultats à l'équipe de direction",
+        "les nouveaux clients et la stratégie de fidélisation",
+    ],
+    "harmonize": [
+        "reprendre les diapositives avec la charte graphique",
+        "uniformiser les polices et les couleurs de la proposition",
+        "mettre le support au format du modèle de l'entreprise",
+        "les titres des slides doivent suivre le gabarit officiel",
+        "harmoniser la mise en page de la réponse commerciale",
+    ],
+}
+
+# Shared vocabulary, so that a single word rarely decides the class
+FILLERS = [
+    "le projet", "pour le client", "dans le cadre de la mission", "en 2025",
+    "selon l'équipe", "avec les partenaires", "à court terme", "en annexe",
+]
+
+
+def synthetic_examples(count: int, seed: int):
+    """French previews built from per-action phrases mixed with shared filler"""
+    rng = random.Random(seed)
+    actions = sorted(PHRASES)
+    examples = []
+    for index in range(count):
+        action = actions[index % len(actions)]
+        parts = rng.sample(PHRASES[action], 2) + rng.sample(FILLERS, 3)
+        # One phrase from another action: real previews are rarely pure
+        parts.append(rng.choice(PHRASES[rng.choice([other for other in actions if other != action])]))
+        rng.shuffle(parts)
+        examples.append({"content": ". ".join(parts).capitalize() + ".", "filename": None, "action": action, "tier": "synthetic"})
+    return examples
+
+
+def measure(name, predict, examples):
+    correct = 0
+    latencies = []
+    for example in examples:
+        started = time.perf_counter()
+        action = predict(example)
+        latencies.append((time.perf_counter() - started) * 1000)
+        correct += action == example["action"]
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"{name:<16} {correct / len(examples):>9.1%} {sum(latencies) / len(latencies):>11.3f} {p95:>10.3f}")
+
+
+def main():
+    from services.common.file_type_detector import _detect_with_rules
+    from services.common.intent_classifier import load_routing_examples, train_intent_classifier
+    from services.common.intent_router import NaiveBayesRouter, routing_features
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--log", help="Routing log (JSON lines) with labelled decisions")
+    parser.add_argument("--smoke-test", action="store_true", help="Synthetic dataset instead of a log (accuracy not meaningful)")
+    parser.add_argument("--examples", type=int, default=800, help="Synthetic examples for --smoke-test")
+    parser.add_argument("--holdout", type=float, default=0.2)
+    parser.add_argument("--llm", action="store_true", help="Also measure analyze_content_with_ai (Azure OpenAI)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if not args.log and not args.smoke_test:
+        parser.error("--log is required (or --smoke-test for a synthetic run)")
+
+    if args.log:
+        examples = load_routing_examples(args.log)
+        if not examples:
+            parser.error(f"no labelled decisions in {args.log}")
+    else:
+        print("SMOKE TEST: synthetic, easily separable dataset - accuracy figures are not meaningful\n")
+        examples = synthetic_examples(args.examples, args.seed)
+    random.Random(args.seed).shuffle(examples)
+    test_size = max(1, int(len(examples) * args.holdout))
+    train, test = examples[test_size:], examples[:test_size]
+    print(f"{len(train)} training examples, {len(test)} held-out examples\n")
+
+    started = time.perf_counter()
+    bayes = NaiveBayesRouter((routing_features(e["content"], e.get("filename")), e["action"]) for e in train)
+    print(f"naive Bayes trained in {time.perf_counter() - started:.2f} s")
+    started = time.perf_counter()
+    model = train_intent_classifier(train, seed=args.seed)
+    print(f"TF-IDF + logistic trained in {time.perf_counter() - started:.2f} s\n")
+
+    print(f"{'router':<16} {'accuracy':>9} {'mean (ms)':>11} {'p95 (ms)':>10}")
+    measure("rules", lambda e: _detect_with_rules(e["content"], e.get("filename"), False, None)["suggested_action"], test)
+    measure("naive_bayes", lambda e: bayes.predict(routing_features(e["content"], e.get("filename")))[0], test)
+    measure("tfidf_logistic", lambda e: model.predict(e["content"], e.get("filename"))[0], test)
+
+    if args.llm:
+        from services.common.ai_content_analyzer import analyze_content_with_ai
+        from services.common.llm_client import close_ai_clients, is_ai_configured
+
+        user_test = [e for e in test if e.get("tier") == "user"]
+        if not is_ai_configured():
+            print("llm              skipped (Azure OpenAI not configured)")
+        elif not user_test:
+            print("llm              skipped (no user-labelled example in the held-out set)")
+        else:
+            loop = asyncio.new_event_loop()
+
+            def predict_llm(example):
+                # No analysis (error, unexpected answer): counted as a miss
+                analysis = loop.run_until_complete(analyze_content_with_ai(example["content"], example.get("filename")))
+                return (analysis or {}).get("suggested_action")
+
+            measure(f"llm ({len(user_test)} user)", predict_llm, user_test)
+            loop.run_until_complete(close_ai_clients())
+            loop.close()
+
+
+if __name__ == "__main__":
+    main()
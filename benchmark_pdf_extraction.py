@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the PDF extraction engine
+Compares the previous serial extraction (page-by-page string concatenation)
+with the page-parallel engine on generated 10-, 100- and 500-page PDFs
+
+Usage:
+    python benchmark_pdf_extraction.py [--workers N] [--backend pypdf2|pymupdf]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+PAGE_COUNTS = (10, 100, 500)
+LINES_PER_PAGE = 40
+
+
+def make_text_pdf(path: str, page_count: int, lines_per_page: int = LINES_PER_PAGE):
+    """Write a minimal multi-page text PDF (Helvetica, one content stream per page)"""
+    objects = {1: b"<< /Type /Catalog /Pages 2 0 R >>", 3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"}
+    kids = []
+    for page in range(page_count):
+        page_id, content_id = 4 + 2 * page, 5 + 2 * page
+        lines = [f"Page {page + 1} - Article {line + 1}: le titulaire assure la maintenance du lot {line % 5 + 1}."
+                 for line in range(lines_per_page)]
+        stream = "BT /F1 9 Tf 40 800 Td 11 TL " + " ".join(f"({line}) '" for line in lines) + " ET"
+        stream = stream.encode("latin-1")
+        objects[content_id] = b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        objects[page_id] = (b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id)
+        kids.append(b"%d 0 R" % page_id)
+    objects[2] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), page_count)
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for number in sorted(objects):
+        offsets[number] = len(output)
+        output += b"%d 0 obj\n%s\nendobj\n" % (number, objects[number])
+    xref = len(output)
+    size = max(objects) + 1
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % size
+    output += b"".join(b"%010d 00000 n \n" % offsets[number] for number in range(1, size))
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref)
+    Path(path).write_bytes(bytes(output))
+
+
+def legacy_extract(path: str) -> str:
+    """Previous implementation: serial, text += page + newline"""
+    import PyPDF2
+
+    text = ""
+    with open(path, "rb") as file:
+        reader = PyPDF2.PdfReader(file)
+        for page_num in range(len(reader.pages)):
+            text += reader.pages[page_num].extract_text() + "\n"
+    return text.strip()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--backend", default=None)
+    args = parser.parse_args()
+
+    from services.rfp_summarizer.pdf_engine import extract_pdf, shutdown_pdf_workers
+
+    print(f"CPU cores: {os.cpu_count()}, workers: {args.workers}")
+    print(f"{'pages':>6} {'legacy':>10} {'engine':>10} {'speedup':>8}  backend  slowest page")
+    with tempfile.TemporaryDirectory() as directory:
+        # Start the worker processes once, as the server does on its first large PDF
+        warmup = os.path.join(directory, "warmup.pdf")
+        make_text_pdf(warmup, 50, 1)
+        extract_pdf(warmup, backend=args.backend, workers=args.workers)
+
+        for page_count in PAGE_COUNTS:
+            path = os.path.join(directory, f"dce_{page_count}.pdf")
+            make_text_pdf(path, page_count)
+
+            started = time.perf_counter()
+            legacy_text = legacy_extract(path)
+            legacy_s = time.perf_counter() - started
+
+            started = time.perf_counter()
+            result = extract_pdf(path, backend=args.backend, workers=args.workers)
+            engine_s = time.perf_counter() - started
+
+            if result["backend"] == "pypdf2":
+                assert result["text"].replace("\f", "\n") == legacy_text, "Engine output differs from the legacy extraction"
+            slowest = max(result["page_timings_ms"])
+            print(f"{page_count:>6} {legacy_s * 1000:>8.0f}ms {engine_s * 1000:>8.0f}ms "
+                  f"{legacy_s / engine_s:>7.2f}x  {result['backend']:<7}  {slowest:.1f} ms")
+
+    shutdown_pdf_workers()
+
+
+if __name__ == "__main__":
+    main()
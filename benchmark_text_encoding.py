@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark of text file decoding
+Compares the previous detection (chardet over the whole file) with the sampled
+detector (BOM, strict UTF-8, then chardet on bounded windows) on large French text files
+
+Usage:
+    python benchmark_text_encoding.py [--sizes 1 4]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import chardet
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+FRENCH_LINES = (
+    "Le titulaire s'engage à respecter les délais d'exécution définis à l'article 5.",
+    "Les pénalités de retard sont calculées par jour calendaire, sans mise en demeure préalable.",
+    "Échéancier prévisionnel : réception des offres, négociation, notification du marché.",
+    "Critères de sélection : valeur technique (60 %), prix (40 %).",
+)
+
+
+def make_french_text(size_mb: float, encoding: str) -> bytes:
+    """Generate French text of about size_mb megabytes in the given encoding"""
+    line_count = int(size_mb * 1024 * 1024 / 80)
+    lines = [f"{index + 1:06d} {FRENCH_LINES[index % len(FRENCH_LINES)]}" for index in range(line_count)]
+    return "\r\n".join(lines).encode(encoding)
+
+
+def legacy_decode(data: bytes):
+    """Previous implementation: chardet over the whole file, then decode"""
+    encoding = chardet.detect(data)["encoding"] or "utf-8"
+    return data.decode(encoding, errors="ignore"), encoding
+
+
+def main():
+    from services.rfp_summarizer.text_decoder import decode_text_source
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 4], help="File sizes in MB")
+    args = parser.parse_args()
+
+    print(f"{'file':<16} {'detector':<9} {'time (ms)':>10} {'encoding':>14} {'same text':>10}")
+    for size_mb in args.sizes:
+        for encoding in ("utf-8", "cp1252"):
+            data = make_french_text(size_mb, encoding)
+            expected = data.decode(encoding)
+            label = f"{size_mb:g} MB {encoding}"
+            for name, function in (("chardet", legacy_decode), ("sampled", decode_text_source)):
+                started = time.perf_counter()
+                text, detected = function(data)
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                print(f"{label:<16} {name:<9} {elapsed_ms:>10.0f} {detected:>14} {str(text == expected):>10}")
+
+
+if __name__ == "__main__":
+    main()
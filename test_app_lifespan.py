@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test of the application lifespan
+Startup must warm the render pool and shutdown must release every service
+(render and PDF processes, extraction cache, speculative summaries, pre-rendered
+PowerPoint files, AI clients) through a single handler, without deprecation warnings
+
+Usage:
+    python -m pytest -q test_app_lifespan.py
+    python test_app_lifespan.py
+"""
+
+import asyncio
+import sys
+import warnings
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+
+async def _run_lifespan(app, events):
+    async with app.router.lifespan_context(app):
+        events.append("running")
+
+
+def test_lifespan_starts_and_stops_every_service():
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        import main
+    from services import deck_generator, rfp_summarizer
+    from services.common import llm_client
+    from services.rfp_summarizer import extraction_cache, pdf_engine
+
+    events = []
+
+    def record(name):
+        def stop(*args, **kwargs):
+            events.append(name)
+        return stop
+
+    async def warm_up():
+        events.append("warm_render_pool")
+
+    async def close_clients():
+        events.append("close_ai_clients")
+
+    with mock.patch.object(main, "warm_render_pool", warm_up), \
+            mock.patch.object(main, "shutdown_render_pool", record("shutdown_render_pool")), \
+            mock.patch.object(pdf_engine, "shutdown_pdf_workers", record("shutdown_pdf_workers")), \
+            mock.patch.object(extraction_cache, "reset_extraction_cache", record("reset_extraction_cache")), \
+            mock.patch.object(rfp_summarizer, "cancel_all_speculative_summaries", record("cancel_all_speculative_summaries")), \
+            mock.patch.object(deck_generator, "discard_all_pptx_prerenders", record("discard_all_pptx_prerenders")), \
+            mock.patch.object(llm_client, "close_ai_clients", close_clients):
+        asyncio.run(_run_lifespan(main.app, events))
+
+    assert events[:2] == ["warm_render_pool", "running"]
+    assert sorted(events[2:]) == sorted([
+        "shutdown_render_pool", "shutdown_pdf_workers", "reset_extraction_cache",
+        "cancel_all_speculative_summaries", "discard_all_pptx_prerenders", "close_ai_clients"
+    ])
+    # Pending AI calls are cancelled before the AI clients are closed
+    assert events.index("cancel_all_speculative_summaries") < events.index("close_ai_clients")
+
+
+if __name__ == "__main__":
+    test_lifespan_starts_and_stops_every_service()
+    print("[OK] Single lifespan handler starts and stops every service")
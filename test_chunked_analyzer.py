@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test of the map-reduce analysis of long RFPs
+Splitting must respect section boundaries and size limits without losing content,
+partial analyses must merge without duplicates, and an analysis with failed parts
+must be flagged and never stored in the result cache
+
+Usage:
+    python -m pytest -q test_chunked_analyzer.py
+    python test_chunked_analyzer.py
+"""
+
+import asyncio
+import json
+import os
+import re
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+SECTION_BODY = "Le titulaire assure la maintenance corrective et évolutive des applications du pôle. " * 6
+
+
+def _document(sections: int = 6) -> str:
+    parts = [f"ARTICLE {index} - OBJET DE LA PARTIE {index}\n{SECTION_BODY}\n\n" for index in range(1, sections + 1)]
+    # One oversized section, without headings, split on paragraphs then hard-split
+    parts.append("ANNEXE TECHNIQUE\n" + "\n\n".join(SECTION_BODY * 3 for _ in range(4)) + "\n")
+    return "".join(parts)
+
+
+def _without_spaces(text: str) -> str:
+    return re.sub(r"\s+", "", text)
+
+
+def test_split_into_sections_respects_limits_and_content():
+    from services.rfp_summarizer.chunked_analyzer import split_into_sections
+
+    text = _document()
+    max_chars = 1200
+    chunks = split_into_sections(text, max_chars)
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= max_chars for chunk in chunks)
+    # Sections that fit start their own chunk on the heading
+    assert sum(chunk.startswith("ARTICLE") for chunk in chunks) >= 3
+    # Nothing dropped or duplicated (only blank lines between paragraphs may change)
+    assert _without_spaces("".join(chunks)) == _without_spaces(text)
+
+
+def test_split_by_tokens_respects_token_budget():
+    from services.common.token_budget import count_tokens
+    from services.rfp_summarizer.chunked_analyzer import split_by_tokens
+
+    text = _document()
+    max_tokens = 300
+    chunks = split_by_tokens(text, max_tokens, "gpt-4o")
+
+    assert len(chunks) > 1
+    assert all(count_tokens(chunk, "gpt-4o") <= max_tokens for chunk in chunks)
+    assert _without_spaces("".join(chunks)) == _without_spaces(text)
+    assert split_by_tokens("Court document.", max_tokens, "gpt-4o") == ["Court document."]
+
+
+def test_merge_partial_analyses():
+    from services.rfp_summarizer.chunked_analyzer import merge_partial_analyses
+
+    merged = merge_partial_analyses([
+        {
+            "identification_marche": {"objet_consultation": "TMA", "acheteur": "NON SPÉCIFIÉ"},
+            "lots": [{"numero": "1", "intitule": "Maintenance", "budget": "NON SPÉCIFIÉ"}],
+            "points_attention": ["Pénalités de retard"],
+            "calendrier": {"niveau_urgence": "STANDARD"}
+        },
+        {
+            "identification_marche": {"objet_consultation": "Autre", "acheteur": "Ville de Nantes"},
+            "lots": [{"numero": "1", "budget": "200 000 €"}, {"numero": "2", "intitule": "Hébergement"}],
+            "points_attention": ["Pénalités de retard", "Visite obligatoire"],
+            "calendrier": {"niveau_urgence": "CRITIQUE"}
+        }
+    ])
+
+    # First specified value wins, unspecified values are filled by later parts
+    assert merged["identification_marche"] == {"objet_consultation": "TMA", "acheteur": "Ville de Nantes"}
+    # Items with the same identity are merged, others appended
+    assert merged["lots"] == [
+        {"numero": "1", "intitule": "Maintenance", "budget": "200 000 €"},
+        {"numero": "2", "intitule": "Hébergement"}
+    ]
+    assert merged["points_attention"] == ["Pénalités de retard", "Visite obligatoire"]
+    assert merged["calendrier"]["niveau_urgence"] == "CRITIQUE"
+
+
+async def _summarize_with_failed_part(text: str):
+    from services.rfp_summarizer import ai_summarizer, chunked_analyzer
+
+    calls = []
+
+    async def flaky_completion(messages, **params):
+        calls.append(messages)
+        if "(2/" in messages[-1]["content"]:
+            raise Exception("timeout")
+        content = json.dumps({"identification_marche": {"objet_consultation": "TMA"}, "points_attention": []})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    with mock.patch.object(chunked_analyzer, "create_chat_completion", flaky_completion):
+        first = await ai_summarizer.summarize_rfp_with_ai(text)
+        calls_after_first = len(calls)
+        second = await ai_summarizer.summarize_rfp_with_ai(text)
+    return first, second, calls_after_first, len(calls)
+
+
+def test_failed_parts_are_flagged_and_not_cached():
+    from services.common import result_cache
+
+    env = {"AZURE_OPENAI_DEPLOYMENT": "gpt-4o", "RFP_SINGLE_CALL_MAX_TOKENS": "300", "RFP_CHUNK_MAX_TOKENS": "300"}
+    with mock.patch.dict(os.environ, env), \
+            mock.patch.object(result_cache, "_backend", result_cache.MemoryCacheBackend(10)), \
+            mock.patch.object(result_cache, "_backend_initialized", True), \
+            mock.patch.object(result_cache, "_caches", {}):
+        first, second, calls_after_first, total_calls = asyncio.run(_summarize_with_failed_part(_document()))
+
+    assert first["metadata"]["analysis_mode"] == "chunked"
+    assert first["metadata"]["failed_chunks"] == 1
+    assert any("n'ont pas pu être analysées" in point for point in first["points_attention"])
+    # The degraded analysis was not cached: the second request analyses the document again
+    assert second["metadata"]["cache"] == "miss"
+    assert total_calls == 2 * calls_after_first
+
+
+if __name__ == "__main__":
+    test_split_into_sections_respects_limits_and_content()
+    test_split_by_tokens_respects_token_budget()
+    test_merge_partial_analyses()
+    test_failed_parts_are_flagged_and_not_cached()
+    print("[OK] Chunked analysis split, merge and partial failures")
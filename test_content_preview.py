@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test of lazy preview extraction
+get_content_preview must stop after the first pages of a large PDF and return
+the same beginning as the full extraction
+
+Usage:
+    python -m pytest -q test_content_preview.py
+    python test_content_preview.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmark_pdf_extraction import make_text_pdf
+
+
+def test_preview_stops_after_first_pages():
+    from services.common.file_type_detector import get_content_preview
+    from services.rfp_summarizer import pdf_engine
+    from services.rfp_summarizer.extraction_cache import reset_extraction_cache
+    from services.rfp_summarizer.file_extractor import extract_text_from_file
+
+    env = {"EXTRACTION_CACHE_MAX_MB": "0", "PDF_EXTRACT_WORKERS": "1"}
+    with mock.patch.dict(os.environ, env):
+        reset_extraction_cache()
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "dce.pdf")
+                make_text_pdf(path, 400)
+
+                pages_read = []
+                original_extract_page = pdf_engine.PyPDF2Backend.extract_page
+
+                def counting_extract_page(self, document, index):
+                    pages_read.append(index)
+                    return original_extract_page(self, document, index)
+
+                with mock.patch.object(pdf_engine.PyPDF2Backend, "extract_page", counting_extract_page):
+                    started = time.perf_counter()
+                    preview = get_content_preview(path, max_chars=2000)
+                    elapsed_ms = (time.perf_counter() - started) * 1000
+                assert len(preview) == 2000
+                assert len(pages_read) < 5, pages_read
+                print(f"Preview of a 400-page PDF: {len(pages_read)} pages read in {elapsed_ms:.0f} ms")
+
+                full_text = extract_text_from_file(path, "dce.pdf")
+                assert preview == full_text[:2000]
+        finally:
+            reset_extraction_cache()
+
+
+if __name__ == "__main__":
+    test_preview_stops_after_first_pages()
+    print("[OK] Lazy preview extraction")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test of the deck session (slides_data stored alongside the HTML)
+The structure built from slides_data must match what parse_html_to_structure extracts
+from the rendered HTML, and the HTML must only be re-parsed once hand-edited
+
+Usage:
+    python -m pytest -q test_deck_session.py
+    python test_deck_session.py
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+SLIDES_DATA = {
+    "title": "Offre TMA <Ville de Lyon>",
+    "subtitle": "Réponse Infotel & partenaires",
+    "slides": [
+        {"type": "title", "title": "Offre TMA", "subtitle": "Ville de Lyon", "notes": "Accueil \"client\""},
+        {"type": "section", "title": "Contexte", "bullets": ["ignoré"]},
+        {"type": "content", "title": " Enjeux ", "subtitle": "Pourquoi", "bullets": ["Coûts < 10%", " Délais ", ""]},
+        {"type": "content", "title": "Sans bullets"},
+        {"type": "comparison", "title": "Avant / Après", "bullets": ["Manuel", "Lent", "Automatisé"]},
+        {"type": "conclusion", "title": "Merci", "bullets": ["Questions ?", "Contact"]},
+        {"type": "conclusion", "title": "Fin"}
+    ]
+}
+
+
+def test_structure_from_slides_data_matches_parsed_html():
+    from services.deck_generator.html_deck_generator import build_html_from_structure
+    from services.deck_generator.html_to_pptx_converter import parse_html_to_structure, structure_from_slides_data
+
+    parsed = parse_html_to_structure(build_html_from_structure(SLIDES_DATA))
+    assert structure_from_slides_data(SLIDES_DATA) == parsed
+
+
+def test_session_reparses_html_only_when_edited():
+    from services.deck_generator import deck_session
+    from services.deck_generator.html_deck_generator import build_html_from_structure
+
+    with tempfile.TemporaryDirectory() as directory:
+        deck_session.SESSION_DIR = directory
+        html = build_html_from_structure(SLIDES_DATA)
+
+        html_id = deck_session.save_deck_session(html, SLIDES_DATA)
+        session = deck_session.load_deck_session(html_id)
+        assert session["source"] == "slides_data"
+        assert session["structure"]["slides"][2]["title"] == "Enjeux"
+
+        edited = html.replace("Enjeux", "Enjeux du projet")
+        Path(directory, f"presentation_{html_id}.html").write_text(edited, encoding="utf-8")
+        session = deck_session.load_deck_session(html_id)
+        assert session["source"] == "html"
+        assert session["structure"]["slides"][2]["title"] == "Enjeux du projet"
+
+        deck_session.delete_deck_session(html_id)
+        assert deck_session.load_deck_session(html_id) is None
+        assert not list(Path(directory).iterdir())
+
+
+if __name__ == "__main__":
+    test_structure_from_slides_data_matches_parsed_html()
+    test_session_reparses_html_only_when_edited()
+    print("[OK] Deck session")
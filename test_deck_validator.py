@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test of the local (rule-based) deck validator
+Mechanical issues must be fixed without any AI call; only semantic issues are reported for AI review
+
+Usage:
+    python -m pytest -q test_deck_validator.py
+    python test_deck_validator.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+
+def _deck(slides):
+    return {"title": "Offre Infotel", "slides": slides}
+
+
+def test_mechanical_issues_are_fixed_locally():
+    from services.deck_generator.deck_validator import validate_deck_locally, check_html
+    from services.deck_generator.html_deck_generator import build_html_from_structure
+
+    slides_data = _deck([
+        {"type": "Cover", "title": "Offre <b>TMA</b>", "subtitle": "Infotel & partenaires"},
+        {"type": "content", "title": "Contexte", "bullets": [f"Point {i} <i>clé</i>" for i in range(14)]},
+        {"type": "vs", "title": "Avant / Après", "bullets": ["Manuel", "Automatisé"]},
+        {"type": "content", "title": "Approche", "bullets": ["Audit", "Plan"]},
+        {"type": "closing", "title": "Merci", "bullets": ["contact@infotel.com"]}
+    ])
+    html = build_html_from_structure(slides_data).replace("#003366", "#FF00FF", 1)
+
+    result = validate_deck_locally(html, slides_data)
+    corrected = result["corrected_slides_data"]["slides"]
+
+    assert result["validation_status"] == "valid", result
+    assert [slide["type"] for slide in corrected] == ["title", "content", "content", "content", "comparison", "content", "conclusion"]
+    assert all(len(slide["bullets"]) <= 6 for slide in corrected)
+    assert corrected[2]["title"] == "Contexte (suite)"
+    assert corrected[0]["title"] == "Offre TMA"
+    assert not result["semantic_issues"]
+
+    checks = check_html(result["corrected_html"])
+    assert checks == {"html_errors": [], "charter_violations": [], "slide_count": 7}, checks
+
+
+def test_malformed_html_is_rebuilt_from_structure():
+    from services.deck_generator.deck_validator import validate_deck_locally
+    from services.deck_generator.html_deck_generator import build_html_from_structure
+
+    slides_data = _deck(
+        [{"type": "title", "title": "Offre"}]
+        + [{"type": "content", "title": f"Partie {i}", "bullets": ["a", "b"]} for i in range(5)]
+        + [{"type": "conclusion", "title": "Merci", "bullets": ["contact"]}]
+    )
+    html = build_html_from_structure(slides_data).replace("</ul>", "", 1)
+
+    result = validate_deck_locally(html, slides_data)
+    assert result["validation_status"] == "valid", result
+    assert result["corrected_html"].count("</ul>") == html.count("</ul>") + 1
+
+
+def test_semantic_issues_are_left_to_ai_review():
+    from services.deck_generator.deck_validator import validate_deck_locally
+    from services.deck_generator.html_deck_generator import build_html_from_structure
+
+    slides_data = _deck([
+        {"type": "content", "title": "Contexte", "bullets": ["a"]},
+        {"type": "content", "title": "Contexte", "bullets": []}
+    ])
+    result = validate_deck_locally(build_html_from_structure(slides_data), slides_data)
+
+    assert result["validation_status"] == "warning"
+    issues = " | ".join(result["semantic_issues"])
+    for expected in ("2 slides", "slide de titre", "conclusion", "titre identique", "sans bullets"):
+        assert expected in issues, issues
+
+
+if __name__ == "__main__":
+    test_mechanical_issues_are_fixed_locally()
+    test_malformed_html_is_rebuilt_from_structure()
+    test_semantic_issues_are_left_to_ai_review()
+    print("[OK] Local deck validator")
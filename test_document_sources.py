@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test of in-memory text extraction
+Extractors must return the same text from a path, bytes, a memoryview or an open binary file
+
+Usage:
+    python -m pytest -q test_document_sources.py
+    python test_document_sources.py
+"""
+
+import io
+import os
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmark_pdf_extraction import make_text_pdf
+
+
+def _docx_bytes() -> bytes:
+    from docx import Document
+
+    document = Document()
+    document.add_paragraph("Cahier des clauses techniques")
+    document.add_paragraph("Lot 1 : maintenance applicative")
+    table = document.add_table(rows=1, cols=2)
+    table.cell(0, 0).text = "Délai"
+    table.cell(0, 1).text = "3 mois"
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def _sources(data: bytes, path: str):
+    spooled = tempfile.SpooledTemporaryFile(max_size=16)  # Rolled over to disk, like a large upload
+    spooled.write(data)
+    spooled.seek(5)  # Extractors must rewind
+    return {"path": path, "bytes": data, "memoryview": memoryview(data), "file": spooled}
+
+
+def test_extractors_accept_in_memory_sources():
+    from services.rfp_summarizer.extraction_cache import reset_extraction_cache
+    from services.rfp_summarizer.file_extractor import extract_text_from_file
+
+    # Every source must really be parsed, not served from the extraction cache
+    with mock.patch.dict(os.environ, {"EXTRACTION_CACHE_MAX_MB": "0"}):
+        reset_extraction_cache()
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                pdf_path = os.path.join(directory, "dce.pdf")
+                make_text_pdf(pdf_path, 3, lines_per_page=2)
+
+                documents = {
+                    "dce.pdf": Path(pdf_path).read_bytes(),
+                    "cctp.docx": _docx_bytes(),
+                    "notes.txt": "Échéance : 15 mars\r\nPénalités : 1 %\r\n".encode("latin-1")
+                }
+                for filename, data in documents.items():
+                    path = os.path.join(directory, filename)
+                    Path(path).write_bytes(data)
+
+                    texts = {kind: extract_text_from_file(source, filename) for kind, source in _sources(data, path).items()}
+                    assert len(set(texts.values())) == 1, (filename, texts)
+                    assert texts["path"], filename
+        finally:
+            reset_extraction_cache()
+
+    assert texts["path"] == "Échéance : 15 mars\nPénalités : 1 %"
+
+
+def test_pptx_extraction_from_open_file():
+    from pptx import Presentation
+    from services.proposal_harmonizer.pptx_extractor import extract_content_from_pptx
+
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[1])
+    slide.shapes.title.text = "Proposition"
+    buffer = io.BytesIO()
+    prs.save(buffer)
+
+    assert extract_content_from_pptx(buffer)["slides"][0]["title"] == "Proposition"
+
+
+if __name__ == "__main__":
+    test_extractors_accept_in_memory_sources()
+    test_pptx_extraction_from_open_file()
+    print("[OK] In-memory extraction")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test of the streaming DOCX reader
+Tables must stay in document order, merged cells must be emitted once,
+and plain paragraphs must read the same as with python-docx
+
+Usage:
+    python -m pytest -q test_docx_reader.py
+    python test_docx_reader.py
+"""
+
+import io
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmark_docx_extraction import legacy_extract, make_cctp_docx
+
+
+def test_tables_in_order_with_merged_cells_once():
+    from docx import Document
+    from services.rfp_summarizer.file_extractor import extract_text_from_docx
+
+    document = Document()
+    document.add_paragraph("Article 1 - Objet")
+    table = document.add_table(rows=3, cols=3)
+    table.cell(0, 0).text = "Lot"
+    table.cell(0, 1).text = "Objet"
+    table.cell(0, 2).text = "Délai"
+    table.cell(1, 0).merge(table.cell(2, 0)).text = "Lot 1"
+    table.cell(1, 1).merge(table.cell(1, 2)).text = "Maintenance applicative"
+    table.cell(2, 1).text = "TMA"
+    table.cell(2, 2).text = "3 mois"
+    document.add_paragraph("Article 2 -\tPénalités")
+    buffer = io.BytesIO()
+    document.save(buffer)
+
+    assert extract_text_from_docx(buffer.getvalue()) == (
+        "Article 1 - Objet\n"
+        "Lot | Objet | Délai\n"
+        "Lot 1 | Maintenance applicative\n"
+        "TMA | 3 mois\n"
+        "Article 2 -\tPénalités"
+    )
+
+
+def test_paragraphs_match_python_docx_and_text_is_shorter():
+    from services.rfp_summarizer.docx_reader import iter_docx_blocks
+    from services.rfp_summarizer.file_extractor import extract_text_from_docx
+
+    data = make_cctp_docx(5)
+    legacy = legacy_extract(data)
+    streamed = extract_text_from_docx(data)
+
+    paragraphs = [block for block in iter_docx_blocks(data) if " | " not in block]
+    assert "\n".join(paragraphs) in legacy
+    assert len(streamed) < len(legacy)
+    # One row per table line, the vertically merged lot only on its first row
+    assert streamed.count("Lot 1 | ") == 1
+
+
+if __name__ == "__main__":
+    test_tables_in_order_with_merged_cells_once()
+    test_paragraphs_match_python_docx_and_text_is_shorter()
+    print("[OK] Streaming DOCX reader")
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Regression test: the API handlers must never block the event loop
+Runs the FastAPI app in-process with a fake AI service (no network, no API key)
+and fails if any handler stalls the loop for more than MAX_LOOP_LAG seconds
+
+Usage:
+    python -m pytest -q test_event_loop_blocking.py
+    python test_event_loop_blocking.py
+"""
+
+import asyncio
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+import httpx
+
+FAKE_AI_LATENCY = 1.0    # Simulated model call duration (seconds)
+MAX_LOOP_LAG = 0.25      # Maximum tolerated event loop stall (seconds), well below FAKE_AI_LATENCY
+CONCURRENT_REQUESTS = 4  # Concurrent requests per endpoint
+
+FAKE_AI_RESPONSE = {
+    "title": "Architecture cible",
+    "type": "architecture",
+    "nodes": [
+        {"id": "node1", "label": "Frontend", "position": {"x": 100, "y": 100}},
+        {"id": "node2", "label": "Backend", "position": {"x": 400, "y": 100}}
+    ],
+    "connections": [{"from": "node1", "to": "node2"}],
+    "slides": [
+        {"type": "title", "title": "Présentation harmonisée", "subtitle": "Infotel"},
+        {"type": "content", "title": "Contexte", "bullets": ["Point 1", "Point 2"]},
+        {"type": "conclusion", "title": "Merci", "bullets": ["Contact"]}
+    ],
+    "identification_marche": {"client_emetteur": "Client test"},
+    "suggested_action": "summarize",
+    "confidence": 0.9
+}
+
+
+class FakeCompletions:
+    """Asynchronous stand-in for client.chat.completions"""
+
+    async def create(self, **kwargs):
+        await asyncio.sleep(FAKE_AI_LATENCY)
+        message = SimpleNamespace(content=json.dumps(FAKE_AI_RESPONSE))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class FakeAsyncClient:
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=FakeCompletions())
+
+    async def close(self):
+        pass
+
+
+class LoopLagMonitor:
+    """Heartbeat task measuring how late the event loop wakes it up"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.max_lag = 0.0
+        self._task = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = time.perf_counter() - start - self.interval
+            self.max_lag = max(self.max_lag, lag)
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+def _build_test_pptx() -> bytes:
+    from pptx import Presentation
+
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[1])
+    slide.shapes.title.text = "Proposition commerciale"
+    slide.placeholders[1].text = "Contexte\nApproche\nBénéfices"
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    return buffer.getvalue()
+
+
+async def _run_concurrent_requests():
+    import main
+    from services.common import llm_client
+    # Warm up the modules imported lazily by the handlers (one-time startup cost)
+    import services.diagram_generator, services.deck_generator, services.proposal_harmonizer  # noqa: F401
+
+    transport = httpx.ASGITransport(app=main.app)
+    pptx_bytes = _build_test_pptx()
+    rfp_text = "Appel d'offres pour la maintenance applicative. " * 20
+
+    monitor = LoopLagMonitor()
+    monitor.start()
+    started = time.perf_counter()
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=60) as client:
+        requests = []
+        for _ in range(CONCURRENT_REQUESTS):
+            requests.append(client.post("/summarizeRfp", data={"rfpText": rfp_text}))
+            requests.append(client.post("/generateDiagramFromText", data={"description": "Frontend React, backend API, base PostgreSQL"}))
+            requests.append(client.post(
+                "/uniformizeProposal",
+                files={"file": ("proposition.pptx", pptx_bytes, "application/vnd.openxmlformats-officedocument.presentationml.presentation")}
+            ))
+            requests.append(client.get("/download/inexistant.pptx"))
+        responses = await asyncio.gather(*requests)
+
+    elapsed = time.perf_counter() - started
+    await monitor.stop()
+    await llm_client.close_ai_clients()
+    return responses, elapsed, monitor.max_lag
+
+
+def test_handlers_do_not_block_event_loop():
+    from services.common import llm_client
+
+    env = {
+        "AZURE_OPENAI_ENDPOINT": "https://fake.openai.azure.com",
+        "AZURE_OPENAI_KEY": "fake-key",
+        "AZURE_OPENAI_DEPLOYMENT": "fake-deployment"
+    }
+    previous_cwd = os.getcwd()
+    with mock.patch.dict(os.environ, env), \
+            mock.patch.object(llm_client, "_build_client", lambda provider: FakeAsyncClient()), \
+            tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            responses, elapsed, max_lag = asyncio.run(_run_concurrent_requests())
+        finally:
+            os.chdir(previous_cwd)
+
+    statuses = [response.status_code for response in responses]
+    assert all(status in (200, 404) for status in statuses), statuses
+
+    print(f"Max event loop lag: {max_lag * 1000:.1f} ms, total: {elapsed:.2f}s")
+    assert max_lag < MAX_LOOP_LAG, f"Event loop blocked for {max_lag:.3f}s (max {MAX_LOOP_LAG}s)"
+
+    # Concurrent model calls must overlap: sequential execution would take N * latency
+    ai_calls = 3 * CONCURRENT_REQUESTS
+    assert elapsed < ai_calls * FAKE_AI_LATENCY / 2, f"Requests were serialized ({elapsed:.2f}s)"
+
+
+if __name__ == "__main__":
+    test_handlers_do_not_block_event_loop()
+    print("[OK] No handler blocked the event loop")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test of the persistent extracted-text cache
+A document seen once is served from the cache (keyed by content hash and extractor version),
+and the cache stays under its size limit by evicting the least recently used entries
+
+Usage:
+    python -m pytest -q test_extraction_cache.py
+    python test_extraction_cache.py
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+
+def test_extracted_text_is_reused():
+    from services.rfp_summarizer import extraction_cache, file_extractor
+
+    data = b"Reglement de consultation\nDate limite : 15 mars\n"
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["EXTRACTION_CACHE_MAX_MB"] = "1"
+        os.environ["EXTRACTION_CACHE_PATH"] = os.path.join(directory, "extracted.sqlite3")
+        extraction_cache.reset_extraction_cache()
+        try:
+            with mock.patch.object(file_extractor, "extract_text_from_txt", wraps=file_extractor.extract_text_from_txt) as parse:
+                first = file_extractor.extract_text_from_file(data, "rc.txt")
+                # Same content under another name, hash supplied by the upload layer
+                second = file_extractor.extract_text_from_file(data, "copie.txt", hashlib.sha256(data).hexdigest())
+                assert first == second == "Reglement de consultation\nDate limite : 15 mars"
+                assert parse.call_count == 1
+
+                # A new extractor version ignores older entries
+                with mock.patch.object(file_extractor, "EXTRACTOR_VERSION", "test"):
+                    file_extractor.extract_text_from_file(data, "rc.txt")
+                assert parse.call_count == 2
+
+            # The preview used for intent detection goes through the same cache
+            from services.common.file_type_detector import get_content_preview
+            with mock.patch.object(file_extractor, "extract_text_from_txt", side_effect=AssertionError("parsed again")):
+                assert get_content_preview(data, max_chars=25, filename="rc.txt") == "Reglement de consultation"
+
+            stats = extraction_cache.get_extraction_cache().stats()
+            assert stats["hits"] == 2 and stats["entries"] == 2
+        finally:
+            extraction_cache.reset_extraction_cache()
+            os.environ.pop("EXTRACTION_CACHE_MAX_MB", None)
+            os.environ.pop("EXTRACTION_CACHE_PATH", None)
+
+
+def test_size_bounded_lru_eviction():
+    from services.rfp_summarizer.extraction_cache import ExtractionCache, _compress
+
+    texts = {name: os.urandom(500).hex() for name in ("a", "b", "c")}
+    max_bytes = int(len(_compress(texts["a"])[1]) * 2.5)  # Room for two entries, not three
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ExtractionCache(os.path.join(directory, "extracted.sqlite3"), max_bytes=max_bytes)
+        try:
+            cache.set("a", texts["a"])
+            cache.set("b", texts["b"])
+            assert cache.get("a") == texts["a"]  # "b" is now the least recently used
+            cache.set("c", texts["c"])
+
+            assert cache.get("b") is None
+            assert cache.get("a") == texts["a"] and cache.get("c") == texts["c"]
+            assert cache.stats()["size_bytes"] <= max_bytes
+        finally:
+            cache.close()
+
+
+if __name__ == "__main__":
+    test_extracted_text_is_reused()
+    test_size_bounded_lru_eviction()
+    print("[OK] Extracted text cached")
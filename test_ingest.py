@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test of the /ingest endpoint
+A file is uploaded, extracted and normalised once; the actions then receive its file_id
+instead of a new upload and must not parse it again. Ingested files expire per file_id,
+from their ingestion date, and a file_id whose original file is gone is unknown
+
+Usage:
+    python -m pytest -q test_ingest.py
+    python test_ingest.py
+"""
+
+import asyncio
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+import httpx
+
+RFP_TEXT = (
+    "Règlement de consultation\n"
+    "Marché public de tierce maintenance applicative.\n"
+    "Date limite de remise des offres : 15 mars.\n"
+    "Critères de sélection : valeur technique 60 %, prix 40 %.\n"
+    "Le soumissionnaire joint l'acte d'engagement signé.\n"
+)
+
+
+def _pptx_bytes() -> bytes:
+    from pptx import Presentation
+
+    buffer = io.BytesIO()
+    Presentation().save(buffer)
+    return buffer.getvalue()
+
+
+async def _run(directory: str):
+    import main
+    from services.common import ingested_files
+
+    summarized = []
+
+    async def fake_summarize(text):
+        summarized.append(text)
+        return {"identification_marche": {"objet_consultation": "TMA"}, "metadata": {"cache": "miss"}}
+
+    transport = httpx.ASGITransport(app=main.app)
+    with mock.patch.object(ingested_files, "INGEST_DIR", directory), \
+            mock.patch.object(main, "summarize_rfp_with_ai", fake_summarize):
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=30) as client:
+            ingested = (await client.post("/ingest", files={"file": ("consultation.txt", RFP_TEXT.encode("utf-8"))})).json()
+
+            with mock.patch.object(main, "extract_text_from_file", side_effect=AssertionError("parsed again")):
+                summary = await client.post("/summarizeRfp", data={"file_id": ingested["file_id"]})
+
+            deck = (await client.post("/ingest", files={"file": ("offre.pptx", _pptx_bytes())})).json()
+            diagram = await client.post("/generateDiagramFromText", data={"file_id": deck["file_id"]})
+            unknown = await client.post("/uniformizeProposal", data={"file_id": "0123456789ab"})
+            invalid = await client.post("/summarizeRfp", data={"file_id": "../../main"})
+
+    return ingested, summary, summarized, deck, diagram, unknown, invalid
+
+
+def test_ingested_file_is_reused_by_actions():
+    env = {"EXTRACTION_CACHE_MAX_MB": "0", "ROUTING_LOG_PATH": ""}
+    with mock.patch.dict(os.environ, env), tempfile.TemporaryDirectory() as directory:
+        ingested, summary, summarized, deck, diagram, unknown, invalid = asyncio.run(_run(directory))
+        stored = sorted(os.listdir(directory))
+
+    assert ingested["suggested_action"] == "summarize", ingested
+    assert ingested["filename"] == "consultation.txt" and ingested["size"] == len(RFP_TEXT.encode("utf-8"))
+    file_id = ingested["file_id"]
+    assert {f"{file_id}.txt", f"{file_id}.normalized.txt", f"{file_id}.json"} <= set(stored)
+
+    assert summary.status_code == 200, summary.text
+    assert summarized == [RFP_TEXT.strip()]
+
+    assert deck["suggested_action"] == "harmonize" and deck["text_length"] is None
+    assert diagram.status_code == 400
+    assert unknown.status_code == 404 and invalid.status_code == 404
+
+
+def test_cleanup_expires_ingested_files_together():
+    from cleanup_temp_files import cleanup_old_files
+    from services.common import ingested_files
+
+    with tempfile.TemporaryDirectory() as directory:
+        generated = os.path.join(directory, "generated_files")
+        ingest_dir = os.path.join(generated, "ingested")
+        with mock.patch.object(ingested_files, "INGEST_DIR", ingest_dir):
+            old = ingested_files.save_ingested_file(io.BytesIO(b"old"), "old.txt")
+            # Metadata rewritten today (as by a requested action): the file still expires from its ingestion date
+            ingested_files.update_ingested_file(old, text="old", created_at=time.time() - 48 * 3600)
+            fresh = ingested_files.save_ingested_file(io.BytesIO(b"fresh"), "fresh.txt")
+            orphan = os.path.join(ingest_dir, "0123456789ab.pdf")
+            Path(orphan).write_bytes(b"interrupted")
+            os.utime(orphan, (time.time() - 48 * 3600,) * 2)
+
+            result = cleanup_old_files(directory=generated, max_age_hours=24)
+            remaining = sorted(os.listdir(ingest_dir))
+
+            os.remove(ingested_files.load_ingested_file(fresh["file_id"])["path"])
+            missing = ingested_files.load_ingested_file(fresh["file_id"])
+            leftover = os.listdir(ingest_dir)
+
+    assert result["files_deleted"] == 4, result
+    assert remaining == [f"{fresh['file_id']}.json", f"{fresh['file_id']}.txt"], remaining
+    assert missing is None and leftover == []
+
+
+if __name__ == "__main__":
+    test_ingested_file_is_reused_by_actions()
+    test_cleanup_expires_ingested_files_together()
+    print("[OK] Ingested files reused by every action")
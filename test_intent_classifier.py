@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test of the local intent classifier (TF-IDF + logistic regression)
+The action chosen for an ingested file is logged once, the training CLI builds a model from
+the log and evaluates it on a held-out set, and the router uses that model instead of
+the LLM, in well under a millisecond per prediction
+
+Usage:
+    python -m pytest -q test_intent_classifier.py
+    python test_intent_classifier.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+import httpx
+
+NETWORK_TEMPLATES = [
+    "Topologie du site {index}: pare-feu, répartiteur de charge, machines virtuelles et sauvegarde.",
+    "Les machines virtuelles du cluster {index} passent par le pare-feu puis le répartiteur de charge.",
+]
+SALES_TEMPLATES = [
+    "Bilan commercial du trimestre {index}: chiffre d'affaires, nouveaux clients et objectifs de l'équipe.",
+    "Objectifs commerciaux {index}: fidélisation des clients, prospection et chiffre d'affaires.",
+]
+
+
+def _write_log(path: str, count: int = 30):
+    with open(path, "w", encoding="utf-8") as f:
+        for index in range(count):
+            for templates, action in ((NETWORK_TEMPLATES, "diagram"), (SALES_TEMPLATES, "deck")):
+                for template in templates:
+                    entry = {"content": template.format(index=index), "filename": None, "action": action, "tier": "user"}
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def test_training_cli_builds_a_fast_accurate_model():
+    import train_intent_classifier
+    from services.common.intent_classifier import (
+        IntentClassifier,
+        evaluate_intent_classifier,
+        load_routing_examples
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        log_path = os.path.join(directory, "routing_decisions.jsonl")
+        model_path = os.path.join(directory, "intent_classifier.json")
+        _write_log(log_path)
+        # The user's choice replaces an earlier label for the same content
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"content": NETWORK_TEMPLATES[0].format(index=0), "filename": None, "action": "deck", "tier": "user"}) + "\n")
+            # Rule decisions are not training examples
+            f.write(json.dumps({"content": "Règlement de consultation", "filename": None, "action": "summarize", "tier": "rules"}) + "\n")
+
+        examples = load_routing_examples(log_path)
+        assert len(examples) == 120
+        assert examples[-1]["action"] == "deck"
+
+        assert train_intent_classifier.main(["--log", log_path, "--output", model_path, "--holdout", "0.25"]) == 0
+        model = IntentClassifier.load(model_path)
+        report = evaluate_intent_classifier(model, examples[1:])
+
+        too_few = train_intent_classifier.main(["--log", log_path, "--output", model_path, "--min-examples", "500"])
+
+    assert model.classes == ["deck", "diagram"]
+    assert model.metadata["examples"] == 120
+    assert report["accuracy"] >= 0.95, report
+    assert report["latency_ms_mean"] < 1.0, report
+    assert too_few == 1
+
+
+async def _route_and_choose(directory: str):
+    import main
+    from services.common import file_type_detector, ingested_files
+
+    async def fail_llm(content, filename=None):
+        raise AssertionError("LLM called")
+
+    async def no_diagram(*args, **kwargs):
+        raise Exception("diagram not needed")
+
+    transport = httpx.ASGITransport(app=main.app)
+    with mock.patch.object(ingested_files, "INGEST_DIR", directory), \
+            mock.patch.object(file_type_detector, "analyze_content_with_ai", fail_llm), \
+            mock.patch("services.diagram_generator.generate_diagram_spec_with_ai", no_diagram):
+        routed = await file_type_detector.detect_content_intent(
+            text="Schéma cible: le répartiteur de charge répartit les machines virtuelles derrière le pare-feu."
+        )
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=30) as client:
+            ingested = (await client.post(
+                "/ingest", files={"file": ("notes.txt", "Notes de réunion sur le cluster et la sauvegarde.".encode("utf-8"))}
+            )).json()
+            # A client retry of the same action is not logged twice
+            for _ in range(2):
+                await client.post("/generateDiagramFromText", data={"file_id": ingested["file_id"]})
+            metrics = (await client.get("/metrics/routing")).json()
+
+    return routed, ingested, metrics
+
+
+def test_router_uses_the_trained_model_and_logs_user_choices():
+    from services.common import intent_router
+    from services.common.intent_classifier import IntentClassifier, load_routing_examples, train_intent_classifier
+
+    with tempfile.TemporaryDirectory() as directory:
+        log_path = os.path.join(directory, "routing_decisions.jsonl")
+        model_path = os.path.join(directory, "intent_classifier.json")
+        training_log = os.path.join(directory, "training.jsonl")
+        _write_log(training_log)
+        train_intent_classifier(load_routing_examples(training_log)).save(model_path)
+
+        env = {
+            "ROUTING_LOG_PATH": log_path,
+            "INTENT_MODEL_PATH": model_path,
+            "ROUTER_USE_LLM": "0",
+            "EXTRACTION_CACHE_MAX_MB": "0"
+        }
+        with mock.patch.dict(os.environ, env):
+            routed, ingested, metrics = asyncio.run(_route_and_choose(os.path.join(directory, "ingested")))
+        logged = [json.loads(line) for line in Path(log_path).read_text(encoding="utf-8").splitlines()]
+
+    assert routed["routing_tier"] == "local" and routed["suggested_action"] == "diagram", routed
+    assert metrics["local_classifier"]["model"] == "tfidf_logistic"
+
+    choices = [entry for entry in logged if entry["tier"] == "user"]
+    assert len(choices) == 1
+    assert choices[0]["action"] == "diagram" and choices[0]["filename"] == "notes.txt"
+    assert choices[0]["file_id"] == ingested["file_id"]
+    assert choices[0]["suggested_action"] == ingested["suggested_action"]
+
+
+if __name__ == "__main__":
+    test_training_cli_builds_a_fast_accurate_model()
+    test_router_uses_the_trained_model_and_logs_user_choices()
+    print("[OK] Local intent classifier trained offline, used by the router and fed by user choices")
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test of the tiered intent router
+Decisive rules answer without the model, a repeated content is served from the routing
+cache, and once enough LLM or user decisions are logged the local classifier replaces the
+LLM call; rule decisions are never used as training examples. Each naive Bayes retrain
+changes the routing cache version, so cached decisions of an older model are not reused
+
+Usage:
+    python -m pytest -q test_intent_router.py
+    python test_intent_router.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+RFP_TEXT = (
+    "Règlement de consultation du marché public de maintenance. Le soumissionnaire "
+    "remet l'acte d'engagement avant la date limite de remise des offres."
+)
+
+AMBIGUOUS_TEXT = "Notre topologie réseau: pare-feu en frontal, répartiteur de charge et machines virtuelles."
+
+NETWORK_EXAMPLES = [
+    "Topologie du site {index}: pare-feu, répartiteur de charge, machines virtuelles et sauvegarde.",
+    "Les machines virtuelles du cluster {index} passent par le pare-feu puis le répartiteur de charge.",
+]
+SALES_EXAMPLES = [
+    "Bilan commercial du trimestre {index}: chiffre d'affaires, nouveaux clients et objectifs de l'équipe.",
+    "Objectifs commerciaux {index}: fidélisation des clients, prospection et chiffre d'affaires.",
+]
+
+
+def _write_examples(path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        for index in range(15):
+            for template in NETWORK_EXAMPLES:
+                entry = {"content": template.format(index=index), "action": "diagram", "tier": "llm"}
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            for template in SALES_EXAMPLES:
+                entry = {"content": template.format(index=index), "action": "deck", "tier": "user"}
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            # Rule decisions from older logs are ignored by the local classifier
+            for template in NETWORK_EXAMPLES:
+                entry = {"content": template.format(index=index), "action": "summarize", "tier": "rules"}
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+async def _route_all(log_path: str):
+    from services.common import file_type_detector, intent_router
+
+    llm_calls = []
+
+    async def fake_llm(content, filename=None):
+        llm_calls.append(content)
+        return {"suggested_action": "diagram", "confidence": 0.9, "reason": "architecture"}
+
+    with mock.patch.object(file_type_detector, "analyze_content_with_ai", fake_llm):
+        rules = await file_type_detector.detect_content_intent(text=RFP_TEXT)
+        logged_by_rules = Path(log_path).exists()
+
+        llm = await file_type_detector.detect_content_intent(text=AMBIGUOUS_TEXT)
+        cached = await file_type_detector.detect_content_intent(text=AMBIGUOUS_TEXT)
+
+        _write_examples(log_path)
+        intent_router.reset_local_router()
+        local = await file_type_detector.detect_content_intent(
+            text="Schéma cible: le répartiteur de charge répartit les machines virtuelles derrière le pare-feu."
+        )
+
+    return rules, logged_by_rules, llm, cached, local, llm_calls, intent_router.get_routing_metrics()
+
+
+def test_router_skips_the_model_when_cheaper_tiers_decide():
+    from services.common import intent_router
+
+    with tempfile.TemporaryDirectory() as directory:
+        log_path = os.path.join(directory, "routing_decisions.jsonl")
+        env = {"ROUTING_LOG_PATH": log_path, "ROUTER_MIN_TRAINING_EXAMPLES": "50"}
+        with mock.patch.dict(os.environ, env), mock.patch.object(intent_router, "_tier_counts", intent_router.Counter()):
+            intent_router.reset_local_router()
+            rules, logged_by_rules, llm, cached, local, llm_calls, metrics = asyncio.run(_route_all(log_path))
+            intent_router.reset_local_router()
+
+    assert rules["routing_tier"] == "rules" and rules["suggested_action"] == "summarize"
+    assert not logged_by_rules
+
+    assert llm["routing_tier"] == "llm" and llm["suggested_action"] == "diagram"
+    assert cached["routing_tier"] == "cache" and cached["suggested_action"] == "diagram"
+
+    assert local["routing_tier"] == "local" and local["suggested_action"] == "diagram", local
+    assert len(llm_calls) == 1
+
+    assert metrics["tiers"] == {"cache": 1, "rules": 1, "local": 1, "llm": 1, "fallback": 0}
+    assert metrics["llm_call_rate"] == 0.25
+    assert metrics["local_classifier"]["examples"] == 60
+    assert set(metrics["local_classifier"]["classes"]) == {"diagram", "deck"}
+
+
+def test_naive_bayes_retrain_changes_the_cache_version():
+    from services.common import intent_router
+
+    with tempfile.TemporaryDirectory() as directory:
+        log_path = os.path.join(directory, "routing_decisions.jsonl")
+        _write_examples(log_path)
+        env = {
+            "ROUTING_LOG_PATH": log_path,
+            "INTENT_MODEL_PATH": os.path.join(directory, "missing.json"),
+            "ROUTER_RETRAIN_EVERY": "1"
+        }
+        with mock.patch.dict(os.environ, env):
+            intent_router.reset_local_router()
+            intent_router.get_local_router()
+            first = intent_router.routing_cache_version()
+            assert intent_router.routing_cache_version() == first
+
+            # Same log, new training: a new generation
+            intent_router.reset_local_router()
+            intent_router.get_local_router()
+            retrained = intent_router.routing_cache_version()
+
+            intent_router.log_routing_decision(AMBIGUOUS_TEXT, None, "diagram", "user", 1.0)
+            intent_router.get_local_router()
+            after_new_decision = intent_router.routing_cache_version()
+            intent_router.reset_local_router()
+
+    assert len({first, retrained, after_new_decision}) == 3
+    assert after_new_decision.endswith("-61"), after_new_decision
+
+
+if __name__ == "__main__":
+    test_router_skips_the_model_when_cheaper_tiers_decide()
+    test_naive_bayes_retrain_changes_the_cache_version()
+    print("[OK] Routing decided by rules, cache and local classifier before the model")
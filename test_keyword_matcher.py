@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test of the compiled keyword matcher used by rule-based routing
+Every category is counted in one pass, on whole words only (plurals and typographic
+apostrophes included), and keywords nested in a longer one are still counted
+
+Usage:
+    python -m pytest -q test_keyword_matcher.py
+    python test_keyword_matcher.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+RFP_TEXT = (
+    "RÈGLEMENT DE CONSULTATION – Marché Public de tierce maintenance applicative.\n"
+    "Le soumissionnaire joint l’acte d’engagement (DC1, DC2) avant la date limite de remise.\n"
+    "Lot n°2 : pénalités et clauses de réversibilité.\n"
+)
+
+
+def test_keywords_are_counted_in_one_pass():
+    from services.common.keyword_matcher import KeywordMatcher
+
+    matcher = KeywordMatcher({
+        "rfp": ["marché", "marché public", "clause", "lot 1", "ao", "appel d'offres"],
+        "technical": ["api", "réseau", "base de données"]
+    })
+
+    found = matcher.matches(
+        "Le Marché Public (appel d’offres) comporte des clauses; le lot 10 couvre les réseaux et la base  de\ndonnées."
+    )
+    assert found["rfp"] == {"marché", "marché public", "clause", "appel d'offres"}
+    assert found["technical"] == {"réseau", "base de données"}
+
+    # Substrings of longer words are no longer false positives
+    assert matcher.count("Le cacao, une interface rapide et le chaos.") == {"rfp": 0, "technical": 0}
+    assert matcher.count("AO 2024: API") == {"rfp": 1, "technical": 1}
+    assert matcher.count("") == {"rfp": 0, "technical": 0}
+
+
+def test_routing_uses_keyword_counts():
+    from services.common.file_type_detector import count_keywords, detect_content_intent, detect_file_purpose
+
+    counts = count_keywords(RFP_TEXT)
+    assert counts["rfp"] == 10, counts
+
+    with mock.patch.dict(os.environ, {"ROUTING_LOG_PATH": ""}):
+        detection = asyncio.run(detect_content_intent(text=RFP_TEXT, use_ai=False))
+    assert detection["suggested_action"] == "summarize" and detection["rfp_score"] == 10
+
+    assert detect_file_purpose("AppelOffres_2024.pdf")["suggested_action"] == "summarize"
+    assert detect_file_purpose("DCE2024.docx")["suggested_action"] == "summarize"
+    assert detect_file_purpose("chaos.pdf")["suggested_action"] == "deck"
+
+
+if __name__ == "__main__":
+    from services.common.file_type_detector import count_keywords
+
+    test_keywords_are_counted_in_one_pass()
+    test_routing_uses_keyword_counts()
+
+    for size in (2000, 200_000):
+        text = (RFP_TEXT * (size // len(RFP_TEXT) + 1))[:size]
+        started = time.perf_counter()
+        count_keywords(text)
+        print(f"   {size} chars: {(time.perf_counter() - started) * 1000:.2f} ms")
+    print("[OK] Keywords counted in one pass on whole words")
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test of the shared AI client lifecycle
+A client is bound to the event loop that created it: it must be closed on that loop,
+whether the loop stops (asyncio.run) or a newer loop replaces it while still running
+
+Usage:
+    python -m pytest -q test_llm_client.py
+    python test_llm_client.py
+"""
+
+import asyncio
+import os
+import sys
+import threading
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+
+class RecordingClient:
+    def __init__(self):
+        self.closed_on = None
+
+    async def close(self):
+        self.closed_on = asyncio.get_running_loop()
+
+
+async def _get_client():
+    from services.common import llm_client
+
+    client, _ = llm_client.get_async_ai_client()
+    return client, asyncio.get_running_loop()
+
+
+def test_clients_are_closed_on_their_own_loop():
+    from services.common import llm_client
+
+    with mock.patch.dict(os.environ, {"OPENAI_API_KEY": "sk-test"}), \
+            mock.patch.object(llm_client, "_build_client", lambda provider: RecordingClient()), \
+            mock.patch.object(llm_client, "_async_clients", {}):
+        # The loop stops: asyncio.run cancels the guard task, which closes the client
+        stopped_client, stopped_loop = asyncio.run(_get_client())
+
+        # A loop still running in another thread is replaced: the client is closed there
+        background = asyncio.new_event_loop()
+        thread = threading.Thread(target=background.run_forever)
+        thread.start()
+        running_client, _ = asyncio.run_coroutine_threadsafe(_get_client(), background).result()
+        replacing_client, _ = asyncio.run(_get_client())
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0.05), background).result()
+        running_closed_on = running_client.closed_on
+        background.call_soon_threadsafe(background.stop)
+        thread.join()
+        background.close()
+
+    assert stopped_client.closed_on is stopped_loop
+    assert running_closed_on is background
+    assert replacing_client is not running_client and replacing_client.closed_on is not None
+
+
+if __name__ == "__main__":
+    test_clients_are_closed_on_their_own_loop()
+    print("[OK] Replaced AI clients closed on their own event loop")
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test of the LLM request scheduler under burst load
+A fake deployment enforces an RPM quota and answers 429 with Retry-After when it is exceeded:
+every request must succeed, in arrival order, with the deployment paused on 429.
+Exhausted 429 retries must raise LLMRateLimitedError (503 with Retry-After from the API)
+and must not use up the transient-error retry budget
+
+Usage:
+    python -m pytest -q test_llm_scheduler.py
+    python test_llm_scheduler.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+import httpx
+from openai import APIConnectionError, RateLimitError
+
+RPM_LIMIT = 600          # Quota of the fake deployment (10 requests / second)
+BURST_SIZE = 30          # Concurrent requests launched at once
+FAKE_AI_LATENCY = 0.05   # Simulated model call duration (seconds)
+
+
+class FakeDeployment:
+    """Deployment answering 429 (Retry-After: 0.2s) when more than 5 calls start within 0.5s"""
+
+    def __init__(self):
+        self.starts = []
+        self.rejected = 0
+        self.served = []
+
+    async def create(self, messages, **kwargs):
+        now = time.monotonic()
+        if len([start for start in self.starts if now - start < 0.5]) >= 5:
+            self.rejected += 1
+            response = httpx.Response(429, headers={"retry-after": "0.2"}, request=httpx.Request("POST", "https://fake"))
+            raise RateLimitError("Rate limit exceeded", response=response, body=None)
+        self.starts.append(now)
+        await asyncio.sleep(FAKE_AI_LATENCY)
+        self.served.append(messages[0]["content"])
+        usage = SimpleNamespace(total_tokens=50)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="{}"))], usage=usage)
+
+
+async def _run_burst(scheduler, deployment):
+    calls = [
+        scheduler.run(lambda index=index: deployment.create([{"role": "user", "content": str(index)}]), 100)
+        for index in range(BURST_SIZE)
+    ]
+    started = time.monotonic()
+    results = await asyncio.gather(*calls, return_exceptions=True)
+    return results, time.monotonic() - started
+
+
+def test_scheduler_saturates_quota_without_failures():
+    from services.common.llm_scheduler import DeploymentScheduler
+
+    # Quota configured above the real one: the scheduler must rely on 429 + Retry-After
+    scheduler = DeploymentScheduler("fake", rpm_limit=RPM_LIMIT, tpm_limit=0, max_retries=2, rate_limit_retries=20)
+    deployment = FakeDeployment()
+    results, elapsed = asyncio.run(_run_burst(scheduler, deployment))
+
+    failures = [result for result in results if isinstance(result, BaseException)]
+    assert not failures, failures
+    assert deployment.rejected > 0
+
+    metrics = scheduler.metrics()
+    print(f"Burst of {BURST_SIZE}: {elapsed:.2f}s, 429 received: {metrics['rate_limited_total']}, "
+          f"wait p95: {metrics['wait_ms']['p95']} ms")
+    assert metrics["rate_limited_total"] == deployment.rejected
+    assert metrics["requests_total"] == BURST_SIZE
+    assert metrics["queue_depth"] == 0 and metrics["in_flight"] == 0
+    assert metrics["tokens"]["used_total"] == 50 * BURST_SIZE
+
+
+def test_scheduler_paces_requests_to_rpm_quota():
+    from services.common.llm_scheduler import DeploymentScheduler
+
+    # 120 RPM with an empty bucket: 2 requests / second, 4 requests take ~2s
+    scheduler = DeploymentScheduler("paced", rpm_limit=120, tpm_limit=0, max_retries=0, rate_limit_retries=0)
+    scheduler.request_bucket.tokens = 0
+
+    async def burst():
+        order = []
+
+        async def call(index):
+            order.append(index)
+            return SimpleNamespace(usage=None)
+
+        started = time.monotonic()
+        await asyncio.gather(*(scheduler.run(lambda index=index: call(index), 10) for index in range(4)))
+        return order, time.monotonic() - started
+
+    order, elapsed = asyncio.run(burst())
+    assert order == [0, 1, 2, 3], order  # Fair FIFO admission
+    assert 1.8 <= elapsed < 3.0, elapsed
+
+
+def _rate_limit_error(retry_after: str) -> RateLimitError:
+    response = httpx.Response(429, headers={"retry-after": retry_after}, request=httpx.Request("POST", "https://fake"))
+    return RateLimitError("Rate limit exceeded", response=response, body=None)
+
+
+def test_exhausted_rate_limit_raises_typed_error():
+    from services.common.llm_scheduler import DeploymentScheduler, LLMRateLimitedError
+
+    scheduler = DeploymentScheduler("saturated", rpm_limit=0, tpm_limit=0, max_retries=3, rate_limit_retries=0)
+
+    async def saturated():
+        raise _rate_limit_error("7")
+
+    try:
+        asyncio.run(scheduler.run(saturated, 10))
+    except LLMRateLimitedError as e:
+        assert e.retry_after == 7
+    else:
+        raise AssertionError("LLMRateLimitedError expected")
+
+
+def test_rate_limits_do_not_use_transient_retries():
+    from services.common.llm_scheduler import DeploymentScheduler
+
+    # Two 429 then one connection error: the single transient retry is still available
+    scheduler = DeploymentScheduler("mixed", rpm_limit=0, tpm_limit=0, max_retries=1, rate_limit_retries=2)
+    errors = [_rate_limit_error("0.01"), _rate_limit_error("0.01"), APIConnectionError(request=httpx.Request("POST", "https://fake"))]
+
+    async def flaky():
+        if errors:
+            raise errors.pop(0)
+        return SimpleNamespace(usage=None)
+
+    with mock.patch("random.random", return_value=0.0):
+        asyncio.run(scheduler.run(flaky, 10))
+    assert scheduler.retries_total == 3 and scheduler.failures_total == 0
+
+
+async def _summarize_while_rate_limited():
+    import main
+    from services.common.llm_scheduler import LLMRateLimitedError
+    from services.rfp_summarizer import ai_summarizer
+
+    async def rate_limited(messages, **params):
+        try:
+            raise LLMRateLimitedError(12.3)
+        except LLMRateLimitedError as e:
+            # Services wrap errors the same way
+            raise Exception(f"Échec de l'appel IA: {e}")
+
+    transport = httpx.ASGITransport(app=main.app)
+    with mock.patch.object(ai_summarizer, "create_chat_completion", rate_limited):
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/summarizeRfp", data={"rfpText": "Marché de maintenance applicative. " * 20})
+
+
+def test_api_answers_503_with_retry_after():
+    from services.common import result_cache
+
+    with mock.patch.dict(os.environ, {"AZURE_OPENAI_DEPLOYMENT": "gpt-4o"}), \
+            mock.patch.object(result_cache, "_backend", result_cache.MemoryCacheBackend(10)), \
+            mock.patch.object(result_cache, "_backend_initialized", True), \
+            mock.patch.object(result_cache, "_caches", {}):
+        response = asyncio.run(_summarize_while_rate_limited())
+
+    assert response.status_code == 503, response.text
+    assert response.headers["retry-after"] == "13"
+
+
+if __name__ == "__main__":
+    test_scheduler_saturates_quota_without_failures()
+    test_scheduler_paces_requests_to_rpm_quota()
+    test_exhausted_rate_limit_raises_typed_error()
+    test_rate_limits_do_not_use_transient_retries()
+    test_api_answers_503_with_retry_after()
+    print("[OK] Scheduler honours quotas and Retry-After, 503 once retries are exhausted")
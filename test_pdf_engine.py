@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test of the page-parallel PDF extraction engine
+Parallel extraction must return exactly the serial text, in page order, with one timing per page,
+including concurrent extractions with different worker counts; an in-memory upload is written
+once to a temporary file shared by the workers instead of being sent with every page range
+
+Usage:
+    python -m pytest -q test_pdf_engine.py
+    python test_pdf_engine.py
+"""
+
+import io
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmark_pdf_extraction import legacy_extract, make_text_pdf
+
+
+def test_parallel_extraction_matches_serial():
+    from services.rfp_summarizer.pdf_engine import extract_pdf, shutdown_pdf_workers
+
+    try:
+        with mock.patch.dict(os.environ, {"PDF_PARALLEL_MIN_PAGES": "10"}), tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "dce.pdf")
+            make_text_pdf(path, 25, lines_per_page=5)
+
+            serial = extract_pdf(path, backend="pypdf2", workers=1)
+            parallel = extract_pdf(path, backend="pypdf2", workers=3)
+            legacy = legacy_extract(path)
+    finally:
+        shutdown_pdf_workers()
+
+    assert serial["workers"] == 1 and parallel["workers"] == 3
+    assert parallel["text"] == serial["text"]
+    # Same text as before, pages now separated by a form feed
+    assert parallel["text"].count("\f") == 24 and parallel["text"].replace("\f", "\n") == legacy
+    assert parallel["page_count"] == 25 and len(parallel["page_timings_ms"]) == 25
+    positions = [parallel["text"].index(f"Page {page} - Article 1:") for page in range(1, 26)]
+    assert positions == sorted(positions)
+
+
+def test_concurrent_extractions_with_different_worker_counts():
+    from services.rfp_summarizer import pdf_engine
+
+    try:
+        with mock.patch.dict(os.environ, {"PDF_PARALLEL_MIN_PAGES": "10"}), tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "dce.pdf")
+            make_text_pdf(path, 40, lines_per_page=5)
+
+            serial = pdf_engine.extract_pdf(path, backend="pypdf2", workers=1)
+            # A request using another pool size must not shut down the pool of a running extraction
+            with ThreadPoolExecutor(max_workers=2) as threads:
+                results = list(threads.map(
+                    lambda workers: pdf_engine.extract_pdf(path, backend="pypdf2", workers=workers), [2, 3]
+                ))
+            pool_sizes = sorted(pdf_engine._executors)
+    finally:
+        pdf_engine.shutdown_pdf_workers()
+
+    assert [result["workers"] for result in results] == [2, 3]
+    assert all(result["text"] == serial["text"] for result in results)
+    assert pool_sizes == [2, 3] and not pdf_engine._executors
+    assert pdf_engine.DEFAULT_WORKERS <= 4
+
+
+def test_in_memory_upload_is_shared_through_one_temporary_file():
+    from services.rfp_summarizer import document_source, pdf_engine
+
+    created = []
+    named_temporary_file = document_source.tempfile.NamedTemporaryFile
+
+    def tracking_temporary_file(*args, **kwargs):
+        temporary = named_temporary_file(*args, **kwargs)
+        created.append(temporary.name)
+        return temporary
+
+    submitted = []
+    original_get_executor = pdf_engine._get_executor
+
+    def tracking_get_executor(workers):
+        executor = original_get_executor(workers)
+        submit = executor.submit
+
+        def tracking_submit(function, backend_name, source, start, end):
+            submitted.append(source)
+            return submit(function, backend_name, source, start, end)
+
+        return mock.Mock(submit=tracking_submit)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "dce.pdf")
+        make_text_pdf(path, 25, lines_per_page=5)
+        content = Path(path).read_bytes()
+        serial = pdf_engine.extract_pdf(path, backend="pypdf2", workers=1)
+
+    env = {"PDF_PARALLEL_MIN_PAGES": "10"}
+    try:
+        with mock.patch.dict(os.environ, env), \
+                mock.patch.object(document_source.tempfile, "NamedTemporaryFile", tracking_temporary_file), \
+                mock.patch.object(pdf_engine, "_get_executor", tracking_get_executor):
+            parallel = pdf_engine.extract_pdf(io.BytesIO(content), backend="pypdf2", workers=2)
+    finally:
+        pdf_engine.shutdown_pdf_workers()
+
+    assert parallel["workers"] == 2 and parallel["text"] == serial["text"]
+    # One temporary file, passed by path to every range, removed afterwards
+    assert len(created) == 1 and len(submitted) > 1
+    assert set(submitted) == set(created) and not os.path.exists(created[0])
+
+
+def test_backend_is_pluggable():
+    from services.rfp_summarizer import pdf_engine
+
+    class UpperBackend(pdf_engine.PyPDF2Backend):
+        name = "upper"
+
+        def extract_page(self, document, index):
+            return super().extract_page(document, index).upper()
+
+    pdf_engine.register_pdf_backend(UpperBackend, preferred=True)
+    try:
+        assert pdf_engine.get_pdf_backend().name == "upper"
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "dce.pdf")
+            make_text_pdf(path, 2, lines_per_page=1)
+            result = pdf_engine.extract_pdf(path, workers=1)
+        assert result["backend"] == "upper" and "LE TITULAIRE" in result["text"]
+    finally:
+        del pdf_engine.PDF_BACKENDS["upper"]
+
+
+if __name__ == "__main__":
+    test_parallel_extraction_matches_serial()
+    test_concurrent_extractions_with_different_worker_counts()
+    test_in_memory_upload_is_shared_through_one_temporary_file()
+    test_backend_is_pluggable()
+    print("[OK] PDF extraction engine")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test of the background PPTX pre-render started while the user reviews the deck plan
+The confirm step must get the ready file without rebuilding it, and unconfirmed
+pre-renders must be evicted with their file
+
+Usage:
+    python -m pytest -q test_pptx_prerender.py
+    python test_pptx_prerender.py
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+SLIDES_DATA = {
+    "title": "Offre TMA",
+    "slides": [{"type": "title", "title": "Offre TMA"}]
+    + [{"type": "content", "title": f"Partie {i}", "bullets": ["Audit", "Plan", "Suivi"]} for i in range(20)]
+    + [{"type": "conclusion", "title": "Merci", "bullets": ["Questions ?"]}]
+}
+
+
+async def _run(directory):
+    from services.deck_generator import pptx_prerender
+    from services.deck_generator.html_to_pptx_converter import structure_from_slides_data
+
+    structure = structure_from_slides_data(SLIDES_DATA)
+
+    # Confirmed after the build: the file is returned at once
+    assert pptx_prerender.start_pptx_prerender("deck1", structure)
+    await asyncio.sleep(0)
+    await asyncio.wait_for(asyncio.shield(pptx_prerender._jobs["deck1"]["task"]), 30)
+    started = time.perf_counter()
+    filename = await pptx_prerender.take_prerendered_pptx("deck1")
+    take_ms = (time.perf_counter() - started) * 1000
+    assert filename and os.path.exists(os.path.join(directory, filename))
+    assert await pptx_prerender.take_prerendered_pptx("deck1") is None
+
+    # Confirmed during the build: waits for the remaining build time only
+    pptx_prerender.start_pptx_prerender("deck2", structure)
+    assert await pptx_prerender.take_prerendered_pptx("deck2")
+
+    # Never confirmed: evicted after the TTL, file removed
+    with mock.patch.dict(os.environ, {"DECK_PRERENDER_TTL": "0.2"}):
+        pptx_prerender.start_pptx_prerender("deck3", structure)
+    await asyncio.sleep(0)
+    evicted_file = pptx_prerender._jobs["deck3"]["filename"]
+    await asyncio.sleep(0.3)
+    assert "deck3" not in pptx_prerender._jobs
+    for _ in range(300):
+        if not os.path.exists(os.path.join(directory, evicted_file)):
+            break
+        await asyncio.sleep(0.05)
+    assert not os.path.exists(os.path.join(directory, evicted_file))
+    assert await pptx_prerender.take_prerendered_pptx("deck3") is None
+
+    return take_ms
+
+
+def test_prerendered_pptx_is_ready_at_confirmation():
+    from services.deck_generator import pptx_prerender
+
+    with tempfile.TemporaryDirectory() as directory, mock.patch.object(pptx_prerender, "OUTPUT_DIR", directory):
+        take_ms = asyncio.run(_run(directory))
+
+        print(f"Confirm after pre-render: {take_ms:.1f} ms")
+        assert take_ms < 50
+        assert len(os.listdir(directory)) == 2
+
+
+if __name__ == "__main__":
+    test_prerendered_pptx_is_ready_at_confirmation()
+    print("[OK] PPTX pre-rendered in the background")
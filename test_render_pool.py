@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test of the PowerPoint rendering process pool
+Builders run in pre-warmed worker processes; a stuck or memory-hungry job is
+stopped without taking the pool down for the following renders. Time spent waiting in
+the queue does not count against the render timeout, and a job stuck in native code
+only kills its own process: the renders broken with it are retried on a new pool
+
+Usage:
+    python -m pytest -q test_render_pool.py
+    python test_render_pool.py
+"""
+
+import asyncio
+import os
+import signal
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+
+def slow_builder(payload, output_path):
+    time.sleep(payload["seconds"])
+    Path(output_path).write_text("slow", encoding="utf-8")
+    return output_path
+
+
+def native_stuck_builder(payload, output_path):
+    # Native code does not run the Python SIGALRM handler: simulated by blocking the signal
+    signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGALRM})
+    time.sleep(payload["seconds"])
+    return output_path
+
+
+def greedy_builder(payload, output_path):
+    blocks = [bytearray(64 * 1024 * 1024) for _ in range(payload["blocks"])]
+    return len(blocks)
+
+
+async def _run(directory):
+    from services.common import process_pool
+    from services.deck_generator.html_to_pptx_converter import structure_from_slides_data, structure_to_editable_pptx
+
+    await process_pool.warm_render_pool()
+
+    structure = structure_from_slides_data({"title": "Offre", "slides": [
+        {"type": "title", "title": "Offre"},
+        {"type": "content", "title": "Approche", "bullets": ["Audit", "Plan"]}
+    ]})
+    deck_path = await process_pool.render_pptx(structure_to_editable_pptx, structure, os.path.join(directory, "deck.pptx"))
+    assert os.path.getsize(deck_path) > 0
+
+    # Stuck job: stopped by the worker timer
+    started = time.perf_counter()
+    try:
+        await process_pool.render_pptx(slow_builder, {"seconds": 30}, os.path.join(directory, "slow.pptx"), timeout=1)
+        raise AssertionError("Timeout not enforced")
+    except TimeoutError:
+        pass
+    assert time.perf_counter() - started < 3
+
+    # Memory hog: refused by the worker memory limit
+    try:
+        await process_pool.render_pptx(greedy_builder, {"blocks": 64}, os.path.join(directory, "greedy.pptx"))
+        raise AssertionError("Memory limit not enforced")
+    except Exception as e:
+        assert "mémoire" in str(e), e
+
+    # The pool keeps serving after both failures
+    path = await process_pool.render_pptx(slow_builder, {"seconds": 0}, os.path.join(directory, "ok.pptx"))
+    assert Path(path).read_text(encoding="utf-8") == "slow"
+
+    process_pool.shutdown_render_pool()
+
+
+def test_render_pool_enforces_limits():
+    env = {"RENDER_POOL_WORKERS": "2", "RENDER_MEMORY_LIMIT_MB": "1024"}
+    with mock.patch.dict(os.environ, env), tempfile.TemporaryDirectory() as directory:
+        asyncio.run(_run(directory))
+
+
+async def _run_queue_and_stuck_job(directory):
+    from services.common import process_pool
+
+    await process_pool.warm_render_pool()
+
+    # Three 0.8s renders on two processes: the third waits in the queue longer than timeout + grace
+    queued = await asyncio.gather(*[
+        process_pool.render_pptx(slow_builder, {"seconds": 0.8}, os.path.join(directory, f"queued{index}.pptx"), timeout=1)
+        for index in range(3)
+    ])
+
+    # A render stuck in native code is killed; the render sharing its pool is retried on a new pool
+    results = await asyncio.gather(
+        process_pool.render_pptx(native_stuck_builder, {"seconds": 30}, os.path.join(directory, "stuck.pptx"), timeout=0.5),
+        process_pool.render_pptx(slow_builder, {"seconds": 1.5}, os.path.join(directory, "neighbour.pptx"), timeout=5),
+        return_exceptions=True
+    )
+    process_pool.shutdown_render_pool()
+    return queued, results
+
+
+def test_queue_wait_and_native_stuck_job():
+    env = {"RENDER_POOL_WORKERS": "2", "RENDER_MEMORY_LIMIT_MB": "1024"}
+    with mock.patch.dict(os.environ, env), \
+            mock.patch("services.common.process_pool.TIMEOUT_GRACE", 0.2), \
+            tempfile.TemporaryDirectory() as directory:
+        queued, (stuck, neighbour) = asyncio.run(_run_queue_and_stuck_job(directory))
+
+    assert len(queued) == 3
+    assert isinstance(stuck, TimeoutError), stuck
+    assert neighbour.endswith("neighbour.pptx"), neighbour
+
+
+if __name__ == "__main__":
+    test_render_pool_enforces_limits()
+    test_queue_wait_and_native_stuck_job()
+    print("[OK] Render pool limits enforced")
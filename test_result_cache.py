@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test of the content-addressed result cache
+Memory and sqlite backends must expire entries after their TTL and evict the least
+recently used ones, keys must change with the prompt version, and summarize_rfp_with_ai
+must serve a re-uploaded document from the cache (hit / miss / bypass metadata)
+
+Usage:
+    python -m pytest -q test_result_cache.py
+    python test_result_cache.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+RFP_TEXT = "Règlement de consultation: marché de tierce maintenance applicative, remise des offres le 15 mars."
+
+FAKE_SUMMARY = {"identification_marche": {"objet_consultation": "TMA"}, "points_attention": []}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+def _check_backend(backend, clock):
+    backend.set("a", "1", 10)
+    backend.set("b", "2", None)
+    assert backend.get("a") == "1" and backend.get("b") == "2"
+
+    # TTL: the entry without expiry survives
+    clock.now += 11
+    assert backend.get("a") is None
+    assert backend.get("b") == "2"
+
+    # LRU: reading "b" keeps it, "c" is the least recently used when "e" arrives
+    clock.now += 1
+    backend.set("c", "3", None)
+    clock.now += 1
+    backend.set("d", "4", None)
+    clock.now += 1
+    assert backend.get("b") == "2"
+    clock.now += 1
+    backend.set("e", "5", None)
+    assert backend.get("c") is None
+    assert [backend.get(key) for key in ("b", "d", "e")] == ["2", "4", "5"]
+    assert backend.count() == 3
+
+
+def test_backends_expire_and_evict():
+    from services.common import result_cache
+
+    clock = FakeClock()
+    with mock.patch.object(result_cache, "time", clock), tempfile.TemporaryDirectory() as directory:
+        _check_backend(result_cache.MemoryCacheBackend(3), clock)
+        sqlite_backend = result_cache.SQLiteCacheBackend(os.path.join(directory, "cache.sqlite3"), 3)
+        _check_backend(sqlite_backend, clock)
+        sqlite_backend._conn.close()
+
+
+def test_keys_are_versioned_by_prompt_and_model():
+    from services.common.result_cache import ResultCache
+
+    cache = ResultCache(None, "rfp_summary", 60)
+    key = cache.make_key("2025.2", "gpt-4o", RFP_TEXT)
+    assert key.startswith("rfp_summary:")
+    assert key == cache.make_key("2025.2", "gpt-4o", RFP_TEXT)
+    assert key != cache.make_key("2025.3", "gpt-4o", RFP_TEXT)
+    assert key != cache.make_key("2025.2", "gpt-4o-mini", RFP_TEXT)
+    # Part boundaries are kept: ("ab", "c") and ("a", "bc") differ
+    assert cache.make_key("ab", "c") != cache.make_key("a", "bc")
+
+
+async def _summarize_three_times():
+    from services.rfp_summarizer import ai_summarizer
+
+    calls = []
+
+    async def fake_completion(messages, **params):
+        calls.append(messages)
+        message = SimpleNamespace(content=json.dumps(FAKE_SUMMARY))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    with mock.patch.object(ai_summarizer, "create_chat_completion", fake_completion):
+        first = await ai_summarizer.summarize_rfp_with_ai(RFP_TEXT)
+        second = await ai_summarizer.summarize_rfp_with_ai(RFP_TEXT)
+        bypass = await ai_summarizer.summarize_rfp_with_ai(RFP_TEXT, use_cache=False)
+    return first, second, bypass, calls
+
+
+def test_summary_is_served_from_cache():
+    from services.common import result_cache
+
+    with mock.patch.dict(os.environ, {"AZURE_OPENAI_DEPLOYMENT": "gpt-4o"}), \
+            mock.patch.object(result_cache, "_backend", result_cache.MemoryCacheBackend(10)), \
+            mock.patch.object(result_cache, "_backend_initialized", True), \
+            mock.patch.object(result_cache, "_caches", {}):
+        first, second, bypass, calls = asyncio.run(_summarize_three_times())
+
+    assert len(calls) == 2
+    assert first["metadata"]["cache"] == "miss"
+    assert second["metadata"]["cache"] == "hit"
+    assert bypass["metadata"]["cache"] == "bypass"
+    assert second["metadata"]["cache_key"] == first["metadata"]["cache_key"]
+    assert second["identification_marche"] == FAKE_SUMMARY["identification_marche"]
+
+
+if __name__ == "__main__":
+    test_backends_expire_and_evict()
+    test_keys_are_versioned_by_prompt_and_model()
+    test_summary_is_served_from_cache()
+    print("[OK] Result cache expiry, eviction, key versioning and summary hits")
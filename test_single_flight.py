@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test of the single-flight deduplication of identical in-flight AI requests
+Concurrent identical calls must share one upstream model call and one result,
+and a cancelled caller must not cancel the call shared with the others
+
+Usage:
+    python -m pytest -q test_single_flight.py
+    python test_single_flight.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+FAKE_AI_LATENCY = 0.3
+
+FAKE_AI_RESPONSE = {
+    "title": "Architecture cible",
+    "type": "architecture",
+    "nodes": [{"id": "node1", "label": "Frontend"}, {"id": "node2", "label": "Backend"}],
+    "connections": [{"from": "node1", "to": "node2"}]
+}
+
+
+class CountingCompletions:
+    def __init__(self):
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(FAKE_AI_LATENCY)
+        message = SimpleNamespace(content=json.dumps(FAKE_AI_RESPONSE))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+class FakeAsyncClient:
+    def __init__(self, completions):
+        self.chat = SimpleNamespace(completions=completions)
+
+    async def close(self):
+        pass
+
+
+async def _run(completions):
+    from services.common import llm_client
+    from services.diagram_generator.diagram_generator import generate_diagram_spec_with_ai
+
+    description = "Frontend React, backend API, base PostgreSQL"
+
+    # Identical concurrent requests: one upstream call
+    identical = await asyncio.gather(*(generate_diagram_spec_with_ai(description) for _ in range(5)))
+    identical_calls = completions.calls
+
+    # A cancelled caller does not cancel the call shared with the others
+    first = asyncio.create_task(generate_diagram_spec_with_ai(description))
+    second = asyncio.create_task(generate_diagram_spec_with_ai(description))
+    await asyncio.sleep(FAKE_AI_LATENCY / 3)
+    first.cancel()
+    survivor = await second
+    cancelled_calls = completions.calls - identical_calls
+
+    # Different inputs are not deduplicated
+    await asyncio.gather(
+        generate_diagram_spec_with_ai(description + " (v1)"),
+        generate_diagram_spec_with_ai(description + " (v2)")
+    )
+    distinct_calls = completions.calls - identical_calls - cancelled_calls
+
+    await llm_client.close_ai_clients()
+    return identical, identical_calls, first, survivor, cancelled_calls, distinct_calls
+
+
+def test_identical_requests_share_one_upstream_call():
+    from services.common import llm_client
+
+    completions = CountingCompletions()
+    env = {
+        "AZURE_OPENAI_ENDPOINT": "https://fake.openai.azure.com",
+        "AZURE_OPENAI_KEY": "fake-key",
+        "AZURE_OPENAI_DEPLOYMENT": "fake-deployment"
+    }
+    with mock.patch.dict(os.environ, env), \
+            mock.patch.object(llm_client, "_build_client", lambda provider: FakeAsyncClient(completions)):
+        identical, identical_calls, first, survivor, cancelled_calls, distinct_calls = asyncio.run(_run(completions))
+
+    assert identical_calls == 1, identical_calls
+    assert all(result["title"] == FAKE_AI_RESPONSE["title"] for result in identical)
+    assert first.cancelled()
+    assert survivor["title"] == FAKE_AI_RESPONSE["title"]
+    assert cancelled_calls == 1, cancelled_calls
+    assert distinct_calls == 2, distinct_calls
+
+
+if __name__ == "__main__":
+    test_identical_requests_share_one_upstream_call()
+    print("[OK] Identical in-flight requests share one upstream call")
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test of the speculative RFP analysis started by /ingest
+A confident RFP detection starts the analysis in the background: confirming it returns
+that result without a new AI call, picking another action cancels it, and the caps
+(concurrency, hourly token budget) stop further speculation
+
+Usage:
+    python -m pytest -q test_speculative_summary.py
+    python test_speculative_summary.py
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+import httpx
+
+RFP_TEXT = (
+    "Règlement de consultation\n"
+    "Marché public de tierce maintenance applicative.\n"
+    "Date limite de remise des offres : 15 mars.\n"
+    "Critères de sélection : valeur technique 60 %, prix 40 %.\n"
+    "Le soumissionnaire joint l'acte d'engagement signé.\n"
+)
+
+SPECULATION_ENV = {
+    "SPECULATIVE_SUMMARY": "1",
+    "SPECULATIVE_MAX_CONCURRENT": "1",
+    "EXTRACTION_CACHE_MAX_MB": "0",
+    "ROUTING_LOG_PATH": ""
+}
+
+
+async def _run(directory: str):
+    import main
+    from services.common import ingested_files
+    from services.rfp_summarizer import speculative_summary
+
+    speculative_summary._launched.clear()
+    calls = []
+    cancelled = []
+    release = asyncio.Event()
+
+    async def fake_summarize(text):
+        calls.append(text)
+        try:
+            await release.wait()
+        except asyncio.CancelledError:
+            cancelled.append(text)
+            raise
+        return {"identification_marche": {"objet_consultation": "TMA"}, "metadata": {"cache": "miss"}}
+
+    async def no_diagram(*args, **kwargs):
+        raise Exception("diagram not needed")
+
+    async def not_called(text):
+        raise AssertionError("analysis not reused")
+
+    def ingest(client, name):
+        return client.post("/ingest", files={"file": (name, RFP_TEXT.encode("utf-8"))})
+
+    transport = httpx.ASGITransport(app=main.app)
+    with mock.patch.object(ingested_files, "INGEST_DIR", directory), \
+            mock.patch.object(speculative_summary, "summarize_rfp_with_ai", fake_summarize), \
+            mock.patch.object(main, "summarize_rfp_with_ai", not_called), \
+            mock.patch("services.diagram_generator.generate_diagram_spec_with_ai", no_diagram):
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=30) as client:
+            # Confirmation picks up the analysis started at ingestion
+            confirmed = (await ingest(client, "consultation.txt")).json()
+            # Concurrency cap: one speculative analysis at a time
+            over_limit = (await ingest(client, "dce.txt")).json()
+            await asyncio.sleep(0)
+            release.set()
+            summary = await client.post("/summarizeRfp", data={"file_id": confirmed["file_id"]})
+
+            # Another action cancels the analysis
+            release.clear()
+            abandoned = (await ingest(client, "cctp.txt")).json()
+            await asyncio.sleep(0)
+            await client.post("/generateDiagramFromText", data={"file_id": abandoned["file_id"]})
+            await asyncio.sleep(0)
+
+            # Hourly budget exhausted
+            with mock.patch.dict(os.environ, {"SPECULATIVE_TOKENS_PER_HOUR": "1"}):
+                over_budget = (await ingest(client, "marche.txt")).json()
+
+            metrics = (await client.get("/metrics/llm")).json()["speculative"]
+
+    return confirmed, over_limit, summary, abandoned, over_budget, calls, cancelled, metrics
+
+
+def test_speculative_summary_is_confirmed_or_cancelled():
+    with mock.patch.dict(os.environ, SPECULATION_ENV), tempfile.TemporaryDirectory() as directory:
+        confirmed, over_limit, summary, abandoned, over_budget, calls, cancelled, metrics = asyncio.run(_run(directory))
+
+    assert confirmed["suggested_action"] == "summarize" and confirmed["speculative"] is True
+    assert over_limit["speculative"] is False
+
+    assert summary.status_code == 200, summary.text
+    assert summary.json()["metadata"]["speculative"] is True
+
+    assert abandoned["speculative"] is True
+    assert len(calls) == 2 and len(cancelled) == 1
+    assert over_budget["speculative"] is False
+
+    assert metrics["started"] == 2 and metrics["confirmed"] == 1 and metrics["cancelled"] == 1
+    assert metrics["skipped_concurrency"] == 1 and metrics["skipped_budget"] == 1
+    assert metrics["running"] == 0
+
+
+if __name__ == "__main__":
+    test_speculative_summary_is_confirmed_or_cancelled()
+    print("[OK] Speculative RFP analysis confirmed, cancelled and capped")
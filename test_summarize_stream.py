@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test of the streaming /summarizeRfp/stream endpoint (server-sent events)
+Runs the FastAPI app in-process with a fake streaming AI service (no network, no API key)
+and checks that sections are delivered before the generation ends, and that a cut-off
+stream is flagged as truncated, delivers its repaired section and is never cached
+
+Usage:
+    python -m pytest -q test_summarize_stream.py
+    python test_summarize_stream.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+import httpx
+
+DELTA_DELAY = 0.02  # Simulated delay between streamed deltas (seconds)
+DELTA_SIZE = 40     # Characters per streamed delta
+
+FAKE_SUMMARY = {
+    "informations_generales": {"client_emetteur": "Ville de Lyon", "objet": "TMA {applicative}"},
+    "lots": [{"numero": 1, "intitule": "Maintenance \"corrective\""}, {"numero": 2, "intitule": "Évolutions [v2]"}],
+    "calendrier": {"date_limite": "2025-03-01", "duree": None},
+    "score_pertinence": 4,
+    "points_attention": ["Pénalités élevées"]
+}
+
+
+class FakeStreamingCompletions:
+    """Stand-in for client.chat.completions streaming the JSON summary in small deltas"""
+
+    def __init__(self, truncate_at: int = None):
+        self.calls = 0
+        self.truncate_at = truncate_at
+
+    async def create(self, stream=False, **kwargs):
+        self.calls += 1
+        text = json.dumps(FAKE_SUMMARY, ensure_ascii=False, indent=2)
+        finish_reason = "stop"
+        if self.truncate_at is not None:
+            # Output cut off by max_tokens
+            text, finish_reason = text[:self.truncate_at], "length"
+
+        async def deltas():
+            for start in range(0, len(text), DELTA_SIZE):
+                await asyncio.sleep(DELTA_DELAY)
+                delta = SimpleNamespace(content=text[start:start + DELTA_SIZE])
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=delta, finish_reason=None)])
+            # Last chunk: no content, finish reason only
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=None), finish_reason=finish_reason)])
+
+        return deltas()
+
+
+class FakeAsyncClient:
+    def __init__(self, completions):
+        self.chat = SimpleNamespace(completions=completions)
+
+    async def close(self):
+        pass
+
+
+async def _stream(app, rfp_text):
+    """
+    Call the ASGI app directly and timestamp each body message as it is sent
+    (httpx.ASGITransport buffers the whole response before returning it)
+    """
+    request = httpx.Request("POST", "http://test/summarizeRfp/stream", data={"rfpText": rfp_text})
+    body = request.read()
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": "/summarizeRfp/stream", "raw_path": b"/summarizeRfp/stream",
+        "query_string": b"", "root_path": "", "server": ("test", 80), "client": ("127.0.0.1", 1234),
+        "headers": [(key.lower().encode(), value.encode()) for key, value in request.headers.items()]
+    }
+    received = False
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.sleep(3600)
+
+    started = time.perf_counter()
+    status = {}
+    events = []
+    buffer = ""
+
+    async def send(message):
+        nonlocal buffer
+        if message["type"] == "http.response.start":
+            status["code"] = message["status"]
+            status["headers"] = dict(message["headers"])
+        elif message["type"] == "http.response.body":
+            buffer += message.get("body", b"").decode("utf-8")
+            while "\n\n" in buffer:
+                block, buffer = buffer.split("\n\n", 1)
+                lines = dict(line.split(": ", 1) for line in block.splitlines())
+                events.append((lines["event"], json.loads(lines["data"]), time.perf_counter() - started))
+
+    await app(scope, receive, send)
+    assert status["code"] == 200, status
+    assert status["headers"][b"content-type"].startswith(b"text/event-stream")
+    return events
+
+
+async def _run():
+    import main
+    from services.common import llm_client
+
+    transport = httpx.ASGITransport(app=main.app)
+    rfp_text = f"Appel d'offres {time.time()} pour la maintenance applicative. " * 20
+
+    first = await _stream(main.app, rfp_text)
+    second = await _stream(main.app, rfp_text)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=30) as client:
+        empty = await client.post("/summarizeRfp/stream", data={"rfpText": "trop court"})
+
+    await llm_client.close_ai_clients()
+    return first, second, empty
+
+
+def test_summarize_stream_delivers_sections_incrementally():
+    from services.common import llm_client, result_cache
+
+    completions = FakeStreamingCompletions()
+    env = {
+        "AZURE_OPENAI_ENDPOINT": "https://fake.openai.azure.com",
+        "AZURE_OPENAI_KEY": "fake-key",
+        "AZURE_OPENAI_DEPLOYMENT": "fake-deployment"
+    }
+    with mock.patch.dict(os.environ, env), \
+            mock.patch.object(llm_client, "_build_client", lambda provider: FakeAsyncClient(completions)), \
+            mock.patch.object(result_cache, "_backend", result_cache.MemoryCacheBackend(10)), \
+            mock.patch.object(result_cache, "_backend_initialized", True), \
+            mock.patch.object(result_cache, "_caches", {}):
+        first, second, empty = asyncio.run(_run())
+
+    # Sections arrive one by one, in document order, before the final event
+    sections = [data["name"] for event, data, _ in first if event == "section"]
+    assert sections == list(FAKE_SUMMARY), sections
+    assert first[-1][0] == "complete"
+    complete = first[-1][1]
+    assert {key: value for key, value in complete.items() if key != "metadata"} == FAKE_SUMMARY
+    assert complete["metadata"]["cache"] == "miss"
+
+    first_section_at, complete_at = first[0][2], first[-1][2]
+    print(f"First section: {first_section_at * 1000:.0f} ms, complete: {complete_at * 1000:.0f} ms")
+    assert first_section_at < complete_at / 2, "Sections were not streamed before the end of generation"
+
+    # Cached analysis is replayed immediately without a new model call
+    assert [event for event, _, _ in second] == ["section"] * len(FAKE_SUMMARY) + ["complete"]
+    assert second[-1][1]["metadata"]["cache"] == "hit"
+    assert completions.calls == 1
+
+    # Input errors are reported before the stream is opened
+    assert empty.status_code == 400
+
+
+async def _run_truncated(completions, rfp_text):
+    import main
+    from services.common import llm_client
+
+    first = await _stream(main.app, rfp_text)
+    second = await _stream(main.app, rfp_text)
+    await llm_client.close_ai_clients()
+    return first, second
+
+
+def test_truncated_stream_is_flagged_and_not_cached():
+    from services.common import llm_client, result_cache
+
+    text = json.dumps(FAKE_SUMMARY, ensure_ascii=False, indent=2)
+    # Cut inside the "lots" section, after "informations_generales" is complete
+    completions = FakeStreamingCompletions(truncate_at=text.index("Maintenance") + 6)
+    env = {
+        "AZURE_OPENAI_ENDPOINT": "https://fake.openai.azure.com",
+        "AZURE_OPENAI_KEY": "fake-key",
+        "AZURE_OPENAI_DEPLOYMENT": "fake-deployment"
+    }
+    with mock.patch.dict(os.environ, env), \
+            mock.patch.object(llm_client, "_build_client", lambda provider: FakeAsyncClient(completions)), \
+            mock.patch.object(result_cache, "_backend", result_cache.MemoryCacheBackend(10)), \
+            mock.patch.object(result_cache, "_backend_initialized", True), \
+            mock.patch.object(result_cache, "_caches", {}):
+        first, second = asyncio.run(_run_truncated(completions, "Appel d'offres tronqué. " * 20))
+
+    sections = [data["name"] for event, data, _ in first if event == "section"]
+    complete = first[-1][1]
+    # The repaired section is delivered before "complete"
+    assert sections == ["informations_generales", "lots"], sections
+    assert complete["lots"][0]["intitule"] == "Mainte"
+    assert complete["metadata"]["truncated"] is True
+    # Not cached: the same text is analysed again
+    assert second[-1][1]["metadata"]["cache"] == "miss"
+    assert completions.calls == 2
+
+
+if __name__ == "__main__":
+    test_summarize_stream_delivers_sections_incrementally()
+    test_truncated_stream_is_flagged_and_not_cached()
+    print("[OK] Sections streamed incrementally")
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test of sampled encoding detection
+BOM and valid UTF-8 files are decoded without chardet; other files are detected
+from bounded windows (start, middle slices, end) instead of the whole content
+
+Usage:
+    python -m pytest -q test_text_decoder.py
+    python test_text_decoder.py
+"""
+
+import codecs
+import io
+import sys
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmark_text_encoding import make_french_text
+
+SAMPLE = "Échéance : 15 mars — pénalités de 100 € par jour, œuvre livrée"
+
+
+def test_bom_and_utf8_skip_chardet():
+    from services.rfp_summarizer import text_decoder
+
+    with mock.patch.object(text_decoder.chardet, "UniversalDetector", side_effect=AssertionError("chardet used")):
+        assert text_decoder.decode_text_source(SAMPLE.encode("utf-8")) == (SAMPLE, "utf-8")
+        assert text_decoder.decode_text_source(codecs.BOM_UTF8 + SAMPLE.encode("utf-8")) == (SAMPLE, "utf-8-sig")
+        assert text_decoder.decode_text_source(SAMPLE.encode("utf-16")) == (SAMPLE, "utf-16")
+
+
+def test_large_cp1252_file_is_sampled():
+    from services.rfp_summarizer import text_decoder
+
+    data = make_french_text(3, "cp1252") + SAMPLE.encode("cp1252")
+    fed = []
+    detector_class = text_decoder.chardet.UniversalDetector
+
+    class RecordingDetector(detector_class):
+        def feed(self, window):
+            fed.append(len(window))
+            return super().feed(window)
+
+    with mock.patch.object(text_decoder.chardet, "UniversalDetector", RecordingDetector):
+        text, encoding = text_decoder.decode_text_source(io.BytesIO(data))
+
+    assert codecs.lookup(encoding).name == "cp1252"
+    assert text == data.decode("cp1252") and text.endswith(SAMPLE)
+    assert sum(fed) <= 256 * 1024 < len(data)
+
+
+def test_extract_text_from_txt_normalises_line_endings():
+    from services.rfp_summarizer.file_extractor import extract_text_from_txt
+
+    assert extract_text_from_txt("Ligne 1\r\nLigne 2\rFin é\n".encode("utf-8")) == "Ligne 1\nLigne 2\nFin é"
+
+
+if __name__ == "__main__":
+    test_bom_and_utf8_skip_chardet()
+    test_large_cp1252_file_is_sampled()
+    test_extract_text_from_txt_normalises_line_endings()
+    print("[OK] Sampled encoding detection")
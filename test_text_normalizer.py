@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test of the document normalisation stage
+Running headers/footers, page numbers, table of contents, hyphenation breaks and
+whitespace runs must be removed before the text is sent to the model, while isolated
+dot-leader content lines outside a table of contents are kept
+
+Usage:
+    python -m pytest -q test_text_normalizer.py
+    python test_text_normalizer.py
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmark_pdf_extraction import make_text_pdf
+
+
+def _page(number: int, body: str) -> str:
+    return (f"Ville de Lyon - DCE Maintenance applicative\n"
+            f"CCTP  -   version 2\n"
+            f"{body}\n"
+            f"Page {number} / 4")
+
+
+def test_page_furniture_toc_and_hyphenation_removed():
+    from services.rfp_summarizer.text_normalizer import normalize_document_text
+
+    pages = [
+        _page(1, "Sommaire\nArticle 1 - Objet ........ 2\nArticle 2 - Délais . . . . . 3\nArticle 3 - Pénalités …… 4"),
+        _page(2, "Article 1 - Objet\nLe titulaire assure les presta-\ntions de maintenance.\n\n\n\nTMA\t\tcorrective"),
+        _page(3, "Article 2 - Délais\nLa   réversibilité est   prévue en fin de marché."),
+        _page(4, "Article 3 - Pénalités\n100 € par jour de retard.")
+    ]
+    result = normalize_document_text("\f".join(pages))
+
+    assert result["text"] == (
+        "Article 1 - Objet\nLe titulaire assure les prestations de maintenance.\n\nTMA corrective\n\n"
+        "Article 2 - Délais\nLa réversibilité est prévue en fin de marché.\n\n"
+        "Article 3 - Pénalités\n100 € par jour de retard."
+    )
+    assert result["repeated_lines"] == 8 and result["page_numbers"] == 4
+    assert result["toc_lines"] == 4 and result["hyphenations"] == 1
+    assert result["tokens_after"] < result["tokens_before"] and result["chars_after"] < result["chars_before"]
+
+
+def test_dot_leader_content_lines_outside_toc_are_kept():
+    from services.rfp_summarizer.text_normalizer import normalize_document_text
+
+    text = (
+        "Article 3 - Pénalités\n"
+        "Pénalité par jour de retard ........ 500\n"
+        "Pénalité par absence en réunion ........ 200\n"
+        "Les pénalités sont plafonnées à 10% du montant du marché.\n\n"
+        "Annexe - Index des articles\n"
+        "Article 1 - Objet ........ 2\n"
+        "Article 2 - Délais ........ 3\n"
+        "Article 3 - Pénalités ........ 4"
+    )
+    result = normalize_document_text(text)
+
+    # Two leader lines inside a section are content; a run of three without heading is a table of contents
+    assert "Pénalité par jour de retard ........ 500" in result["text"]
+    assert "Pénalité par absence en réunion ........ 200" in result["text"]
+    assert "Article 1 - Objet ........ 2" not in result["text"]
+    assert result["toc_lines"] == 3
+
+
+def test_single_page_text_keeps_its_content():
+    from services.rfp_summarizer.text_normalizer import normalize_document_text
+
+    text = "2024\nBudget annuel : 150 000 €\nLot 1 - TMA\n12"
+    assert normalize_document_text(text)["text"] == text
+
+
+def test_pdf_pages_are_separated_for_the_normaliser():
+    from services.rfp_summarizer.pdf_engine import extract_pdf
+    from services.rfp_summarizer.text_normalizer import normalize_document_text
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "dce.pdf")
+        make_text_pdf(path, 3, lines_per_page=2)
+        text = extract_pdf(path, workers=1)["text"]
+
+    assert text.count("\f") == 2
+    assert "\f" not in normalize_document_text(text)["text"]
+
+
+if __name__ == "__main__":
+    test_page_furniture_toc_and_hyphenation_removed()
+    test_dot_leader_content_lines_outside_toc_are_kept()
+    test_single_page_text_keeps_its_content()
+    test_pdf_pages_are_separated_for_the_normaliser()
+    print("[OK] Document normalisation")
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test of the token budget shared by all agents
+Truncated content must fit the budget with the estimating tokenizer (tiktoken not
+installed or unable to download its encoding) and with tiktoken when available, model limits must match the longest
+prefix, long texts must be counted without blocking the event loop, and the deck
+validator must send bounded slide markup without the stylesheet
+
+Usage:
+    python -m pytest -q test_token_budget.py
+    python test_token_budget.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+PARAGRAPH = (
+    "Le titulaire s'engage à respecter les délais d'exécution définis à l'article 5. "
+    "Les pénalités de retard sont calculées par jour calendaire, sans mise en demeure préalable.\n"
+)
+
+
+def _tokenizers():
+    from services.common import token_budget
+
+    tokenizers = [token_budget._EstimatingTokenizer()]
+    try:
+        import tiktoken
+        tokenizers.append(token_budget._TiktokenTokenizer(tiktoken.get_encoding("o200k_base")))
+    except ImportError:
+        pass
+    return tokenizers
+
+
+@pytest.mark.parametrize("tokenizer", _tokenizers(), ids=lambda tokenizer: tokenizer.name)
+def test_fit_to_budget_respects_budget(tokenizer):
+    from services.common import token_budget
+
+    text = PARAGRAPH * 400
+    with mock.patch.object(token_budget, "get_tokenizer", lambda model=None: tokenizer):
+        short, short_truncated = token_budget.fit_to_budget("Court.", 100)
+        head, head_truncated = token_budget.fit_to_budget(text, 500)
+        head_tail, _ = token_budget.fit_to_budget(text, 500, keep="head_tail")
+        message, packed = token_budget.pack_user_content(
+            "gpt-4", "Système " * 200, "Analysez:\n\n{content}", text, 1000
+        )
+        packed_tokens = token_budget.count_message_tokens([
+            {"role": "system", "content": "Système " * 200},
+            {"role": "user", "content": message}
+        ])
+
+    assert (short, short_truncated) == ("Court.", False)
+    assert head_truncated and head.startswith(PARAGRAPH) and tokenizer.count(head) <= 500
+    assert head_tail.startswith(PARAGRAPH) and head_tail.rstrip().endswith("préalable.")
+    assert token_budget.TRUNCATION_MARKER in head_tail and tokenizer.count(head_tail) <= 500
+    # gpt-4: 8192 tokens of context, 1000 reserved for the answer
+    assert packed and packed_tokens + 1000 <= 8192
+
+
+def test_estimate_is_used_without_tiktoken():
+    from services.common import token_budget
+
+    token_budget.get_tokenizer.cache_clear()
+    with mock.patch.dict(sys.modules, {"tiktoken": None}):
+        tokenizer = token_budget.get_tokenizer("gpt-4o")
+    token_budget.get_tokenizer.cache_clear()
+
+    assert tokenizer.name == "estimate" and not tokenizer.exact
+    # Cautious estimate: never below one token per word
+    assert tokenizer.count(PARAGRAPH) >= len(PARAGRAPH.split())
+
+
+def test_estimate_is_used_when_tiktoken_cannot_download():
+    from services.common import token_budget
+
+    downloads = []
+
+    def unreachable(name):
+        downloads.append(name)
+        raise ConnectionError("BPE download blocked")
+
+    fake_tiktoken = SimpleNamespace(encoding_for_model=unreachable, get_encoding=unreachable)
+    token_budget.get_tokenizer.cache_clear()
+    try:
+        with mock.patch.dict(sys.modules, {"tiktoken": fake_tiktoken}):
+            first = token_budget.count_tokens("bonjour", "gpt-4o")
+            second = token_budget.count_tokens("bonjour tout le monde", "gpt-4o")
+    finally:
+        token_budget.get_tokenizer.cache_clear()
+
+    assert first >= 1 and second >= 4
+    # The failed download is not retried on every call
+    assert len(downloads) == 1
+
+
+def test_model_limits():
+    from services.common.token_budget import clamp_output_tokens, get_model_limits
+
+    assert get_model_limits("gpt-4o-mini-2024") == (128000, 16384)
+    assert get_model_limits("gpt-4") == (8192, 4096)
+    assert get_model_limits("mon-deploiement") == (128000, 16384)
+    assert clamp_output_tokens(8000, "gpt-4") == 4096
+    with mock.patch.dict(os.environ, {"LLM_CONTEXT_WINDOW": "32000", "LLM_MAX_OUTPUT_TOKENS": "2000"}):
+        assert get_model_limits("mon-deploiement") == (32000, 2000)
+
+
+async def _count_while_ticking(text: str):
+    from services.common.token_budget import count_tokens_async
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.005)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    tokens = await count_tokens_async(text)
+    task.cancel()
+    return tokens, ticks
+
+
+def test_long_texts_are_counted_off_the_event_loop():
+    from services.common.token_budget import count_tokens
+
+    text = PARAGRAPH * 12000
+    tokens, ticks = asyncio.run(_count_while_ticking(text))
+    assert tokens == count_tokens(text)
+    assert ticks >= 3
+
+
+async def _validate(html: str, slides_data: dict, source: str):
+    from services.deck_generator import html_deck_generator
+
+    calls = []
+
+    async def fake_completion(messages, **params):
+        calls.append((messages, params))
+        content = json.dumps({"validation_status": "valid", "needs_correction": False})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    with mock.patch.object(html_deck_generator, "create_chat_completion", fake_completion):
+        await html_deck_generator.validate_html_deck(html, source, slides_data)
+    return calls
+
+
+def test_deck_validation_sends_bounded_slide_markup():
+    from services.common.token_budget import count_tokens
+    from services.deck_generator.html_deck_generator import (
+        VALIDATION_HTML_MAX_TOKENS,
+        VALIDATION_MAX_OUTPUT_TOKENS,
+        VALIDATION_SOURCE_MAX_TOKENS,
+        build_html_from_structure
+    )
+
+    slides_data = {"title": "Offre", "slides": [
+        {"type": "title", "title": "Offre Infotel"},
+        {"type": "content", "title": "Contexte", "bullets": ["Audit", "Plan"]},
+        {"type": "conclusion", "title": "Merci", "bullets": ["contact@infotel.com"]}
+    ]}
+    html = build_html_from_structure(slides_data)
+    with mock.patch.dict(os.environ, {"AZURE_OPENAI_DEPLOYMENT": "gpt-4o"}):
+        calls = asyncio.run(_validate(html, slides_data, PARAGRAPH * 5000))
+
+    (messages, params), = calls
+    prompt = messages[-1]["content"]
+    assert "<style" in html and "<style" not in prompt
+    assert "Contexte" in prompt
+    assert params["max_tokens"] <= VALIDATION_MAX_OUTPUT_TOKENS
+    assert count_tokens(prompt) <= (
+        count_tokens(json.dumps(slides_data)) + VALIDATION_HTML_MAX_TOKENS + VALIDATION_SOURCE_MAX_TOKENS + 500
+    )
+
+
+if __name__ == "__main__":
+    for tokenizer in _tokenizers():
+        test_fit_to_budget_respects_budget(tokenizer)
+    test_estimate_is_used_without_tiktoken()
+    test_estimate_is_used_when_tiktoken_cannot_download()
+    test_model_limits()
+    test_long_texts_are_counted_off_the_event_loop()
+    test_deck_validation_sends_bounded_slide_markup()
+    print("[OK] Token budget respected, counted off the event loop, bounded deck validation")
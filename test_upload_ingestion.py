@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test of the streaming upload ingestion layer
+Uploads are hashed while they arrive, and oversized uploads are rejected with 413
+before (Content-Length) or while (chunked) the body is read
+
+Usage:
+    python -m pytest -q test_upload_ingestion.py
+    python test_upload_ingestion.py
+"""
+
+import asyncio
+import hashlib
+import os
+import sys
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+import httpx
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _build_app():
+    from fastapi import FastAPI, File, Form, UploadFile
+    from services.common.upload_ingestion import IngestingRoute, upload_sha256
+
+    app = FastAPI()
+    app.router.route_class = IngestingRoute
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...), label: str = Form("")):
+        content = await file.read()
+        return {
+            "label": label,
+            "size": file.size,
+            "sha256": upload_sha256(file),
+            "read_sha256": hashlib.sha256(content).hexdigest(),
+            "spooled_to_disk": bool(getattr(file.file, "_rolled", False))
+        }
+
+    return app
+
+
+async def _call(app, body: bytes, headers: dict, declared_length: bool = True):
+    """Call the ASGI app directly, sending the body in chunks and counting what was read"""
+    raw_headers = [(key.lower().encode(), value.encode()) for key, value in headers.items()
+                   if declared_length or key.lower() != "content-length"]
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": "/upload", "raw_path": b"/upload", "query_string": b"", "root_path": "",
+        "server": ("test", 80), "client": ("127.0.0.1", 1234), "headers": raw_headers
+    }
+    chunks = [body[start:start + CHUNK_SIZE] for start in range(0, len(body), CHUNK_SIZE)]
+    sent = {"chunks": 0}
+    response = {"body": b""}
+
+    async def receive():
+        if sent["chunks"] < len(chunks):
+            sent["chunks"] += 1
+            return {"type": "http.request", "body": chunks[sent["chunks"] - 1], "more_body": sent["chunks"] < len(chunks)}
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+
+    await app(scope, receive, send)
+    return response, sent["chunks"], len(chunks)
+
+
+def _multipart(content: bytes):
+    request = httpx.Request("POST", "http://test/upload", files={"file": ("dce.pdf", content)}, data={"label": "DCE"})
+    return request.read(), dict(request.headers)
+
+
+def test_uploads_are_hashed_and_capped():
+    import json
+
+    with mock.patch.dict(os.environ, {"UPLOAD_MAX_MB": "2", "EXTRACT_SPOOL_MAX_MB": "0.5"}):
+        app = _build_app()
+
+        content = os.urandom(1024 * 1024 + 123)
+        body, headers = _multipart(content)
+        response, _, _ = asyncio.run(_call(app, body, headers))
+        assert response["status"] == 200, response
+        result = json.loads(response["body"])
+        assert result["sha256"] == hashlib.sha256(content).hexdigest() == result["read_sha256"]
+        assert result["size"] == len(content) and result["label"] == "DCE"
+        assert result["spooled_to_disk"]
+
+        # Declared too large: rejected before any body chunk is read
+        body, headers = _multipart(os.urandom(3 * 1024 * 1024))
+        response, read, total = asyncio.run(_call(app, body, headers))
+        assert response["status"] == 413 and read == 0, (response["status"], read)
+
+        # No Content-Length: reading stops as soon as the limit is crossed
+        response, read, total = asyncio.run(_call(app, body, headers, declared_length=False))
+        assert response["status"] == 413 and read < total, (response["status"], read, total)
+
+
+if __name__ == "__main__":
+    test_uploads_are_hashed_and_capped()
+    print("[OK] Uploads hashed on the fly and capped")